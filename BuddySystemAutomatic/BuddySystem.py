@@ -1,14 +1,35 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Union
+import sys
 
 from NodoMemoria import NodoMemoria
+from politicas import _mejor_ajuste
+from asignadores import resolver_pid, resolver_handle
+
+# Clases de vida que acepta asignar_memoria(..., vida=...) además de una duración en ms.
+#
+# EXPERIMENTAL: la colocación segregada por vida no mejora nada con las cargas
+# del proyecto, así que no se ofrece en la GUI ni en la línea de comandos.
+# Medido con 8 MB, mínimo 32 KB y 1000 procesos (barrido.py --vida, 10 trazas):
+#
+#   fraccion_larga  colocación      rechazo %  rech. por fragmentación
+#   0.0             mejor ajuste    12,11      39,0
+#   0.0             segregada       12,11      39,0     (no hay ninguna "larga")
+#   0.2             mejor ajuste    36,57      158,5
+#   0.2             segregada       36,94      171,8
+#
+# Sin procesos largos es idéntica al mejor ajuste; con 20% de procesos de
+# 10-30 s rechaza algo más que el mejor ajuste solo (el Simulador da lo mismo:
+# 368,5 contra 364,1 rechazos en 20 semillas), con factor_vida_larga entre 1 y 3.
+VIDA_CORTA = "corta"
+VIDA_LARGA = "larga"
 
 # =========================
 #   LÓGICA DEL BUDDY SYSTEM
 # =========================
 class SistemaBuddy:
-    def __init__(self, tamano_total: int = 1024, tam_min_bloque: int = 1):
+    def __init__(self, tamano_total: int = 1024, tam_min_bloque: int = 1, politica=None,
+                 max_fragmentos: int = 1, max_pool: int = 4096, factor_vida_larga: float = 2.0):
         # Ajustes a potencias de 2
         self.total = self.obtener_potencia_requerida(max(1, tamano_total))
         self.min_bloque = self.obtener_potencia_requerida(max(1, tam_min_bloque))
@@ -17,6 +38,61 @@ class SistemaBuddy:
             self.min_bloque = self.total
         # Árbol raíz
         self.raiz = NodoMemoria(self.total, 0)
+        # Política de colocación (None = bloque libre más a la izquierda, ver politicas.py)
+        self.politica = politica
+        # Primera hoja de la cadena ordenada por dirección
+        self._primera: NodoMemoria = self.raiz
+        # Nodos que _fusionar saca del árbol y _dividir reutiliza (a lo sumo max_pool)
+        self._pool: List[NodoMemoria] = []
+        self.max_pool = max(0, max_pool)
+
+        # Nombres de proceso internados una sola vez: nombre <-> id compacto
+        self._ids: Dict[str, int] = {}
+        self._nombres: List[str] = []
+        self._handle_de_pid: List[int] = []     # id de proceso -> handle vigente (-1 = ninguno)
+        # Handles: índice pequeño -> nodo asignado (se reciclan al liberar)
+        self._bloques: List[Optional[NodoMemoria]] = []
+        self._handles_libres: List[int] = []
+        # Asignación dispersa: con max_fragmentos > 1, si no hay un bloque que
+        # alcance, un proceso puede recibir varios bloques más chicos.
+        # handle -> fragmentos además del primero (que está en _bloques)
+        self.max_fragmentos = max(1, max_fragmentos)
+        self._fragmentos: Dict[int, List[NodoMemoria]] = {}
+        # Instrumentación (None = deshabilitada, sin costo en el camino rápido)
+        self._metricas = None
+
+        # Contadores incrementales: bloques libres por orden (orden = log2 del tamaño),
+        # memoria libre total, ocupada y desperdiciada
+        self._libres_por_orden: List[int] = [0] * self.total.bit_length()
+        self._libres_por_orden[-1] = 1
+        self._total_libre = self.total
+        self._ocupada = 0
+        self._desperdicio = 0
+        # Promedio móvil de las vidas informadas: una vida es larga si supera
+        # factor_vida_larga veces ese promedio
+        self._umbral_vida = 0.0
+        self.factor_vida_larga = factor_vida_larga
+
+    # Instrumentación
+    def habilitar_metricas(self, muestreo: int = 64, max_serie: int = 4096):
+        """Activa contadores, histogramas y series temporales del asignador"""
+        from metricas import Metricas, instrumentar
+        if self._metricas is None:
+            niveles = (self.total // self.min_bloque).bit_length() - 1
+            self._metricas = Metricas(niveles, muestreo, max_serie)
+            instrumentar(self, self._metricas)
+        return self._metricas
+
+    def deshabilitar_metricas(self):
+        from metricas import desinstrumentar
+        if self._metricas is not None:
+            self._metricas.detener_volcado()
+            desinstrumentar(self)
+            self._metricas = None
+
+    def metricas(self) -> dict:
+        """Instantánea de las métricas (vacía si están deshabilitadas)"""
+        return self._metricas.instantanea() if self._metricas is not None else {}
 
     @staticmethod
     def es_potencia_de_2(x: int) -> bool:
@@ -35,29 +111,286 @@ class SistemaBuddy:
         direccion_izq = nodo.direccion
         direccion_der = nodo.direccion + mitad
         
-        nodo.hijoIzquierdo = NodoMemoria(mitad, direccion_izq)
-        nodo.hijoDerecho = NodoMemoria(mitad, direccion_der)
-        nodo.hijoIzquierdo.padre = nodo
-        nodo.hijoDerecho.padre = nodo
-
-    def asignar_memoria(self, espacio: int, proceso: str) -> Optional[NodoMemoria]:
-        """Solicita memoria para un proceso aplicando buddy system"""
-        if not proceso:
+        orden = nodo.tamano.bit_length() - 1
+        self._libres_por_orden[orden] -= 1
+        self._libres_por_orden[orden - 1] += 2
+
+        izq = nodo.hijoIzquierdo = self._nuevo_nodo(mitad, direccion_izq)
+        der = nodo.hijoDerecho = self._nuevo_nodo(mitad, direccion_der)
+        izq.padre = nodo
+        der.padre = nodo
+        # nodo.mascara_libres se recalcula al ocupar la hoja (ver _propagar_resumen)
+
+        # Los hijos ocupan el lugar del nodo en la cadena de hojas
+        izq.anterior = nodo.anterior
+        izq.siguiente = der
+        der.anterior = izq
+        der.siguiente = nodo.siguiente
+        if nodo.anterior is not None:
+            nodo.anterior.siguiente = izq
+        else:
+            self._primera = izq
+        if nodo.siguiente is not None:
+            nodo.siguiente.anterior = der
+        nodo.anterior = nodo.siguiente = None
+
+    def _nuevo_nodo(self, tamano: int, direccion: int) -> NodoMemoria:
+        """Nodo del pool reiniciado, o uno nuevo si el pool está vacío"""
+        if self._pool:
+            nodo = self._pool.pop()
+            nodo.reiniciar(tamano, direccion)
+            return nodo
+        return NodoMemoria(tamano, direccion)
+
+    def _retirar(self, izq: NodoMemoria, der: NodoMemoria):
+        """Devuelve al pool los hijos que una fusión sacó del árbol"""
+        pool = self._pool
+        if len(pool) < self.max_pool:
+            # Sin enlaces al árbol ni al proceso: el pool no retiene nada vivo
+            izq.padre = izq.anterior = izq.siguiente = izq.proceso = None
+            der.padre = der.anterior = der.siguiente = der.proceso = None
+            pool.append(izq)
+            pool.append(der)
+
+    # Handles e ids de proceso
+    def id_proceso(self, nombre: str) -> int:
+        """Interna el nombre y devuelve su id compacto"""
+        pid = self._ids.get(nombre)
+        if pid is None:
+            pid = len(self._nombres)
+            nombre = sys.intern(nombre)
+            self._ids[nombre] = pid
+            self._nombres.append(nombre)
+            self._handle_de_pid.append(-1)
+        return pid
+
+    def nombre_proceso(self, pid: int) -> str:
+        return self._nombres[pid]
+
+    def handle_de(self, proceso: Union[str, int]) -> Optional[int]:
+        """Handle vigente de un proceso (por nombre o id), o None"""
+        pid = self._ids.get(proceso) if isinstance(proceso, str) else proceso
+        if pid is None or not (0 <= pid < len(self._handle_de_pid)):
+            return None
+        handle = self._handle_de_pid[pid]
+        return handle if handle >= 0 else None
+
+    def nodo_de(self, handle: int) -> Optional[NodoMemoria]:
+        """Primer (o único) bloque de un handle"""
+        if 0 <= handle < len(self._bloques):
+            return self._bloques[handle]
+        return None
+
+    def nodos_de(self, handle: int) -> List[NodoMemoria]:
+        """Todos los bloques de un handle (varios si la asignación fue dispersa)"""
+        nodo = self.nodo_de(handle)
+        if nodo is None:
+            return []
+        return [nodo, *self._fragmentos.get(handle, ())]
+
+    def fragmentos_de(self, handle: int) -> int:
+        if self.nodo_de(handle) is None:
+            return 0
+        return 1 + len(self._fragmentos.get(handle, ()))
+
+    def _registrar(self, nodo: NodoMemoria, pid: int, handle: Optional[int] = None) -> int:
+        """Asocia un nodo ocupado a un handle (nuevo, o uno dado al restaurar)"""
+        if handle is None:
+            handle = self._handles_libres.pop() if self._handles_libres else len(self._bloques)
+        elif handle < len(self._bloques) and self._bloques[handle] is not None:
+            # Otro fragmento de un handle ya registrado (al restaurar una asignación dispersa)
+            self._registrar_fragmento(nodo, handle)
+            return handle
+        if handle >= len(self._bloques):
+            self._bloques.extend([None] * (handle + 1 - len(self._bloques)))
+        self._bloques[handle] = nodo
+        self._handle_de_pid[pid] = handle
+        nodo.handle = handle
+        nodo.pid = pid
+        nodo.proceso = self._nombres[pid]
+        return handle
+
+    def _registrar_fragmento(self, nodo: NodoMemoria, handle: int):
+        primero = self._bloques[handle]
+        self._fragmentos.setdefault(handle, []).append(nodo)
+        nodo.handle = handle
+        nodo.pid = primero.pid
+        nodo.proceso = primero.proceso
+
+    def _reconstruir_handles_libres(self):
+        self._handles_libres = [h for h in range(len(self._bloques) - 1, -1, -1) if self._bloques[h] is None]
+
+    def asignar_memoria(self, espacio: int, proceso: Optional[str] = None,
+                        vida: Optional[Union[int, str]] = None, *, pid: Optional[int] = None) -> Optional[int]:
+        """Solicita memoria para un proceso (nombre, o pid=id); devuelve su handle o None.
+
+        `vida` (duración esperada en ms, o VIDA_CORTA / VIDA_LARGA; experimental,
+        ver VIDA_CORTA) separa las clases: las largas se agrupan al final de la
+        memoria y las cortas rellenan huecos con el mejor ajuste.
+        """
+        pid = resolver_pid(self, proceso, pid)
+        # Un proceso sólo puede tener un bloque vigente
+        if pid is None or self._handle_de_pid[pid] >= 0:
             return None
-        espacio2 = self.obtener_potencia_requerida(espacio)
-        if espacio2 > self.total:
+        requerido = self.obtener_tamano_requerido(espacio)
+        if requerido > self.total:
             return None
-        nodo = self._asignar(self.raiz, espacio2)
+        if vida is not None:
+            nodo = self._asignar_por_vida(requerido, vida)
+        else:
+            nodo = self._elegir_hoja(requerido)
         if nodo:
-            nodo.ocupado = True
-            nodo.proceso = proceso
-            nodo.tamOcupado = espacio
-            return nodo
+            self._ocupar(nodo, espacio)
+            return self._registrar(nodo, pid)
+        if self.max_fragmentos > 1:
+            return self._asignar_disperso(espacio, pid)
         return None
 
+    def _elegir_hoja(self, espacio2: int) -> Optional[NodoMemoria]:
+        """Hoja libre ya dividida al tamaño requerido según la política, o None"""
+        if self.politica is None:
+            return self._asignar(self.raiz, espacio2)
+        nodo = self.politica.elegir(self, espacio2)
+        if nodo is not None:
+            nodo = self._colocar(nodo, espacio2, self.politica.objetivo)
+        return nodo
+
+    def redimensionar_memoria(self, handle: int, espacio: int) -> bool:
+        """Cambia el tamaño de una asignación conservando su handle.
+
+        Si el nuevo tamaño entra en el bloque actual sólo se ajusta lo ocupado;
+        si no, se busca otro bloque antes de soltar el actual, así que si no hay
+        lugar la asignación queda como estaba. No aplica a asignaciones dispersas.
+        """
+        nodo = self.nodo_de(handle)
+        if nodo is None or espacio <= 0 or handle in self._fragmentos:
+            return False
+        if espacio <= nodo.tamano:
+            self._ocupada += espacio - nodo.tamOcupado
+            self._desperdicio -= espacio - nodo.tamOcupado
+            nodo.tamOcupado = espacio
+            return True
+        requerido = self.obtener_tamano_requerido(espacio)
+        if requerido > self.total:
+            return False
+        nuevo = self._elegir_hoja(requerido)
+        if nuevo is None:
+            return False
+        self._trasladar(nodo, nuevo, espacio)
+        return True
+
+    def _trasladar(self, nodo: NodoMemoria, nuevo: NodoMemoria, espacio: int):
+        """Ocupa `nuevo` con el handle y proceso de `nodo` y libera `nodo`"""
+        self._ocupar(nuevo, espacio)
+        nuevo.handle, nuevo.pid, nuevo.proceso = nodo.handle, nodo.pid, nodo.proceso
+        self._bloques[nodo.handle] = nuevo
+        self._liberar_hoja(nodo)
+
+    def obtener_tamano_requerido(self, espacio: int) -> int:
+        """Tamaño de bloque que se busca para `espacio` (ver la variante ponderada)"""
+        return self.obtener_potencia_requerida(espacio)
+
+    def _bit_de(self, tamano: int) -> int:
+        """Bit de mascara_libres que representa bloques de `tamano` (aquí, el tamaño mismo)"""
+        return tamano
+
+    def _asignar_disperso(self, espacio: int, pid: int) -> Optional[int]:
+        """Reparte la solicitud en varios bloques, tomando primero los de orden más alto.
+
+        Se toman bloques libres enteros de mayor a menor hasta que el resto quepa
+        en uno solo (que se elige por mejor ajuste). Se planifica primero sobre
+        los contadores por orden, así que si no alcanza no se toca el árbol.
+        """
+        if espacio > self._total_libre:
+            return None
+        conteo = self._libres_por_orden[:]
+        orden = len(conteo) - 1
+        completos: List[int] = []
+        resto = espacio
+        while True:
+            requerido = max(self.obtener_potencia_requerida(resto), self.min_bloque)
+            if any(conteo[requerido.bit_length() - 1:]):
+                break
+            if len(completos) + 2 > self.max_fragmentos:
+                return None
+            while orden >= 0 and conteo[orden] == 0:
+                orden -= 1
+            if orden < 0:
+                return None
+            conteo[orden] -= 1
+            completos.append(orden)
+            resto -= 1 << orden
+
+        nodos: List[NodoMemoria] = []
+        for orden in completos:
+            # No queda ningún libre más grande: el extremo izquierdo tiene este tamaño
+            nodo = self._buscar_extremo(self.raiz, 1 << orden)
+            self._ocupar(nodo, nodo.tamano)
+            nodos.append(nodo)
+        nodo = self._colocar(_mejor_ajuste(self.raiz, requerido), requerido)
+        self._ocupar(nodo, resto)
+        nodos.append(nodo)
+
+        handle = self._registrar(nodos[0], pid)
+        for nodo in nodos[1:]:
+            self._registrar_fragmento(nodo, handle)
+        return handle
+
+    def _es_vida_larga(self, vida: Union[int, str]) -> bool:
+        if isinstance(vida, str):
+            return vida == VIDA_LARGA
+        # La frontera sigue a la demanda: "larga" es más de factor_vida_larga veces
+        # el promedio móvil de las vidas pedidas (con vidas parecidas no se separa nada)
+        if self._umbral_vida == 0.0:
+            self._umbral_vida = float(vida)
+        larga = vida > self.factor_vida_larga * self._umbral_vida
+        self._umbral_vida += (vida - self._umbral_vida) / 16
+        return larga
+
+    def _asignar_por_vida(self, espacio2: int, vida: Union[int, str]) -> Optional[NodoMemoria]:
+        """Largas desde el extremo derecho; cortas en el hueco más chico que alcance.
+
+        Las largas quedan agrupadas al final y las cortas rellenan los huecos que
+        dejan otras cortas, así sus buddies se liberan juntos y se pueden fusionar.
+        Con la carga del Simulador (fraccion_larga=0.2) no rechaza menos que el
+        mejor ajuste sin vida, que es lo que usan las cortas.
+        """
+        bit = self._bit_de(espacio2)
+        if self._es_vida_larga(vida):
+            nodo = self._buscar_extremo(self.raiz, bit, derecha=True)
+            objetivo = self.total - 1
+        else:
+            nodo = _mejor_ajuste(self.raiz, bit)
+            objetivo = 0
+        if nodo is None:
+            return None
+        return self._colocar(nodo, espacio2, objetivo)
+
+    def _ocupar(self, nodo: NodoMemoria, espacio: int):
+        """Marca una hoja libre como ocupada y actualiza los contadores"""
+        nodo.ocupado = True
+        nodo.tamOcupado = espacio
+        self._libres_por_orden[nodo.tamano.bit_length() - 1] -= 1
+        self._total_libre -= nodo.tamano
+        self._ocupada += espacio
+        self._desperdicio += nodo.tamano - espacio
+        nodo.mascara_libres = 0
+        self._propagar_resumen(nodo)
+
+    def _propagar_resumen(self, nodo: NodoMemoria):
+        """Recalcula mascara_libres de los ancestros hasta que deje de cambiar"""
+        n = nodo.padre
+        while n is not None:
+            mascara = n.hijoIzquierdo.mascara_libres | n.hijoDerecho.mascara_libres
+            if mascara == n.mascara_libres:
+                return
+            n.mascara_libres = mascara
+            n = n.padre
+
     def _asignar(self, nodo: NodoMemoria, espacio2: int) -> Optional[NodoMemoria]:
-        # Si ocupado, no se puede usar
-        if nodo.ocupado:
+        # Si ocupado o sin ningún bloque libre suficiente en el subárbol, no se puede usar
+        # (-espacio2 deja sólo los bits >= espacio2, que es potencia de 2)
+        if nodo.ocupado or not (nodo.mascara_libres & -espacio2):
             return None
 
         # Si tiene hijos, intentar abajo
@@ -81,22 +414,53 @@ class SistemaBuddy:
             # No podemos dividir más por restricción de mínimo; asignar este bloque completo
             return nodo
 
-    def liberar_memoria(self, proceso: str) -> bool:
-        nodo = self._buscar_nodo(self.raiz, proceso)
+    def _colocar(self, nodo: NodoMemoria, espacio2: int, objetivo: int = 0) -> NodoMemoria:
+        """Divide una hoja libre hasta el tamaño requerido, bajando hacia `objetivo`"""
+        while nodo.tamano // 2 >= max(espacio2, self.min_bloque):
+            self._dividir(nodo)
+            nodo = nodo.hijoIzquierdo if objetivo < nodo.hijoDerecho.direccion else nodo.hijoDerecho
+        return nodo
+
+    def _buscar_extremo(self, nodo: NodoMemoria, espacio2: int, derecha: bool = False) -> Optional[NodoMemoria]:
+        """Hoja libre >= espacio2 más a la izquierda (o derecha) del subárbol, en O(log n)"""
+        if not (nodo.mascara_libres & -espacio2):
+            return None
+        while not nodo.es_hoja():
+            primero, segundo = ((nodo.hijoDerecho, nodo.hijoIzquierdo) if derecha
+                                else (nodo.hijoIzquierdo, nodo.hijoDerecho))
+            nodo = primero if primero.mascara_libres & -espacio2 else segundo
+        return nodo
+
+    def liberar_memoria(self, proceso: Optional[str] = None, *, handle: Optional[int] = None) -> bool:
+        """Libera por nombre de proceso o por handle="""
+        handle = resolver_handle(self, proceso, handle)
+        if handle is None:
+            return False
+        nodo = self.nodo_de(handle)
         if not nodo:
             return False
+        self._bloques[handle] = None
+        self._handles_libres.append(handle)
+        self._handle_de_pid[nodo.pid] = -1
+        self._liberar_hoja(nodo)
+        if self._fragmentos:
+            for fragmento in self._fragmentos.pop(handle, ()):
+                self._liberar_hoja(fragmento)
+        return True
+
+    def _liberar_hoja(self, nodo: NodoMemoria):
+        """Devuelve una hoja ocupada a libre y la fusiona con su buddy si se puede"""
+        self._libres_por_orden[nodo.tamano.bit_length() - 1] += 1
+        self._total_libre += nodo.tamano
+        self._ocupada -= nodo.tamOcupado
+        self._desperdicio -= nodo.tamano - nodo.tamOcupado
         nodo.ocupado = False
         nodo.proceso = None
         nodo.tamOcupado = 0
+        nodo.pid = -1
+        nodo.handle = -1
+        nodo.mascara_libres = nodo.tamano
         self._fusionar(nodo)
-        return True
-
-    def _buscar_nodo(self, nodo: Optional[NodoMemoria], proceso: str) -> Optional[NodoMemoria]:
-        if nodo is None:
-            return None
-        if nodo.proceso == proceso:
-            return nodo
-        return self._buscar_nodo(nodo.hijoIzquierdo, proceso) or self._buscar_nodo(nodo.hijoDerecho, proceso)
 
     def _fusionar(self, nodo: NodoMemoria):
         padre = nodo.padre
@@ -108,11 +472,28 @@ class SistemaBuddy:
                 padre.hijoIzquierdo = None
                 padre.hijoDerecho = None
                 padre.ocupado = False
+                orden = padre.tamano.bit_length() - 1
+                self._libres_por_orden[orden - 1] -= 2
+                self._libres_por_orden[orden] += 1
+                # El padre vuelve a la cadena de hojas en lugar de sus hijos
+                padre.anterior = izq.anterior
+                padre.siguiente = der.siguiente
+                if izq.anterior is not None:
+                    izq.anterior.siguiente = padre
+                else:
+                    self._primera = padre
+                if der.siguiente is not None:
+                    der.siguiente.anterior = padre
+                padre.mascara_libres = padre.tamano
+                self._retirar(izq, der)
                 self._fusionar(padre)
+                return
+        # Ya no hay más que fusionar: actualizar los resúmenes hacia arriba
+        self._propagar_resumen(nodo)
 
     def memoria_desperdiciada(self, nodo: Optional[NodoMemoria] = None) -> int:
         if nodo is None:
-            nodo = self.raiz
+            return self._desperdicio
         desperdicio = 0
         if nodo.ocupado:
             desperdicio += (nodo.tamano - nodo.tamOcupado)
@@ -126,32 +507,41 @@ class SistemaBuddy:
     def hojas_en_orden(self) -> List[NodoMemoria]:
         """Retorna la lista de bloques hoja de izquierda a derecha"""
         hojas: List[NodoMemoria] = []
-
-        def _inorden(n: Optional[NodoMemoria]):
-            if n is None:
-                return
-            if n.es_hoja():
-                hojas.append(n)
-            else:
-                _inorden(n.hijoIzquierdo)
-                _inorden(n.hijoDerecho)
-        _inorden(self.raiz)
+        n = self._primera
+        while n is not None:
+            hojas.append(n)
+            n = n.siguiente
         return hojas
 
+    def como_arreglo(self):
+        """Disposición de memoria como arreglo estructurado de NumPy (ver disposicion.py)"""
+        from disposicion import como_arreglo
+        return como_arreglo(self)
+
+    def bloque_en(self, direccion: int) -> Optional[NodoMemoria]:
+        """Hoja que contiene la dirección dada (O(log n))"""
+        if not (0 <= direccion < self.total):
+            return None
+        n = self.raiz
+        while not n.es_hoja():
+            n = n.hijoIzquierdo if direccion < n.hijoDerecho.direccion else n.hijoDerecho
+        return n
+
+    def bloques_en_rango(self, inicio: int, fin: int) -> List[NodoMemoria]:
+        """Hojas que se solapan con [inicio, fin), en O(log n + k)"""
+        bloques: List[NodoMemoria] = []
+        n = self.bloque_en(max(0, inicio))
+        while n is not None and n.direccion < fin:
+            bloques.append(n)
+            n = n.siguiente
+        return bloques
+
     def procesos_vigentes(self) -> List[str]:
-        vistos = set()
-        nombres: List[str] = []
+        nombres = self._nombres
+        return sorted(nombres[pid] for pid, h in enumerate(self._handle_de_pid) if h >= 0)
 
-        def _rec(n: Optional[NodoMemoria]):
-            if n is None:
-                return
-            if n.ocupado and n.proceso and n.proceso not in vistos:
-                vistos.add(n.proceso)
-                nombres.append(n.proceso)
-            _rec(n.hijoIzquierdo)
-            _rec(n.hijoDerecho)
-        _rec(self.raiz)
-        return sorted(nombres)
+    def num_procesos_vigentes(self) -> int:
+        return len(self._bloques) - len(self._handles_libres)
 
     def obtener_buddy_address(self, direccion: int, tamano: int) -> int:
         """Calcula la dirección del buddy de un bloque"""
@@ -160,7 +550,7 @@ class SistemaBuddy:
 
     def memoria_ocupada(self, nodo: Optional[NodoMemoria] = None) -> int:
         if nodo is None:
-            nodo = self.raiz
+            return self._ocupada
         ocupado = 0
         if nodo.ocupado:
             ocupado += nodo.tamOcupado  # sumar solo lo realmente usado
@@ -171,4 +561,28 @@ class SistemaBuddy:
         return ocupado
 
     def memoria_disponible(self) -> int:
-        return self.total - self.memoria_ocupada()
\ No newline at end of file
+        return self.total - self.memoria_ocupada()
+
+    # Fragmentación externa (todas O(número de órdenes), mantenidas incrementalmente)
+    def memoria_libre(self) -> int:
+        """Suma de los bloques libres (sin contar el desperdicio interno)"""
+        return self._total_libre
+
+    def mayor_bloque_libre(self) -> int:
+        mascara = self.raiz.mascara_libres
+        return 1 << (mascara.bit_length() - 1) if mascara else 0
+
+    def histograma_libres(self) -> Dict[int, int]:
+        """Cantidad de bloques libres por tamaño de bloque"""
+        return {1 << orden: n for orden, n in enumerate(self._libres_por_orden) if n}
+
+    def indice_fragmentacion_externa(self) -> float:
+        """1 - mayor_libre / total_libre (0 = toda la memoria libre es contigua)"""
+        if self._total_libre == 0:
+            return 0.0
+        return 1.0 - self.mayor_bloque_libre() / self._total_libre
+
+    def cabe(self, tamano: int) -> bool:
+        """¿Tendría éxito ahora una solicitud de este tamaño?"""
+        requerido = max(self.obtener_potencia_requerida(tamano), self.min_bloque)
+        return requerido <= self.mayor_bloque_libre()
@@ -1,11 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass
 from typing import Optional, List, Tuple
 
 class NodoMemoria:
+    # Sin __dict__ por instancia: 136 B por nodo en lugar de 184 (bench_nodos.py).
+    # No es más rápido por sí solo; la velocidad la da el pool de SistemaBuddy
+    __slots__ = ("proceso", "pid", "handle", "ocupado", "tamano", "tamOcupado", "padre",
+                 "hijoIzquierdo", "hijoDerecho", "direccion", "mascara_libres", "anterior", "siguiente")
+
     def __init__(self, tamano: int, direccion: int = 0):
         # Cada nodo representa un bloque de memoria
-        self.proceso: Optional[str] = None      # Nombre del proceso que ocupa este bloque
+        self.proceso: Optional[str] = None      # Nombre del proceso que ocupa este bloque (internado)
+        self.pid: int = -1                      # Id compacto del proceso (-1 = libre)
+        self.handle: int = -1                   # Handle devuelto por asignar_memoria (-1 = libre)
         self.ocupado: bool = False              # Indica si el bloque está en uso
         self.tamano: int = tamano               # Tamaño del bloque (potencia de 2)
         self.tamOcupado: int = 0                # Tamaño real solicitado (para calcular desperdicio)
@@ -13,6 +19,15 @@ class NodoMemoria:
         self.hijoIzquierdo: Optional[NodoMemoria] = None
         self.hijoDerecho: Optional[NodoMemoria] = None
         self.direccion: int = direccion         # Dirección base del bloque (para identificar buddies)
+        # Resumen del subárbol: OR de los tamaños de sus hojas libres (bit k = hay
+        # un bloque libre de 2**k). Permite buscar bloques en O(log n).
+        self.mascara_libres: int = tamano
+        # Cadena de hojas en orden de dirección (sólo válida mientras el nodo es hoja)
+        self.anterior: Optional[NodoMemoria] = None
+        self.siguiente: Optional[NodoMemoria] = None
+
+    # Un nodo retirado del árbol vuelve a usarse como uno nuevo (ver SistemaBuddy._nuevo_nodo)
+    reiniciar = __init__
 
     def es_hoja(self) -> bool:
         return self.hijoIzquierdo is None and self.hijoDerecho is None
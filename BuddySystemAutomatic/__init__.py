@@ -0,0 +1,11 @@
+# Los módulos de esta carpeta se importan entre sí por nombre plano
+# (from NodoMemoria import NodoMemoria), como scripts. Al usarla como paquete
+# (python -m BuddySystemAutomatic, o import BuddySystemAutomatic desde otro
+# directorio) se agrega la carpeta al path para que esos imports resuelvan
+# sin depender del directorio de trabajo.
+import os as _os
+import sys as _sys
+
+_CARPETA = _os.path.dirname(_os.path.abspath(__file__))
+if _CARPETA not in _sys.path:
+    _sys.path.insert(0, _CARPETA)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Punto de entrada sin GUI: simulaciones, reproducción de trazas y benchmarks.
+Nunca importa Qt, y cada subcomando importa sólo lo que usa, así el arranque
+queda en decenas de milisegundos y se pueden lanzar miles de corridas cortas.
+
+Ejecutar (desde la raíz del repositorio, o desde cualquier lado con el repo en PYTHONPATH):
+    python -m BuddySystemAutomatic simular --procesos 200 --total-kb 4096 --semilla 1
+    python -m BuddySystemAutomatic simular --semillas 1000 --motor tlsf --json
+    python -m BuddySystemAutomatic reproducir traza.csv --politica mejor_ajuste
+    python -m BuddySystemAutomatic simular --procesos 5000 --perfil perfiles --muestreo-ms 1
+    python -m BuddySystemAutomatic bench comparar --motores buddy tlsf
+"""
+import argparse
+import os
+import sys
+
+# Benchmarks disponibles: nombre -> módulo con main()
+BENCHMARKS = {
+    "comparar": "comparar",
+    "barrido": "barrido",
+    "ponderado": "bench_ponderado",
+    "disperso": "bench_disperso",
+    "compartido": "bench_compartido",
+    "diario": "bench_diario",
+    "carga": "carga",
+    "montecarlo": "montecarlo",
+    "expropiacion": "bench_expropiacion",
+    "nodos": "bench_nodos",
+}
+
+
+def _crear_sistema(args):
+    from asignadores import crear_asignador, nombres_motores
+    if args.motor not in nombres_motores():
+        sys.exit(f"motor desconocido: {args.motor} (opciones: {', '.join(nombres_motores())})")
+    sistema = crear_asignador(args.motor, args.total_kb * 1024, args.min_kb * 1024)
+    if args.politica:
+        from politicas import POLITICAS
+        if args.politica not in POLITICAS or not hasattr(sistema, "politica"):
+            sys.exit(f"política no aplicable: {args.politica} (opciones: {', '.join(POLITICAS)})")
+        sistema.politica = POLITICAS[args.politica]()
+    return sistema
+
+
+def _imprimir(resultado: dict, como_json: bool):
+    if como_json:
+        import json
+        print(json.dumps(resultado, ensure_ascii=False))
+    else:
+        for clave, valor in resultado.items():
+            print(f"{clave:<34}{valor:.4f}" if isinstance(valor, float) else f"{clave:<34}{valor}")
+
+
+def _perfilador(args, nombre: str, sistema):
+    """Perfilador de la corrida (ver perfilado.py) ya instrumentado e iniciado, o None"""
+    if not args.perfil:
+        return None
+    from perfilado import Perfilador
+    perfil = Perfilador(args.perfil, nombre, args.muestreo_ms)
+    perfil.instrumentar(sistema)
+    perfil.iniciar()
+    return perfil
+
+
+def _cerrar_perfil(perfil):
+    if perfil is not None:
+        # stderr: la salida normal (p. ej. --json) no cambia
+        print(*perfil.detener(), sep="\n", file=sys.stderr)
+
+
+def cmd_simular(args):
+    from simulator import simular
+    for k in range(args.semillas):
+        semilla = args.semilla + k
+        sistema = _crear_sistema(args)
+        perfil = _perfilador(args, f"simular-{args.motor}-s{semilla}", sistema)
+        sim = simular(sistema, args.procesos, semilla=semilla, verbose=args.verbose,
+                      fraccion_larga=args.fraccion_larga)
+        _cerrar_perfil(perfil)
+        resumen = sim.resumen()
+        if args.semillas > 1:
+            resumen = {"semilla": semilla, **resumen}
+        _imprimir(resumen, args.json)
+
+
+def cmd_reproducir(args):
+    from traza import cargar_traza, reproducir
+    traza = cargar_traza(args.traza, args.semilla)
+    sistema = _crear_sistema(args)
+    perfil = _perfilador(args, f"reproducir-{args.motor}", sistema)
+    resultado = reproducir(sistema, traza)
+    _cerrar_perfil(perfil)
+    _imprimir(resultado, args.json)
+
+
+def cmd_bench(args):
+    import importlib
+    modulo = importlib.import_module(BENCHMARKS[args.nombre])
+    # Cada benchmark lee sus propias opciones de sys.argv
+    sys.argv = [f"{args.nombre}", *args.argumentos]
+    modulo.main()
+
+
+def _opciones_sistema(parser: argparse.ArgumentParser):
+    parser.add_argument("--motor", default="buddy", help="ver asignadores.nombres_motores()")
+    parser.add_argument("--politica", help="política de colocación (motores buddy)")
+    parser.add_argument("--total-kb", type=int, default=4096)
+    parser.add_argument("--min-kb", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="una línea JSON por corrida")
+    muestreo = os.environ.get("BUDDY_PERFIL_MUESTREO")
+    parser.add_argument("--perfil", metavar="DIR", default=os.environ.get("BUDDY_PERFIL"),
+                        help="perfilar por fases y escribir .folded y .txt en DIR (o BUDDY_PERFIL)")
+    parser.add_argument("--muestreo-ms", type=float, default=float(muestreo) if muestreo else None,
+                        help="con --perfil: muestrear por señales cada tantos ms de CPU (o BUDDY_PERFIL_MUESTREO)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m BuddySystemAutomatic",
+                                     description="Buddy System sin GUI")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("simular", aliases=["simulate"], help="correr el Simulador con reloj simulado")
+    _opciones_sistema(p)
+    p.add_argument("--procesos", type=int, default=200)
+    p.add_argument("--semillas", type=int, default=1, help="corridas con semillas consecutivas")
+    p.add_argument("--fraccion-larga", type=float, default=0.0,
+                   help="fracción de procesos que viven 10-30 s en vez de 2-3 s")
+    p.add_argument("--verbose", action="store_true")
+    p.set_defaults(funcion=cmd_simular)
+
+    p = sub.add_parser("reproducir", aliases=["replay"], help="reproducir una traza CSV o procesos.json")
+    p.add_argument("traza")
+    _opciones_sistema(p)
+    p.set_defaults(funcion=cmd_reproducir)
+
+    p = sub.add_parser("bench", help="correr un benchmark (el resto de los argumentos pasa al benchmark)")
+    p.add_argument("nombre", choices=sorted(BENCHMARKS))
+    p.add_argument("argumentos", nargs=argparse.REMAINDER)
+    p.set_defaults(funcion=cmd_bench)
+
+    args = parser.parse_args(argv)
+    args.funcion(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,497 @@
+from __future__ import annotations
+from typing import Optional, List, Dict, Tuple, Union, Callable, Protocol, runtime_checkable
+import sys
+
+from NodoMemoria import NodoMemoria
+
+# =========================
+#   PROTOCOLO COMÚN DE ASIGNADORES
+# =========================
+#
+# Lo que el Simulador, traza.reproducir, RegistradorSeries y MemoriaView usan
+# de un asignador. SistemaBuddy, SistemaBuddyPonderado, SistemaBuddyDisperso y
+# los asignadores de lista libre de este módulo lo cumplen, así que se pueden
+# comparar con las mismas trazas (ver comparar.py).
+#
+# Un proceso se indica por nombre (posicional) o por un entero con nombre: el id
+# de proceso como asignar_memoria(espacio, pid=...) y el handle como
+# liberar_memoria(handle=...). Un entero posicional lanza TypeError, así un id
+# nunca se toma por handle (ni al revés) en silencio.
+
+
+@runtime_checkable
+class Asignador(Protocol):
+    total: int
+    min_bloque: int
+
+    def id_proceso(self, nombre: str) -> int: ...
+    def nombre_proceso(self, pid: int) -> str: ...
+    def handle_de(self, proceso: Union[str, int]) -> Optional[int]: ...
+    def asignar_memoria(self, espacio: int, proceso: Optional[str] = None,
+                        vida: Optional[Union[int, str]] = None, *, pid: Optional[int] = None) -> Optional[int]: ...
+    def liberar_memoria(self, proceso: Optional[str] = None, *, handle: Optional[int] = None) -> bool: ...
+    def nodo_de(self, handle: int) -> Optional[NodoMemoria]: ...
+    def nodos_de(self, handle: int) -> List[NodoMemoria]: ...
+    def fragmentos_de(self, handle: int) -> int: ...
+    def hojas_en_orden(self) -> List[NodoMemoria]: ...
+    def como_arreglo(self): ...
+    def bloque_en(self, direccion: int) -> Optional[NodoMemoria]: ...
+    def bloques_en_rango(self, inicio: int, fin: int) -> List[NodoMemoria]: ...
+    def obtener_buddy_address(self, direccion: int, tamano: int) -> int: ...
+    def procesos_vigentes(self) -> List[str]: ...
+    def num_procesos_vigentes(self) -> int: ...
+    def memoria_ocupada(self) -> int: ...
+    def memoria_desperdiciada(self) -> int: ...
+    def memoria_disponible(self) -> int: ...
+    def memoria_libre(self) -> int: ...
+    def mayor_bloque_libre(self) -> int: ...
+    def histograma_libres(self) -> Dict[int, int]: ...
+    def indice_fragmentacion_externa(self) -> float: ...
+    def cabe(self, tamano: int) -> bool: ...
+
+
+def resolver_pid(sistema, proceso: Optional[str], pid: Optional[int]) -> Optional[int]:
+    """Id de proceso de asignar_memoria, o None si no asigna (nombre vacío o id no internado)"""
+    if pid is None:
+        if not isinstance(proceso, str):
+            raise TypeError("asignar_memoria: el proceso va por nombre; un id de proceso va como pid=")
+        return sistema.id_proceso(proceso) if proceso else None
+    if proceso is not None:
+        raise TypeError("asignar_memoria: nombre o pid=, no ambos")
+    # Sólo ids ya internados con id_proceso (un id desconocido no asigna)
+    return pid if 0 <= pid < len(sistema._handle_de_pid) else None
+
+
+def resolver_handle(sistema, proceso: Optional[str], handle: Optional[int]) -> Optional[int]:
+    """Handle de liberar_memoria (por nombre o handle=), o None si el proceso no tiene bloque"""
+    if handle is None:
+        if not isinstance(proceso, str):
+            raise TypeError("liberar_memoria: el proceso va por nombre; un handle va como handle=")
+        return sistema.handle_de(proceso)
+    if proceso is not None:
+        raise TypeError("liberar_memoria: nombre o handle=, no ambos")
+    return handle
+
+
+# =========================
+#   ASIGNADORES DE LISTA LIBRE
+# =========================
+#
+# La memoria es una cadena de segmentos contiguos (NodoMemoria sin hijos,
+# enlazados por anterior/siguiente como la cadena de hojas del buddy). Asignar
+# parte un segmento libre; liberar lo fusiona con sus vecinos libres. min_bloque
+# es la granularidad: las solicitudes se redondean a un múltiplo suyo y ése es
+# todo el desperdicio interno. Las subclases sólo deciden qué segmento libre usar.
+
+
+class AsignadorListaLibre:
+    nombre = "base"
+
+    def __init__(self, tamano_total: int = 1024, tam_min_bloque: int = 1):
+        self.min_bloque = max(1, tam_min_bloque)
+        self.total = max(self.min_bloque, tamano_total - tamano_total % self.min_bloque)
+        self.politica = None
+        self.max_fragmentos = 1
+
+        self._ids: Dict[str, int] = {}
+        self._nombres: List[str] = []
+        self._handle_de_pid: List[int] = []
+        self._bloques: List[Optional[NodoMemoria]] = []
+        self._handles_libres: List[int] = []
+
+        self._total_libre = self.total
+        self._ocupada = 0
+        self._desperdicio = 0
+
+        self._primera = NodoMemoria(self.total, 0)
+        self._crear_listas()
+        self._insertar_libre(self._primera)
+
+    # --------- Lo que define cada estrategia ---------
+    def _crear_listas(self):
+        pass
+
+    def _insertar_libre(self, nodo: NodoMemoria):
+        pass
+
+    def _quitar_libre(self, nodo: NodoMemoria):
+        pass
+
+    def _buscar(self, tam: int) -> Optional[NodoMemoria]:
+        raise NotImplementedError
+
+    def _al_absorber(self, absorbido: NodoMemoria, nodo: NodoMemoria):
+        """`absorbido` desapareció al fusionarse dentro de `nodo`"""
+
+    def _libres(self):
+        n = self._primera
+        while n is not None:
+            if not n.ocupado:
+                yield n
+            n = n.siguiente
+
+    # --------- Handles e ids de proceso ---------
+    def id_proceso(self, nombre: str) -> int:
+        """Interna el nombre y devuelve su id compacto"""
+        pid = self._ids.get(nombre)
+        if pid is None:
+            pid = len(self._nombres)
+            nombre = sys.intern(nombre)
+            self._ids[nombre] = pid
+            self._nombres.append(nombre)
+            self._handle_de_pid.append(-1)
+        return pid
+
+    def nombre_proceso(self, pid: int) -> str:
+        return self._nombres[pid]
+
+    def handle_de(self, proceso: Union[str, int]) -> Optional[int]:
+        pid = self._ids.get(proceso) if isinstance(proceso, str) else proceso
+        if pid is None or not (0 <= pid < len(self._handle_de_pid)):
+            return None
+        handle = self._handle_de_pid[pid]
+        return handle if handle >= 0 else None
+
+    def nodo_de(self, handle: int) -> Optional[NodoMemoria]:
+        if 0 <= handle < len(self._bloques):
+            return self._bloques[handle]
+        return None
+
+    def nodos_de(self, handle: int) -> List[NodoMemoria]:
+        nodo = self.nodo_de(handle)
+        return [nodo] if nodo is not None else []
+
+    def fragmentos_de(self, handle: int) -> int:
+        return 1 if self.nodo_de(handle) is not None else 0
+
+    # --------- Asignar y liberar ---------
+    def _redondear(self, espacio: int) -> int:
+        return max(self.min_bloque, -(-espacio // self.min_bloque) * self.min_bloque)
+
+    def asignar_memoria(self, espacio: int, proceso: Optional[str] = None,
+                        vida: Optional[Union[int, str]] = None, *, pid: Optional[int] = None) -> Optional[int]:
+        """Solicita memoria para un proceso (nombre, o pid=id); devuelve su handle o None"""
+        pid = resolver_pid(self, proceso, pid)
+        if pid is None or self._handle_de_pid[pid] >= 0:
+            return None
+        tam = self._redondear(espacio)
+        if tam > self._total_libre:
+            return None
+        nodo = self._buscar(tam)
+        if nodo is None:
+            return None
+        self._quitar_libre(nodo)
+        if nodo.tamano > tam:
+            # El resto queda como un segmento libre a continuación
+            resto = NodoMemoria(nodo.tamano - tam, nodo.direccion + tam)
+            resto.anterior = nodo
+            resto.siguiente = nodo.siguiente
+            if nodo.siguiente is not None:
+                nodo.siguiente.anterior = resto
+            nodo.siguiente = resto
+            nodo.tamano = tam
+            self._insertar_libre(resto)
+        nodo.ocupado = True
+        nodo.tamOcupado = espacio
+        self._total_libre -= tam
+        self._ocupada += espacio
+        self._desperdicio += tam - espacio
+
+        handle = self._handles_libres.pop() if self._handles_libres else len(self._bloques)
+        if handle == len(self._bloques):
+            self._bloques.append(None)
+        self._bloques[handle] = nodo
+        self._handle_de_pid[pid] = handle
+        nodo.handle = handle
+        nodo.pid = pid
+        nodo.proceso = self._nombres[pid]
+        return handle
+
+    def liberar_memoria(self, proceso: Optional[str] = None, *, handle: Optional[int] = None) -> bool:
+        """Libera por nombre de proceso o por handle="""
+        handle = resolver_handle(self, proceso, handle)
+        if handle is None:
+            return False
+        nodo = self.nodo_de(handle)
+        if not nodo:
+            return False
+        self._bloques[handle] = None
+        self._handles_libres.append(handle)
+        self._handle_de_pid[nodo.pid] = -1
+        self._total_libre += nodo.tamano
+        self._ocupada -= nodo.tamOcupado
+        self._desperdicio -= nodo.tamano - nodo.tamOcupado
+        nodo.ocupado = False
+        nodo.proceso = None
+        nodo.tamOcupado = 0
+        nodo.pid = -1
+        nodo.handle = -1
+
+        # Fusionar con los vecinos libres
+        siguiente = nodo.siguiente
+        if siguiente is not None and not siguiente.ocupado:
+            self._quitar_libre(siguiente)
+            nodo.tamano += siguiente.tamano
+            nodo.siguiente = siguiente.siguiente
+            if siguiente.siguiente is not None:
+                siguiente.siguiente.anterior = nodo
+            self._al_absorber(siguiente, nodo)
+        anterior = nodo.anterior
+        if anterior is not None and not anterior.ocupado:
+            self._quitar_libre(anterior)
+            anterior.tamano += nodo.tamano
+            anterior.siguiente = nodo.siguiente
+            if nodo.siguiente is not None:
+                nodo.siguiente.anterior = anterior
+            self._al_absorber(nodo, anterior)
+            nodo = anterior
+        self._insertar_libre(nodo)
+        return True
+
+    # --------- Consultas ---------
+    def hojas_en_orden(self) -> List[NodoMemoria]:
+        hojas: List[NodoMemoria] = []
+        n = self._primera
+        while n is not None:
+            hojas.append(n)
+            n = n.siguiente
+        return hojas
+
+    def como_arreglo(self):
+        """Disposición de memoria como arreglo estructurado de NumPy (ver disposicion.py)"""
+        from disposicion import como_arreglo
+        return como_arreglo(self)
+
+    def bloque_en(self, direccion: int) -> Optional[NodoMemoria]:
+        """Segmento que contiene la dirección (O(n): recorre la cadena)"""
+        if not (0 <= direccion < self.total):
+            return None
+        n = self._primera
+        while n.direccion + n.tamano <= direccion:
+            n = n.siguiente
+        return n
+
+    def bloques_en_rango(self, inicio: int, fin: int) -> List[NodoMemoria]:
+        bloques: List[NodoMemoria] = []
+        n = self.bloque_en(max(0, inicio))
+        while n is not None and n.direccion < fin:
+            bloques.append(n)
+            n = n.siguiente
+        return bloques
+
+    def obtener_buddy_address(self, direccion: int, tamano: int) -> int:
+        """Sin buddies: cada segmento es su propio grupo (para MemoriaView)"""
+        return direccion
+
+    def procesos_vigentes(self) -> List[str]:
+        nombres = self._nombres
+        return sorted(nombres[pid] for pid, h in enumerate(self._handle_de_pid) if h >= 0)
+
+    def num_procesos_vigentes(self) -> int:
+        return len(self._bloques) - len(self._handles_libres)
+
+    def memoria_ocupada(self) -> int:
+        return self._ocupada
+
+    def memoria_desperdiciada(self) -> int:
+        return self._desperdicio
+
+    def memoria_disponible(self) -> int:
+        return self.total - self._ocupada
+
+    def memoria_libre(self) -> int:
+        return self._total_libre
+
+    def mayor_bloque_libre(self) -> int:
+        return max((n.tamano for n in self._libres()), default=0)
+
+    def histograma_libres(self) -> Dict[int, int]:
+        histograma: Dict[int, int] = {}
+        for n in self._libres():
+            histograma[n.tamano] = histograma.get(n.tamano, 0) + 1
+        return histograma
+
+    def indice_fragmentacion_externa(self) -> float:
+        if self._total_libre == 0:
+            return 0.0
+        return 1.0 - self.mayor_bloque_libre() / self._total_libre
+
+    def cabe(self, tamano: int) -> bool:
+        return self._redondear(tamano) <= self.mayor_bloque_libre()
+
+
+class PrimerAjuste(AsignadorListaLibre):
+    """First-fit: el primer segmento libre (por dirección) que alcance"""
+    nombre = "primer_ajuste"
+
+    def _buscar(self, tam: int) -> Optional[NodoMemoria]:
+        n = self._primera
+        while n is not None:
+            if not n.ocupado and n.tamano >= tam:
+                return n
+            n = n.siguiente
+        return None
+
+
+class SiguienteAjuste(AsignadorListaLibre):
+    """Next-fit: como first-fit, pero sigue desde donde quedó la búsqueda anterior"""
+    nombre = "siguiente_ajuste"
+
+    def _crear_listas(self):
+        self._cursor: Optional[NodoMemoria] = None
+
+    def _buscar(self, tam: int) -> Optional[NodoMemoria]:
+        inicio = self._cursor or self._primera
+        n = inicio
+        while True:
+            if not n.ocupado and n.tamano >= tam:
+                # La próxima búsqueda arranca aquí (sigue por el resto que quede libre)
+                self._cursor = n
+                return n
+            n = n.siguiente or self._primera
+            if n is inicio:
+                return None
+
+    def _al_absorber(self, absorbido: NodoMemoria, nodo: NodoMemoria):
+        if self._cursor is absorbido:
+            self._cursor = nodo
+
+
+class AjusteSegregado(AsignadorListaLibre):
+    """Segregated-fit: una lista libre por clase de tamaño (potencias de 2 de min_bloque)"""
+    nombre = "segregado"
+
+    def _crear_listas(self):
+        clases = (self.total // self.min_bloque).bit_length()
+        # Diccionarios dirección -> nodo: quitar de la lista es O(1)
+        self._listas: List[Dict[int, NodoMemoria]] = [{} for _ in range(clases)]
+        self._mapa = 0  # bit c = la clase c tiene algún segmento libre
+
+    def _clase(self, tam: int) -> int:
+        return (tam // self.min_bloque).bit_length() - 1
+
+    def _insertar_libre(self, nodo: NodoMemoria):
+        c = self._clase(nodo.tamano)
+        self._listas[c][nodo.direccion] = nodo
+        self._mapa |= 1 << c
+
+    def _quitar_libre(self, nodo: NodoMemoria):
+        c = self._clase(nodo.tamano)
+        lista = self._listas[c]
+        del lista[nodo.direccion]
+        if not lista:
+            self._mapa &= ~(1 << c)
+
+    def _buscar(self, tam: int) -> Optional[NodoMemoria]:
+        c = self._clase(tam)
+        # En la propia clase puede haber segmentos más chicos que tam
+        for nodo in self._listas[c].values():
+            if nodo.tamano >= tam:
+                return nodo
+        # En cualquier clase mayor sirve el primero
+        mayores = self._mapa >> (c + 1)
+        if not mayores:
+            return None
+        c += (mayores & -mayores).bit_length()
+        return next(iter(self._listas[c].values()))
+
+    def mayor_bloque_libre(self) -> int:
+        if not self._mapa:
+            return 0
+        return max(n.tamano for n in self._listas[self._mapa.bit_length() - 1].values())
+
+
+# TLSF: primer nivel = potencia de 2, segundo nivel = 2^SL_BITS subdivisiones lineales
+SL_BITS = 4
+SL_CANTIDAD = 1 << SL_BITS
+
+
+def _mapear(unidades: int) -> Tuple[int, int]:
+    """(primer nivel, segundo nivel) de la lista donde se guarda un segmento libre"""
+    if unidades < SL_CANTIDAD:
+        return 0, unidades
+    fl = unidades.bit_length() - 1
+    return fl - SL_BITS + 1, (unidades >> (fl - SL_BITS)) - SL_CANTIDAD
+
+
+def _bit_bajo(x: int) -> int:
+    return (x & -x).bit_length() - 1
+
+
+class TLSF(AsignadorListaLibre):
+    """Two-Level Segregated Fit: búsqueda O(1) con dos niveles de mapas de bits"""
+    nombre = "tlsf"
+
+    def _crear_listas(self):
+        self._listas: Dict[Tuple[int, int], Dict[int, NodoMemoria]] = {}
+        self._mapa_fl = 0
+        self._mapa_sl: Dict[int, int] = {}
+
+    def _insertar_libre(self, nodo: NodoMemoria):
+        fl, sl = _mapear(nodo.tamano // self.min_bloque)
+        self._listas.setdefault((fl, sl), {})[nodo.direccion] = nodo
+        self._mapa_sl[fl] = self._mapa_sl.get(fl, 0) | (1 << sl)
+        self._mapa_fl |= 1 << fl
+
+    def _quitar_libre(self, nodo: NodoMemoria):
+        fl, sl = _mapear(nodo.tamano // self.min_bloque)
+        lista = self._listas[(fl, sl)]
+        del lista[nodo.direccion]
+        if not lista:
+            self._mapa_sl[fl] &= ~(1 << sl)
+            if not self._mapa_sl[fl]:
+                self._mapa_fl &= ~(1 << fl)
+
+    def _buscar(self, tam: int) -> Optional[NodoMemoria]:
+        unidades = tam // self.min_bloque
+        # Redondear hacia la siguiente subclase: cualquier segmento de esa lista alcanza
+        buscadas = unidades
+        if buscadas >= SL_CANTIDAD:
+            buscadas += (1 << (buscadas.bit_length() - 1 - SL_BITS)) - 1
+        fl, sl = _mapear(buscadas)
+        mapa = self._mapa_sl.get(fl, 0) & (-1 << sl)
+        if not mapa:
+            mayores = self._mapa_fl & (-1 << (fl + 1))
+            if not mayores:
+                # Último recurso: la lista exacta puede tener un segmento justo suficiente
+                for nodo in self._listas.get(_mapear(unidades), {}).values():
+                    if nodo.tamano >= tam:
+                        return nodo
+                return None
+            fl = _bit_bajo(mayores)
+            mapa = self._mapa_sl[fl]
+        return next(iter(self._listas[(fl, _bit_bajo(mapa))].values()))
+
+    def mayor_bloque_libre(self) -> int:
+        if not self._mapa_fl:
+            return 0
+        fl = self._mapa_fl.bit_length() - 1
+        sl = self._mapa_sl[fl].bit_length() - 1
+        return max(n.tamano for n in self._listas[(fl, sl)].values())
+
+
+# =========================
+#   REGISTRO DE MOTORES
+# =========================
+def _motores() -> Dict[str, Callable[[int, int], Asignador]]:
+    from BuddySystem import SistemaBuddy
+    from ponderado import SistemaBuddyPonderado
+    from disperso import SistemaBuddyDisperso
+    return {
+        "buddy": SistemaBuddy,
+        "buddy_ponderado": SistemaBuddyPonderado,
+        "buddy_disperso": SistemaBuddyDisperso,
+        PrimerAjuste.nombre: PrimerAjuste,
+        SiguienteAjuste.nombre: SiguienteAjuste,
+        AjusteSegregado.nombre: AjusteSegregado,
+        TLSF.nombre: TLSF,
+    }
+
+
+def crear_asignador(motor: str, tamano_total: int, tam_min_bloque: int) -> Asignador:
+    """Crea un asignador por nombre (ver nombres_motores())"""
+    return _motores()[motor](tamano_total, tam_min_bloque)
+
+
+def nombres_motores() -> List[str]:
+    return list(_motores())
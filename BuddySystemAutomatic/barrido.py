@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Barrido de políticas de colocación: reproduce la misma traza con cada política
+y compara tasa de rechazo, desperdicio y fragmentación externa.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python barrido.py --procesos 5000 --total-kb 8192 --min-kb 32 --semilla 1
+    python barrido.py --traza mi_traza.csv
+    python barrido.py --vida --fraccion-larga 0.2 --semillas 10  (segregada por vida, experimental)
+    python barrido.py --dispersion --fragmentos 4                 (asignación dispersa)
+"""
+from __future__ import annotations
+import argparse
+import time
+from typing import List, Dict
+
+from BuddySystem import SistemaBuddy
+from politicas import POLITICAS, PoliticaMejorAjuste, PoliticaSugerenciaDireccion
+from traza import generar_traza, cargar_traza, reproducir, ProcesoTraza
+
+
+def comparar_politicas(traza: List[ProcesoTraza], total: int, minimo: int, max_fragmentos: int = 1) -> List[Dict]:
+    filas = []
+    for nombre, clase in POLITICAS.items():
+        # La sugerencia de dirección apunta al final de la arena
+        politica = clase(total - 1) if clase is PoliticaSugerenciaDireccion else clase()
+        sistema = SistemaBuddy(total, minimo, politica=politica, max_fragmentos=max_fragmentos)
+        inicio = time.perf_counter()
+        resultado = reproducir(sistema, traza)
+        resultado["segundos"] = time.perf_counter() - inicio
+        resultado["politica"] = nombre
+        filas.append(resultado)
+    return filas
+
+
+def comparar_vida(traza: List[ProcesoTraza], total: int, minimo: int, max_fragmentos: int = 1) -> List[Dict]:
+    """Misma traza sin y con la vida informada al asignador.
+
+    Incluye el mejor ajuste sin vida: es lo que usan las solicitudes cortas, así
+    que es la referencia contra la que se mide la segregación (experimental).
+    """
+    filas = []
+    for nombre, politica, informar in (("izquierda", None, False),
+                                       ("mejor_ajuste", PoliticaMejorAjuste(), False),
+                                       ("segregada_vida", None, True)):
+        sistema = SistemaBuddy(total, minimo, politica=politica, max_fragmentos=max_fragmentos)
+        inicio = time.perf_counter()
+        resultado = reproducir(sistema, traza, informar_vida=informar)
+        resultado["segundos"] = time.perf_counter() - inicio
+        resultado["politica"] = nombre
+        filas.append(resultado)
+    return filas
+
+
+def comparar_dispersion(traza: List[ProcesoTraza], total: int, minimo: int,
+                        max_fragmentos: int = 4) -> List[Dict]:
+    """Misma traza con 1, 2, ... max_fragmentos bloques por proceso"""
+    filas = []
+    for fragmentos in range(1, max(1, max_fragmentos) + 1):
+        sistema = SistemaBuddy(total, minimo, max_fragmentos=fragmentos)
+        inicio = time.perf_counter()
+        resultado = reproducir(sistema, traza)
+        resultado["segundos"] = time.perf_counter() - inicio
+        resultado["politica"] = f"fragmentos<={fragmentos}"
+        filas.append(resultado)
+    return filas
+
+
+def imprimir_tabla(filas: List[Dict]):
+    print(f"{'política':<18}{'rechazo %':>10}{'rech. frag':>11}{'desp. prom KB':>15}"
+          f"{'desp. max KB':>14}{'frag ext':>10}{'mayor lib KB':>14}{'seg':>8}")
+    for f in filas:
+        print(f"{f['politica']:<18}{100 * f['tasa_rechazo']:>10.2f}{f['rechazos_por_fragmentacion']:>11}"
+              f"{f['desperdicio_promedio'] / 1024:>15.1f}{f['desperdicio_max'] / 1024:>14.1f}"
+              f"{f['frag_externa_promedio']:>10.3f}{f['mayor_libre_promedio'] / 1024:>14.1f}{f['segundos']:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--procesos", type=int, default=2000)
+    parser.add_argument("--total-kb", type=int, default=8192)
+    parser.add_argument("--min-kb", type=int, default=32)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--fraccion-larga", type=float, default=0.0,
+                        help="fracción de procesos de vida larga (10-30 s) en la traza generada")
+    parser.add_argument("--semillas", type=int, default=1, help="cantidad de trazas generadas a comparar")
+    parser.add_argument("--traza", help="CSV de traza o procesos.json en lugar de generar una")
+    parser.add_argument("--vida", action="store_true", help="comparar la colocación segregada por vida (experimental: "
+                             "no mejora al mejor ajuste, ver BuddySystem.py)")
+    parser.add_argument("--fragmentos", type=int, default=1,
+                        help="máximo de bloques por proceso (asignación dispersa)")
+    parser.add_argument("--dispersion", action="store_true",
+                        help="comparar de 1 a --fragmentos bloques por proceso")
+    args = parser.parse_args()
+
+    if args.dispersion:
+        comparar = comparar_dispersion
+    else:
+        comparar = comparar_vida if args.vida else comparar_politicas
+    if args.traza:
+        trazas = [cargar_traza(args.traza, args.semilla)]
+    else:
+        trazas = [generar_traza(args.procesos, args.semilla + k, fraccion_larga=args.fraccion_larga) for k in range(args.semillas)]
+    for k, traza in enumerate(trazas):
+        if len(trazas) > 1:
+            print(f"\n-- traza {k + 1} (semilla {args.semilla + k})")
+        imprimir_tabla(comparar(traza, args.total_kb * 1024, args.min_kb * 1024, args.fragmentos))
+
+
+if __name__ == "__main__":
+    main()
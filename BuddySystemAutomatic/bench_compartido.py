@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: N procesos haciendo asignaciones/liberaciones sobre un mismo heap
+compartido (SistemaBuddyCompartido) contra N procesos con su propio SistemaBuddy.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python bench_compartido.py --procesos 4 --operaciones 20000
+"""
+from __future__ import annotations
+import argparse
+import multiprocessing
+import random
+import time
+
+from BuddySystem import SistemaBuddy
+from compartido import SistemaBuddyCompartido
+
+TAMANO_TOTAL = 64 * 1024 * 1024
+TAM_MIN = 4 * 1024
+VIVOS_POR_PROCESO = 64
+
+
+def _churn(sistema, id_proceso: int, operaciones: int, semilla: int) -> int:
+    """Mantiene una ventana de bloques vivos asignando y liberando al azar"""
+    rnd = random.Random(semilla)
+    vivos = []
+    contador = 0
+    for _ in range(operaciones):
+        if vivos and (len(vivos) >= VIVOS_POR_PROCESO or rnd.random() < 0.5):
+            nombre = vivos.pop(rnd.randrange(len(vivos)))
+            sistema.liberar_memoria(nombre)
+        else:
+            contador += 1
+            nombre = f"w{id_proceso}-{contador}"
+            if sistema.asignar_memoria(rnd.randint(1, 256 * 1024), nombre) is not None:
+                vivos.append(nombre)
+    return operaciones
+
+
+def _trabajador_compartido(nombre_heap, lock, id_proceso, operaciones, barrera, salida):
+    sistema = SistemaBuddyCompartido.adjuntar(nombre_heap, lock)
+    barrera.wait()
+    _churn(sistema, id_proceso, operaciones, semilla=id_proceso)
+    salida.put(time.perf_counter())
+    sistema.cerrar()
+
+
+def _trabajador_privado(id_proceso, operaciones, barrera, salida):
+    sistema = SistemaBuddy(TAMANO_TOTAL, TAM_MIN)
+    barrera.wait()
+    _churn(sistema, id_proceso, operaciones, semilla=id_proceso)
+    salida.put(time.perf_counter())
+
+
+def _correr(objetivo, args_por_proceso, n: int) -> float:
+    barrera = multiprocessing.Barrier(n + 1)
+    salida = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=objetivo, args=(*args_por_proceso(i), barrera, salida))
+             for i in range(n)]
+    for p in procs:
+        p.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    fin = max(salida.get() for _ in range(n))
+    for p in procs:
+        p.join()
+    return fin - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--procesos", type=int, default=4)
+    parser.add_argument("--operaciones", type=int, default=20000)
+    args = parser.parse_args()
+    n, ops = args.procesos, args.operaciones
+
+    lock = multiprocessing.Lock()
+    heap = SistemaBuddyCompartido(TAMANO_TOTAL, TAM_MIN, lock=lock, max_procesos=n * VIVOS_POR_PROCESO)
+    try:
+        t_comp = _correr(_trabajador_compartido, lambda i: (heap.nombre, lock, i, ops), n)
+        print(f"Compartido: {n} procesos, restos al final: {len(heap.procesos_vigentes())} bloques")
+    finally:
+        heap.cerrar()
+        heap.destruir()
+
+    t_priv = _correr(_trabajador_privado, lambda i: (i, ops), n)
+
+    total_ops = n * ops
+    print(f"{'modo':<12}{'segundos':>10}{'ops/s':>14}")
+    print(f"{'compartido':<12}{t_comp:>10.3f}{total_ops / t_comp:>14,.0f}")
+    print(f"{'privado':<12}{t_priv:>10.3f}{total_ops / t_priv:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
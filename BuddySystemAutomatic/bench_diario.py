@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: costo del diario de escritura anticipada según el nivel de
+durabilidad (sin diario, sin fsync, commit en grupo y fsync por operación).
+
+Ejecutar (desde BuddySystemAutomatic):
+    python bench_diario.py --operaciones 20000 --total-kb 65536 --min-kb 4
+    python bench_diario.py --directorio /ruta/en/el/disco/a/medir
+"""
+from __future__ import annotations
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+from BuddySystem import SistemaBuddy
+from diario import SistemaDiario
+
+# (nombre, sincronizar_cada, intervalo_ms); None = sin diario
+NIVELES = (
+    ("memoria", None, None),
+    ("sin fsync", 0, 0.0),
+    ("grupo 1024", 1024, 50.0),
+    ("grupo 256", 256, 10.0),
+    ("grupo 32", 32, 10.0),
+    ("cada 5 ms", 1 << 30, 5.0),
+    ("estricta", 1, 0.0),
+)
+
+
+def correr(sistema, operaciones: int, tam_max: int, semilla: int) -> float:
+    """Recambio al azar (asignar / liberar / redimensionar); devuelve ops/s"""
+    rnd = random.Random(semilla)
+    pids = [sistema.id_proceso(f"p{i}") for i in range(operaciones)]
+    vivos = []
+    inicio = time.perf_counter()
+    for i in range(operaciones):
+        r = rnd.random()
+        if vivos and r < 0.45:
+            sistema.liberar_memoria(handle=vivos.pop(rnd.randrange(len(vivos))))
+        elif vivos and r < 0.55:
+            sistema.redimensionar_memoria(vivos[rnd.randrange(len(vivos))], rnd.randint(1, tam_max))
+        else:
+            handle = sistema.asignar_memoria(rnd.randint(1, tam_max), pid=pids[i])
+            if handle is not None:
+                vivos.append(handle)
+    return operaciones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--operaciones", type=int, default=20_000)
+    parser.add_argument("--total-kb", type=int, default=64 * 1024)
+    parser.add_argument("--min-kb", type=int, default=4)
+    parser.add_argument("--tam-max-kb", type=int, default=256)
+    parser.add_argument("--directorio", help="dónde crear los diarios (por defecto un temporal)")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+    total, minimo = args.total_kb * 1024, args.min_kb * 1024
+
+    print(f"{'nivel':<12}{'ops/s':>12}{'relativo':>10}{'fsyncs':>9}")
+    base = None
+    for nombre, cada, intervalo in NIVELES:
+        sistema = SistemaBuddy(total, minimo)
+        directorio = None
+        if cada is not None:
+            directorio = tempfile.mkdtemp(dir=args.directorio)
+            sistema = SistemaDiario(sistema, directorio, sincronizar_cada=cada, intervalo_ms=intervalo)
+        ops = correr(sistema, args.operaciones, args.tam_max_kb * 1024, args.semilla)
+        fsyncs = 0
+        if directorio is not None:
+            sistema.cerrar()
+            fsyncs = sistema.sincronizaciones
+            shutil.rmtree(directorio)
+        base = base or ops
+        print(f"{nombre:<12}{ops:>12,.0f}{ops / base:>10.2f}{fsyncs:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: SistemaBuddy (árbol de objetos) contra SistemaBuddyDisperso
+(diccionarios indexados por nodo implícito) en un espacio de 64 bits.
+Mide memoria de metadatos (tracemalloc) y tiempo por operación según la
+cantidad de asignaciones vivas.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python bench_disperso.py --total-gb 1024 --min-kb 4 --vivas 1000 10000 50000
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+import tracemalloc
+
+from BuddySystem import SistemaBuddy
+from disperso import SistemaBuddyDisperso
+
+VARIANTES = (("arbol", SistemaBuddy), ("disperso", SistemaBuddyDisperso))
+
+
+def _llenar(clase, total: int, minimo: int, tamanos, nombres, vivas: int):
+    sistema = clase(total, minimo)
+    handles = [sistema.asignar_memoria(tamanos[i], nombres[i]) for i in range(vivas)]
+    return sistema, handles
+
+
+def medir(clase, total: int, minimo: int, vivas: int, semilla: int):
+    rnd = random.Random(semilla)
+    tamanos = [rnd.randint(1, 16 * 1024 * 1024) for _ in range(2 * vivas)]
+    nombres = [f"v{i}" for i in range(2 * vivas)]
+
+    # Memoria: una corrida aparte bajo tracemalloc (que distorsiona los tiempos)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sistema, handles = _llenar(clase, total, minimo, tamanos, nombres, vivas)
+    memoria = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del sistema, handles
+
+    inicio = time.perf_counter()
+    sistema, handles = _llenar(clase, total, minimo, tamanos, nombres, vivas)
+    t_asignar = time.perf_counter() - inicio
+
+    # Recambio: liberar uno al azar y asignar otro, manteniendo `vivas` bloques
+    inicio = time.perf_counter()
+    for i in range(vivas, 2 * vivas):
+        sistema.liberar_memoria(handle=handles.pop(rnd.randrange(len(handles))))
+        handles.append(sistema.asignar_memoria(tamanos[i], nombres[i]))
+    t_recambio = time.perf_counter() - inicio
+    return memoria, t_asignar / vivas, t_recambio / vivas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--total-gb", type=int, default=1024)
+    parser.add_argument("--min-kb", type=int, default=4)
+    parser.add_argument("--vivas", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+    total, minimo = args.total_gb * 1024 ** 3, args.min_kb * 1024
+
+    print(f"total={total:,} B  min={minimo:,} B  niveles={(total // minimo).bit_length() - 1}")
+    print(f"{'variante':<10}{'vivas':>8}{'metadatos MB':>14}{'B/asignación':>14}"
+          f"{'asignar µs':>12}{'recambio µs':>13}")
+    for vivas in args.vivas:
+        for nombre, clase in VARIANTES:
+            memoria, t_asignar, t_recambio = medir(clase, total, minimo, vivas, args.semilla)
+            print(f"{nombre:<10}{vivas:>8}{memoria / 1e6:>14.2f}{memoria / vivas:>14,.0f}"
+                  f"{t_asignar * 1e6:>12.2f}{t_recambio * 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
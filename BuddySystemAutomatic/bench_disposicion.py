@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: análisis de la disposición de memoria recorriendo NodoMemoria uno
+por uno contra como_arreglo() + funciones vectorizadas de disposicion.py.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python bench_disposicion.py --bloques 1000000
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from BuddySystem import SistemaBuddy
+from disperso import SistemaBuddyDisperso
+import disposicion
+
+VARIANTES = (("arbol", SistemaBuddy), ("disperso", SistemaBuddyDisperso))
+
+
+def analizar_con_nodos(sistema) -> dict:
+    """Lo mismo que disposicion.resumen(), leyendo atributos nodo por nodo"""
+    ocupados = libre = mayor = desperdicio = ocupada = 0
+    hojas = sistema.hojas_en_orden()
+    for n in hojas:
+        if n.ocupado:
+            ocupados += 1
+            ocupada += n.tamOcupado
+            desperdicio += n.tamano - n.tamOcupado
+        else:
+            libre += n.tamano
+            mayor = max(mayor, n.tamano)
+    return {"bloques": len(hojas), "ocupados": ocupados, "memoria_ocupada": ocupada, "memoria_libre": libre,
+            "mayor_libre": mayor, "desperdicio": desperdicio,
+            "frag_externa": 1.0 - mayor / libre if libre else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bloques", type=int, default=1_000_000, help="asignaciones vivas aproximadas")
+    parser.add_argument("--min-kb", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+    minimo = args.min_kb * 1024
+    # Espacio con lugar de sobra: bloques de 1 a 4 páginas y un 25% liberado al azar
+    total = minimo * 8 * args.bloques
+
+    print(f"{'variante':<10}{'hojas':>10}{'nodos ms':>11}{'arreglo ms':>12}{'análisis ms':>13}")
+    for nombre, clase in VARIANTES:
+        rnd = random.Random(args.semilla)
+        sistema = clase(total, minimo)
+        handles = [sistema.asignar_memoria(rnd.randint(1, 4 * minimo), pid=sistema.id_proceso(f"b{i}"))
+                   for i in range(args.bloques)]
+        for h in rnd.sample(handles, len(handles) // 4):
+            sistema.liberar_memoria(handle=h)
+
+        inicio = time.perf_counter()
+        esperado = analizar_con_nodos(sistema)
+        t_nodos = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        arreglo = sistema.como_arreglo()
+        t_arreglo = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        obtenido = disposicion.resumen(arreglo)
+        disposicion.histograma_ordenes(arreglo)
+        disposicion.ocupacion_por_region(arreglo)
+        t_analisis = time.perf_counter() - inicio
+        assert obtenido == esperado, (obtenido, esperado)
+        print(f"{nombre:<10}{len(arreglo):>10,}{t_nodos * 1e3:>11.0f}{t_arreglo * 1e3:>12.0f}"
+              f"{t_analisis * 1e3:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
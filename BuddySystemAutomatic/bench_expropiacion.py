@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: expropiación por prioridad en el Simulador. Los procesos grandes
+(> --umbral-kb) tienen prioridad 1 y los demás 0; cuando uno grande no entra se
+expulsan los chicos más baratos de desalojar (ver expropiacion.py).
+
+Compara sin expropiación, expropiando y reencolando a los expulsados, y
+expropiando y marcándolos como no ejecutados: procesos grandes admitidos,
+expulsiones por admisión y throughput (procesos y MB·s terminados por segundo
+simulado).
+
+Ejecutar (desde BuddySystemAutomatic):
+    python bench_expropiacion.py --procesos 400 --semillas 20
+"""
+from __future__ import annotations
+import argparse
+import time
+
+from BuddySystem import SistemaBuddy
+from simulator import simular, convertir_a_bytes, FINALIZADO
+
+MODOS = {
+    "sin expropiación": {},
+    "expropiar + reencolar": {"expropiar": True, "reencolar": True},
+    "expropiar + marcar": {"expropiar": True, "reencolar": False},
+}
+
+
+def correr(modo: dict, args) -> dict:
+    umbral = args.umbral_kb
+    totales = {"grandes": 0, "grandes_terminados": 0, "terminados": 0, "mb_s": 0.0, "segundos": 0.0,
+               "expulsiones": 0, "admisiones_con_expulsion": 0, "expropiaciones_fallidas": 0,
+               "tiempo_real": 0.0}
+    for semilla in range(args.semillas):
+        inicio = time.perf_counter()
+        sim = simular(SistemaBuddy(args.total_kb * 1024, args.min_kb * 1024), args.procesos, semilla=semilla,
+                      prioridades=lambda p: int(p["tamano"] > umbral), **modo)
+        totales["tiempo_real"] += time.perf_counter() - inicio
+        for i, p in enumerate(sim.procesos):
+            grande = sim.prioridades[i] > 0
+            terminado = sim.estados[i] == FINALIZADO
+            totales["grandes"] += grande
+            totales["grandes_terminados"] += grande and terminado
+            if terminado:
+                totales["terminados"] += 1
+                totales["mb_s"] += convertir_a_bytes(p["tamano"], p["unidad"]) / 2 ** 20 * sim.vidas[i] / 1000
+        totales["segundos"] += sim.reloj.ahora / 1000
+        totales["expulsiones"] += sim.expulsiones
+        totales["admisiones_con_expulsion"] += sim.admisiones_con_expulsion
+        totales["expropiaciones_fallidas"] += sim.expropiaciones_fallidas
+    return totales
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expropiación por prioridad en el Simulador")
+    parser.add_argument("--procesos", type=int, default=400)
+    parser.add_argument("--semillas", type=int, default=20)
+    parser.add_argument("--total-kb", type=int, default=4096)
+    parser.add_argument("--min-kb", type=int, default=4)
+    parser.add_argument("--umbral-kb", type=int, default=1024, help="procesos más grandes tienen prioridad 1")
+    args = parser.parse_args()
+
+    print(f"{'modo':<24}{'grandes adm.':>13}{'exp/adm':>9}{'fallidas':>9}{'proc/s':>9}{'MB·s/s':>9}{'ms/corrida':>12}")
+    base = None
+    for nombre, modo in MODOS.items():
+        r = correr(modo, args)
+        proc_s = r["terminados"] / r["segundos"]
+        mb_s = r["mb_s"] / r["segundos"]
+        por_admision = r["expulsiones"] / r["admisiones_con_expulsion"] if r["admisiones_con_expulsion"] else 0.0
+        print(f"{nombre:<24}{r['grandes_terminados'] / max(1, r['grandes']):>13.1%}{por_admision:>9.2f}"
+              f"{r['expropiaciones_fallidas']:>9}{proc_s:>9.2f}{mb_s:>9.2f}{r['tiempo_real'] / args.semillas * 1000:>12.1f}")
+        if base is None:
+            base = (proc_s, mb_s)
+        else:
+            print(f"{'':<24}throughput vs sin expropiación: procesos {proc_s / base[0] - 1:+.1%}, "
+                  f"MB·s {mb_s / base[1] - 1:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
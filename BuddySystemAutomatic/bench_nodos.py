@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: NodoMemoria con __slots__ y pool de nodos retirados en SistemaBuddy.
+
+Graba las asignaciones y liberaciones que hace el Simulador (reloj simulado) y
+las reproduce sobre tres variantes del árbol:
+  - __dict__ sin pool (NodoMemoria como era antes, con diccionario por instancia)
+  - __slots__ sin pool (max_pool=0)
+  - __slots__ con pool (_dividir reutiliza lo que _fusionar retira)
+Mide bytes por nodo (tracemalloc), operaciones por segundo y colecciones del GC.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python bench_nodos.py --procesos 20000 --total-kb 65536 --min-kb 1
+"""
+from __future__ import annotations
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import List, Tuple
+
+import BuddySystem
+from BuddySystem import SistemaBuddy
+from NodoMemoria import NodoMemoria
+from simulator import simular
+
+# Mismo código que NodoMemoria, pero con __dict__ por instancia
+NodoConDict = type("NodoConDict", (), {
+    "__init__": NodoMemoria.__init__,
+    "reiniciar": NodoMemoria.__init__,
+    "es_hoja": NodoMemoria.es_hoja,
+})
+
+# nombre, clase de nodo, max_pool (None = el de SistemaBuddy)
+VARIANTES = (
+    ("__dict__ sin pool", NodoConDict, 0),
+    ("__slots__ sin pool", NodoMemoria, 0),
+    ("__slots__ + pool", NodoMemoria, None),
+)
+
+# ("a", tamaño, nombre) o ("l", índice de la asignación que se libera)
+Operacion = Tuple[str, int, str]
+
+
+def grabar(args) -> List[Operacion]:
+    """Asignaciones y liberaciones que hace el Simulador, en orden"""
+    sistema = SistemaBuddy(args.total_kb * 1024, args.min_kb * 1024)
+    asignar, liberar = sistema.asignar_memoria, sistema.liberar_memoria
+    ops: List[Operacion] = []
+    asignacion_de_handle = {}
+
+    def _asignar(espacio, *resto, pid, **opciones):
+        handle = asignar(espacio, *resto, pid=pid, **opciones)
+        if handle is not None:
+            asignacion_de_handle[handle] = len(ops)
+        ops.append(("a", espacio, sistema.nombre_proceso(pid)))
+        return handle
+
+    def _liberar(*, handle):
+        ops.append(("l", asignacion_de_handle.pop(handle), ""))
+        return liberar(handle=handle)
+
+    sistema.asignar_memoria = _asignar
+    sistema.liberar_memoria = _liberar
+    simular(sistema, args.procesos, semilla=args.semilla)
+    return ops
+
+
+def reproducir(clase, max_pool, ops: List[Operacion], args) -> Tuple[float, int]:
+    """Segundos de una reproducción y colecciones del GC durante ella"""
+    # SistemaBuddy crea sus nodos con el NodoMemoria de su módulo
+    BuddySystem.NodoMemoria = clase
+    try:
+        sistema = SistemaBuddy(args.total_kb * 1024, args.min_kb * 1024)
+        if max_pool is not None:
+            sistema.max_pool = max_pool
+        pids = {nombre: sistema.id_proceso(nombre) for op, _, nombre in ops if op == "a"}
+        handles = [None] * len(ops)
+        colecciones = sum(s["collections"] for s in gc.get_stats())
+        inicio = time.perf_counter()
+        for k, (op, valor, nombre) in enumerate(ops):
+            if op == "a":
+                handles[k] = sistema.asignar_memoria(valor, pid=pids[nombre])
+            else:
+                sistema.liberar_memoria(handle=handles[valor])
+        segundos = time.perf_counter() - inicio
+    finally:
+        BuddySystem.NodoMemoria = NodoMemoria
+    return segundos, sum(s["collections"] for s in gc.get_stats()) - colecciones
+
+
+def bytes_por_nodo(clase, n: int = 100_000) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    # Todos con la misma dirección: sólo se cuenta el nodo, no sus enteros
+    nodos = [clase(1024) for _ in range(n)]
+    memoria = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del nodos
+    # Sin contar la lista que los guarda
+    return memoria / n - 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NodoMemoria con __slots__ y pool de nodos")
+    parser.add_argument("--procesos", type=int, default=20000)
+    parser.add_argument("--total-kb", type=int, default=65536)
+    parser.add_argument("--min-kb", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--repeticiones", type=int, default=15)
+    args = parser.parse_args()
+
+    ops = grabar(args)
+    print(f"Simulador: {args.procesos} procesos, {len(ops)} operaciones "
+          f"({sum(op == 'a' for op, _, _ in ops)} asignaciones)")
+    print(f"{'variante':<20}{'bytes/nodo':>11}{'ops/s':>12}{'vs __dict__':>13}{'colecciones GC':>16}")
+    # Variantes intercaladas en cada repetición; se toma la mejor de cada una
+    mejores = {}
+    for _ in range(args.repeticiones):
+        for nombre, clase, max_pool in VARIANTES:
+            medida = reproducir(clase, max_pool, ops, args)
+            if nombre not in mejores or medida[0] < mejores[nombre][0]:
+                mejores[nombre] = medida
+    base = None
+    for nombre, clase, _ in VARIANTES:
+        segundos, colecciones = mejores[nombre]
+        ops_s = len(ops) / segundos
+        base = base or ops_s
+        print(f"{nombre:<20}{bytes_por_nodo(clase):>11.0f}{ops_s:>12,.0f}{ops_s / base - 1:>+13.1%}{colecciones:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: buddy binario (SistemaBuddy) contra buddy ponderado 2^k / 3·2^k
+(SistemaBuddyPonderado) con la misma traza: desperdicio interno, rechazos y
+costo por operación.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python bench_ponderado.py --procesos 5000 --total-kb 8192 --min-kb 32
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from BuddySystem import SistemaBuddy
+from ponderado import SistemaBuddyPonderado
+from politicas import PoliticaMejorAjuste
+from traza import generar_traza, reproducir
+
+# Con bloques de tamaños desiguales, el mejor ajuste evita partir los grandes
+VARIANTES = (
+    ("binario", lambda total, minimo: SistemaBuddy(total, minimo)),
+    ("ponderado", lambda total, minimo: SistemaBuddyPonderado(total, minimo)),
+    ("ponderado+mejor", lambda total, minimo: SistemaBuddyPonderado(total, minimo, politica=PoliticaMejorAjuste())),
+)
+
+
+def medir_operaciones(fabrica, total: int, minimo: int, operaciones: int, semilla: int) -> float:
+    """Operaciones (asignar + liberar) por segundo manteniendo bloques vivos al azar"""
+    sistema = fabrica(total, minimo)
+    rnd = random.Random(semilla)
+    tamanos = [rnd.randint(1, 2048) * 1024 if rnd.random() < 0.3 else rnd.randint(1, 1024) * 1024
+               for _ in range(operaciones)]
+    vivos = []
+    inicio = time.perf_counter()
+    for i, tam in enumerate(tamanos):
+        if vivos and (len(vivos) >= 8 or rnd.random() < 0.5):
+            sistema.liberar_memoria(handle=vivos.pop(rnd.randrange(len(vivos))))
+        else:
+            handle = sistema.asignar_memoria(tam, f"b{i}")
+            if handle is not None:
+                vivos.append(handle)
+    return operaciones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--procesos", type=int, default=3000)
+    parser.add_argument("--total-kb", type=int, default=8192)
+    parser.add_argument("--min-kb", type=int, default=32)
+    parser.add_argument("--operaciones", type=int, default=200_000)
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+    total, minimo = args.total_kb * 1024, args.min_kb * 1024
+
+    traza = generar_traza(args.procesos, args.semilla)
+    print(f"{'variante':<17}{'rechazo %':>10}{'desp. prom KB':>15}{'desp. max KB':>14}"
+          f"{'ops/s':>12}")
+    for nombre, fabrica in VARIANTES:
+        r = reproducir(fabrica(total, minimo), traza)
+        ops = medir_operaciones(fabrica, total, minimo, args.operaciones, args.semilla)
+        print(f"{nombre:<17}{100 * r['tasa_rechazo']:>10.2f}{r['desperdicio_promedio'] / 1024:>15.1f}"
+              f"{r['desperdicio_max'] / 1024:>14.1f}{ops:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
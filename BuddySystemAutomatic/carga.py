@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de carga para el servicio de asignación: muchos clientes
+concurrentes (tareas asyncio) repartidos sobre un pool de conexiones con
+pipelining. Reporta ops/s y latencias de cola (p50 / p99 / p99.9).
+
+Si no se indica --unix ni --tcp levanta un servidor local en otro proceso
+sobre un socket temporal, así todo corre con un solo comando.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python carga.py --clientes 200 --conexiones 8 --operaciones 200000
+    python carga.py --lote 32 --motor tlsf
+    python carga.py --unix /tmp/buddy.sock --clientes 500
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import tempfile
+import time
+from typing import List, Optional
+
+from cliente import PoolClientes
+from servidor import ServidorBuddy, crear_sistema, PUERTO
+
+
+def _percentil(ordenados: List[int], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+async def _cliente(pool: PoolClientes, indice: int, operaciones: int, vivos_max: int,
+                   tam_max: int, lote: int, semilla: int, latencias: List[int], cuentas: List[int]):
+    """Un cliente: asigna hasta tener `vivos_max` bloques y luego alterna al azar.
+
+    Los nombres se reciclan por ranura para no inflar la tabla de nombres del servidor.
+    """
+    rnd = random.Random(semilla * 7919 + indice)
+    vivos: List[int] = []
+    ranuras = [f"c{indice}-{r}" for r in range(vivos_max * lote)]
+    libres = list(range(len(ranuras)))
+    ranura_de = {}
+    reloj = time.perf_counter_ns
+    hechas = 0
+    while hechas < operaciones:
+        liberar = len(vivos) >= vivos_max * lote or (vivos and rnd.random() < 0.5)
+        t0 = reloj()
+        if liberar and lote > 1:
+            tanda = [vivos.pop(rnd.randrange(len(vivos))) for _ in range(min(lote, len(vivos)))]
+            await pool.liberar_lote(tanda)
+            n = len(tanda)
+            for h in tanda:
+                libres.append(ranura_de.pop(h))
+        elif liberar:
+            h = vivos.pop(rnd.randrange(len(vivos)))
+            await pool.liberar(h)
+            n = 1
+            libres.append(ranura_de.pop(h))
+        elif lote > 1:
+            tomadas = [libres.pop() for _ in range(min(lote, len(libres)))]
+            handles = await pool.asignar_lote([(rnd.randint(1, tam_max), ranuras[r]) for r in tomadas])
+            n = len(tomadas)
+            for r, h in zip(tomadas, handles):
+                if h is None:
+                    libres.append(r)
+                    cuentas[1] += 1
+                else:
+                    vivos.append(h)
+                    ranura_de[h] = r
+        else:
+            r = libres.pop()
+            h = await pool.asignar(rnd.randint(1, tam_max), ranuras[r])
+            n = 1
+            if h is None:
+                libres.append(r)
+                cuentas[1] += 1
+            else:
+                vivos.append(h)
+                ranura_de[h] = r
+        latencias.append(reloj() - t0)
+        cuentas[0] += n
+        hechas += n
+    if vivos:
+        await pool.liberar_lote(vivos)
+
+
+async def generar_carga(destino: dict, clientes: int, conexiones: int, operaciones: int,
+                        vivos_max: int, tam_max: int, lote: int, semilla: int) -> dict:
+    latencias: List[int] = []
+    cuentas = [0, 0]  # operaciones, rechazos
+    por_cliente = max(lote, operaciones // clientes)
+    async with PoolClientes(conexiones, **destino) as pool:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(_cliente(pool, i, por_cliente, vivos_max, tam_max, lote, semilla,
+                                        latencias, cuentas) for i in range(clientes)))
+        transcurrido = time.perf_counter() - inicio
+        estado = await pool.estadisticas()
+    latencias.sort()
+    hechas = cuentas[0]
+    return {
+        "operaciones": hechas,
+        "peticiones": len(latencias),
+        "segundos": transcurrido,
+        "ops_s": hechas / transcurrido,
+        "p50_us": _percentil(latencias, 50) / 1000,
+        "p99_us": _percentil(latencias, 99) / 1000,
+        "p999_us": _percentil(latencias, 99.9) / 1000,
+        "max_us": latencias[-1] / 1000 if latencias else 0.0,
+        "rechazos": cuentas[1],
+        "estado_final": estado,
+    }
+
+
+def _servir(motor: str, total_kb: int, min_kb: int, destino: dict):
+    servidor = ServidorBuddy(crear_sistema(motor, total_kb, min_kb))
+    asyncio.run(servidor.servir(**destino))
+
+
+def _esperar_servidor(destino: dict, limite_s: float = 10.0):
+    fin = time.monotonic() + limite_s
+    while time.monotonic() < fin:
+        try:
+            if "unix" in destino:
+                with socket.socket(socket.AF_UNIX) as s:
+                    s.connect(destino["unix"])
+            else:
+                socket.create_connection((destino["host"], destino["puerto"]), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("el servidor local no arrancó a tiempo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--unix", help="socket Unix de un servidor ya levantado")
+    grupo.add_argument("--tcp", help="host:puerto de un servidor ya levantado")
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--conexiones", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=200_000)
+    parser.add_argument("--vivos", type=int, default=8, help="bloques vivos máximos por cliente")
+    parser.add_argument("--tam-max-kb", type=int, default=64)
+    parser.add_argument("--lote", type=int, default=1, help="operaciones por petición (1 = sin lotes)")
+    parser.add_argument("--motor", default="buddy", help="motor del servidor local")
+    parser.add_argument("--total-kb", type=int, default=256 * 1024)
+    parser.add_argument("--min-kb", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    proceso: Optional[multiprocessing.Process] = None
+    if args.unix:
+        destino = {"unix": args.unix}
+    elif args.tcp:
+        host, _, puerto = args.tcp.rpartition(":")
+        destino = {"host": host or "127.0.0.1", "puerto": int(puerto)}
+    else:
+        if hasattr(socket, "AF_UNIX"):
+            destino = {"unix": os.path.join(tempfile.mkdtemp(), "buddy.sock")}
+        else:
+            destino = {"host": "127.0.0.1", "puerto": PUERTO}
+        proceso = multiprocessing.Process(target=_servir, daemon=True,
+                                          args=(args.motor, args.total_kb, args.min_kb, destino))
+        proceso.start()
+        _esperar_servidor(destino)
+
+    try:
+        r = asyncio.run(generar_carga(destino, args.clientes, args.conexiones, args.operaciones,
+                                      args.vivos, args.tam_max_kb * 1024, max(1, args.lote), args.semilla))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.join()
+
+    print(f"{args.clientes} clientes, {args.conexiones} conexiones, lote={args.lote}")
+    print(f"operaciones={r['operaciones']:,}  tiempo={r['segundos']:.2f} s  ops/s={r['ops_s']:,.0f}")
+    print(f"latencia por petición: p50={r['p50_us']:.0f} µs  p99={r['p99_us']:.0f} µs  "
+          f"p99.9={r['p999_us']:.0f} µs  max={r['max_us']:.0f} µs")
+    e = r["estado_final"]
+    print(f"rechazos={r['rechazos']:,}  vigentes al final={e['procesos_vigentes']}  "
+          f"ocupada={e['ocupada']:,} B  índice frag={e['indice_frag']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import struct
+from typing import Optional, List, Tuple, Dict
+
+from servidor import (ENCABEZADO, RESPUESTA, ENTERO, ENTRADA_LOTE, ASIGNAR, LIBERAR,
+                      ASIGNAR_LOTE, LIBERAR_LOTE, ESTADISTICAS, OK, PUERTO)
+
+# =========================
+#   CLIENTE DEL SERVICIO DE ASIGNACIÓN
+# =========================
+#
+# Cada conexión admite muchas peticiones en vuelo (pipelining): las peticiones
+# se escriben sin esperar y una tarea lectora resuelve el futuro de cada una
+# según su id. Por eso una misma conexión se puede compartir entre tareas, y el
+# pool reparte las tareas entre varias conexiones en ronda.
+#
+#   pool = PoolClientes(4, unix="/tmp/buddy.sock")
+#   await pool.abrir()
+#   handle = await pool.asignar(4096, "P1")
+#   await pool.liberar(handle)
+#   await pool.cerrar()
+
+
+class ErrorServicio(Exception):
+    pass
+
+
+class ClienteBuddy:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pendientes: Dict[int, asyncio.Future] = {}
+        self._lector = asyncio.ensure_future(self._leer())
+
+    @classmethod
+    async def conectar(cls, unix: Optional[str] = None, host: str = "127.0.0.1",
+                       puerto: int = PUERTO) -> "ClienteBuddy":
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, puerto)
+        return cls(reader, writer)
+
+    async def _leer(self):
+        try:
+            while True:
+                id_peticion, estado, n = RESPUESTA.unpack(await self._reader.readexactly(RESPUESTA.size))
+                valores = struct.unpack(f"<{n}q", await self._reader.readexactly(8 * n)) if n else ()
+                futuro = self._pendientes.pop(id_peticion, None)
+                if futuro is None or futuro.done():
+                    continue
+                if estado == OK:
+                    futuro.set_result(valores)
+                else:
+                    futuro.set_exception(ErrorServicio(f"petición {id_peticion} rechazada por el servidor"))
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            self._fallar_pendientes("conexión cerrada por el servidor")
+
+    def _fallar_pendientes(self, motivo: str):
+        """Las peticiones que esperan respuesta fallan con ConnectionError"""
+        for futuro in self._pendientes.values():
+            if not futuro.done():
+                futuro.set_exception(ConnectionError(motivo))
+        self._pendientes.clear()
+
+    async def _pedir(self, op: int, n: int, cuerpo: bytes = b"") -> Tuple[int, ...]:
+        if self._lector.done():
+            # Sin lector nadie contestaría la petición
+            raise ConnectionError("conexión cerrada")
+        id_peticion = next(self._ids) & 0xFFFFFFFF
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendientes[id_peticion] = futuro
+        self._writer.write(ENCABEZADO.pack(len(cuerpo), op, id_peticion, n) + cuerpo)
+        await self._writer.drain()
+        return await futuro
+
+    async def asignar(self, tamano: int, nombre: str) -> Optional[int]:
+        handle, = await self._pedir(ASIGNAR, 0, ENTERO.pack(tamano) + nombre.encode("utf-8"))
+        return None if handle < 0 else handle
+
+    async def liberar(self, handle: int) -> bool:
+        ok, = await self._pedir(LIBERAR, 0, ENTERO.pack(handle))
+        return bool(ok)
+
+    async def asignar_lote(self, solicitudes: List[Tuple[int, str]]) -> List[Optional[int]]:
+        partes = []
+        for tamano, nombre in solicitudes:
+            crudo = nombre.encode("utf-8")
+            partes.append(ENTRADA_LOTE.pack(tamano, len(crudo)))
+            partes.append(crudo)
+        handles = await self._pedir(ASIGNAR_LOTE, len(solicitudes), b"".join(partes))
+        return [None if h < 0 else h for h in handles]
+
+    async def liberar_lote(self, handles: List[int]) -> List[bool]:
+        valores = await self._pedir(LIBERAR_LOTE, len(handles), struct.pack(f"<{len(handles)}q", *handles))
+        return [bool(v) for v in valores]
+
+    async def estadisticas(self) -> dict:
+        total, ocupada, desperdicio, libre, mayor_libre, vigentes = await self._pedir(ESTADISTICAS, 0)
+        return {
+            "total": total,
+            "ocupada": ocupada,
+            "desperdicio": desperdicio,
+            "libre": libre,
+            "mayor_libre": mayor_libre,
+            "procesos_vigentes": vigentes,
+            "indice_frag": 1.0 - mayor_libre / libre if libre else 0.0,
+        }
+
+    async def cerrar(self):
+        self._lector.cancel()
+        self._fallar_pendientes("cliente cerrado")
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class PoolClientes:
+    """Varias conexiones multiplexadas; cada llamada usa la siguiente en ronda"""
+
+    def __init__(self, tamano: int = 4, **destino):
+        self.tamano = max(1, tamano)
+        self.destino = destino
+        self.clientes: List[ClienteBuddy] = []
+        self._ronda = itertools.cycle(())
+
+    async def abrir(self) -> "PoolClientes":
+        self.clientes = [await ClienteBuddy.conectar(**self.destino) for _ in range(self.tamano)]
+        self._ronda = itertools.cycle(self.clientes)
+        return self
+
+    def cliente(self) -> ClienteBuddy:
+        return next(self._ronda)
+
+    async def asignar(self, tamano: int, nombre: str) -> Optional[int]:
+        return await self.cliente().asignar(tamano, nombre)
+
+    async def liberar(self, handle: int) -> bool:
+        return await self.cliente().liberar(handle)
+
+    async def asignar_lote(self, solicitudes: List[Tuple[int, str]]) -> List[Optional[int]]:
+        return await self.cliente().asignar_lote(solicitudes)
+
+    async def liberar_lote(self, handles: List[int]) -> List[bool]:
+        return await self.cliente().liberar_lote(handles)
+
+    async def estadisticas(self) -> dict:
+        return await self.cliente().estadisticas()
+
+    async def cerrar(self):
+        for c in self.clientes:
+            await c.cerrar()
+        self.clientes = []
+
+    async def __aenter__(self) -> "PoolClientes":
+        return await self.abrir()
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Comparación de motores de asignación (buddy y listas libres) con la misma
+carga: throughput, percentiles de latencia, fragmentación interna y externa,
+tasa de rechazo y memoria de metadatos.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python comparar.py --procesos 3000 --total-kb 8192 --min-kb 32
+    python comparar.py --motores buddy tlsf primer_ajuste --csv reporte.csv
+    python comparar.py --traza mi_traza.csv
+"""
+from __future__ import annotations
+import argparse
+import csv
+import random
+import time
+import tracemalloc
+from typing import List, Dict
+
+from asignadores import crear_asignador, nombres_motores
+from traza import generar_traza, cargar_traza, reproducir, ProcesoTraza
+
+
+def percentil(ordenados: List[int], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def medir_latencias(motor: str, total: int, minimo: int, traza: List[ProcesoTraza],
+                    operaciones: int, semilla: int) -> Dict:
+    """Recambio al azar con los tamaños de la traza, cronometrando cada operación"""
+    sistema = crear_asignador(motor, total, minimo)
+    rnd = random.Random(semilla)
+    tamanos = [p.tamano for p in traza]
+    pids = [sistema.id_proceso(f"c{i}") for i in range(operaciones)]
+    vivos: List[int] = []
+    asignar: List[int] = []
+    liberar: List[int] = []
+    reloj = time.perf_counter_ns
+    inicio = reloj()
+    for i in range(operaciones):
+        if vivos and rnd.random() < 0.5:
+            handle = vivos.pop(rnd.randrange(len(vivos)))
+            t0 = reloj()
+            sistema.liberar_memoria(handle=handle)
+            liberar.append(reloj() - t0)
+        else:
+            tam = tamanos[i % len(tamanos)]
+            t0 = reloj()
+            handle = sistema.asignar_memoria(tam, pid=pids[i])
+            asignar.append(reloj() - t0)
+            if handle is not None:
+                vivos.append(handle)
+    transcurrido = (reloj() - inicio) / 1e9
+    asignar.sort()
+    liberar.sort()
+    return {
+        "ops_s": operaciones / transcurrido,
+        "asignar_p50_us": percentil(asignar, 50) / 1000,
+        "asignar_p99_us": percentil(asignar, 99) / 1000,
+        "asignar_p999_us": percentil(asignar, 99.9) / 1000,
+        "liberar_p50_us": percentil(liberar, 50) / 1000,
+        "liberar_p99_us": percentil(liberar, 99) / 1000,
+    }
+
+
+def medir_metadatos(motor: str, minimo: int, traza: List[ProcesoTraza], bloques: int = 1000) -> Dict:
+    """Bytes de metadatos por bloque vivo (tracemalloc) con `bloques` asignaciones de la traza.
+
+    Se usa una arena donde entran todas, para medir con muchos bloques vivos, y
+    los nombres se internan antes de medir (cuestan lo mismo en todos los motores).
+    """
+    muestra = traza[:bloques]
+    total = 1 << (4 * sum(p.tamano for p in muestra)).bit_length()
+    sistema = crear_asignador(motor, total, minimo)
+    pids = [sistema.id_proceso(f"m{i}") for i in range(len(muestra))]
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    vivas = sum(sistema.asignar_memoria(p.tamano, pid=pid) is not None for p, pid in zip(muestra, pids))
+    memoria = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return {"metadatos_b": memoria, "vivas": vivas, "b_por_bloque": memoria / max(1, vivas)}
+
+
+def comparar(motores: List[str], traza: List[ProcesoTraza], total: int, minimo: int,
+             operaciones: int, semilla: int) -> List[Dict]:
+    filas = []
+    for motor in motores:
+        r = reproducir(crear_asignador(motor, total, minimo), traza)
+        asignada = r["ocupada_promedio"] + r["desperdicio_promedio"]
+        fila = {
+            "motor": motor,
+            "tasa_rechazo": r["tasa_rechazo"],
+            "frag_interna": r["desperdicio_promedio"] / asignada if asignada else 0.0,
+            "frag_externa": r["frag_externa_promedio"],
+        }
+        fila.update(medir_latencias(motor, total, minimo, traza, operaciones, semilla))
+        fila.update(medir_metadatos(motor, minimo, traza))
+        filas.append(fila)
+    return filas
+
+
+def imprimir_reporte(filas: List[Dict]):
+    print(f"{'motor':<18}{'rechazo %':>10}{'frag int':>9}{'frag ext':>9}{'ops/s':>11}"
+          f"{'asig p50':>9}{'p99':>8}{'p99.9':>8}{'lib p50':>9}{'p99':>8}{'B/bloque':>10}")
+    for f in filas:
+        print(f"{f['motor']:<18}{100 * f['tasa_rechazo']:>10.2f}{f['frag_interna']:>9.3f}"
+              f"{f['frag_externa']:>9.3f}{f['ops_s']:>11,.0f}{f['asignar_p50_us']:>9.1f}"
+              f"{f['asignar_p99_us']:>8.1f}{f['asignar_p999_us']:>8.1f}{f['liberar_p50_us']:>9.1f}"
+              f"{f['liberar_p99_us']:>8.1f}{f['b_por_bloque']:>10,.0f}")
+    print("(latencias en µs; frag int = desperdicio / memoria asignada; "
+          "frag ext = 1 - mayor libre / libre, promedios sobre la traza)")
+
+
+def guardar_csv(filas: List[Dict], ruta: str):
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(filas[0]))
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--motores", nargs="+", default=nombres_motores(), choices=nombres_motores())
+    parser.add_argument("--procesos", type=int, default=3000)
+    parser.add_argument("--total-kb", type=int, default=8192)
+    parser.add_argument("--min-kb", type=int, default=32)
+    parser.add_argument("--operaciones", type=int, default=50_000)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--traza", help="CSV de traza o procesos.json en lugar de generar una")
+    parser.add_argument("--csv", help="guardar el reporte también en CSV")
+    args = parser.parse_args()
+
+    traza = cargar_traza(args.traza, args.semilla) if args.traza else generar_traza(args.procesos, args.semilla)
+    filas = comparar(args.motores, traza, args.total_kb * 1024, args.min_kb * 1024,
+                     args.operaciones, args.semilla)
+    imprimir_reporte(filas)
+    if args.csv:
+        guardar_csv(filas, args.csv)
+
+
+if __name__ == "__main__":
+    main()
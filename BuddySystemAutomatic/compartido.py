@@ -0,0 +1,351 @@
+from __future__ import annotations
+from typing import Optional, List
+import struct
+import zlib
+
+from multiprocessing import shared_memory
+
+from NodoMemoria import NodoMemoria
+
+# =========================
+#   BUDDY SYSTEM EN MEMORIA COMPARTIDA
+# =========================
+#
+# Versión compacta de SistemaBuddy pensada para que varios procesos del sistema
+# operativo asignen bloques de un mismo heap. Todo el estado vive en dos
+# segmentos de multiprocessing.shared_memory:
+#
+#   - Metadatos: encabezado + árbol implícito en arreglo (raíz = 1, hijos 2i y 2i+1)
+#     + tabla de nombres (hash abierto) que asocia nombre de proceso -> nodo.
+#   - Arena: los bytes de datos que realmente se reparten.
+#
+# Para cada nodo i se guarda:
+#   mayor[i]  (1 byte)  orden+1 del bloque libre más grande del subárbol (0 = nada libre)
+#   dueno[i]  (int32)   ranura+1 en la tabla de nombres si el nodo está asignado (0 = no)
+#   tam[i]    (int64)   tamaño realmente solicitado (tamOcupado)
+#
+# El orden se mide respecto al bloque mínimo: un nodo de orden k mide min_bloque << k.
+# Las operaciones se hacen bajo un candado compartido entre procesos
+# (multiprocessing.Lock), que se debe pasar a cada proceso que se adjunte.
+
+_MAGICO = 0x42554459  # "BUDY"
+# magico, total, min_bloque, niveles, capacidad_nombres, vivos, lapidas, ocupada, desperdicio
+_ENCABEZADO = struct.Struct("<9q")
+_LARGO_NOMBRE = 32
+_RANURA_VACIA = -1
+_RANURA_BORRADA = -2
+
+
+def _potencia_requerida(tamano: int) -> int:
+    """Potencia de 2 más pequeña que sea >= tamaño"""
+    potencia = 1
+    while potencia < tamano:
+        potencia <<= 1
+    return potencia
+
+
+def _hash_nombre(nombre: bytes) -> int:
+    # hash() de Python cambia entre procesos; crc32 es estable
+    return zlib.crc32(nombre)
+
+
+class SistemaBuddyCompartido:
+    def __init__(self, tamano_total: int = 1024, tam_min_bloque: int = 1, lock=None,
+                 max_procesos: Optional[int] = None, nombre: Optional[str] = None,
+                 _adjuntar: bool = False):
+        if lock is None:
+            import multiprocessing
+            lock = multiprocessing.Lock()
+        self.lock = lock
+
+        if _adjuntar:
+            self._shm_meta = shared_memory.SharedMemory(name=nombre)
+            (magico, total, min_bloque, niveles, capacidad, *_resto) = _ENCABEZADO.unpack_from(self._shm_meta.buf, 0)
+            if magico != _MAGICO:
+                raise ValueError(f"El segmento '{nombre}' no contiene un SistemaBuddyCompartido")
+            self.total = total
+            self.min_bloque = min_bloque
+            self.niveles = niveles
+            self.capacidad_nombres = capacidad
+            self._shm_arena = shared_memory.SharedMemory(name=nombre + "_arena")
+            self._mapear()
+            return
+
+        # Ajustes a potencias de 2 (igual que SistemaBuddy)
+        self.total = _potencia_requerida(max(1, tamano_total))
+        self.min_bloque = _potencia_requerida(max(1, tam_min_bloque))
+        if self.min_bloque > self.total:
+            self.min_bloque = self.total
+        self.niveles = (self.total // self.min_bloque).bit_length() - 1
+
+        # Nunca puede haber más procesos vivos que bloques mínimos
+        hojas = 1 << self.niveles
+        if max_procesos is None:
+            max_procesos = min(hojas, 65536)
+        self.capacidad_nombres = _potencia_requerida(2 * max(1, min(max_procesos, hojas)))
+
+        self._shm_meta = shared_memory.SharedMemory(create=True, size=self._tamano_metadatos(), name=nombre)
+        self._shm_arena = shared_memory.SharedMemory(create=True, size=self.total, name=self._shm_meta.name + "_arena")
+        self._mapear()
+
+        _ENCABEZADO.pack_into(self._shm_meta.buf, 0, _MAGICO, self.total, self.min_bloque,
+                              self.niveles, self.capacidad_nombres, 0, 0, 0, 0)
+        # Raíz libre completa; el resto se inicializa al dividir
+        self._mayor[1] = self.niveles + 1
+        for i in range(self.capacidad_nombres):
+            self._ranura_nodo[i] = _RANURA_VACIA
+
+    @classmethod
+    def adjuntar(cls, nombre: str, lock) -> "SistemaBuddyCompartido":
+        """Se conecta desde otro proceso a un heap ya creado"""
+        return cls(lock=lock, nombre=nombre, _adjuntar=True)
+
+    @property
+    def nombre(self) -> str:
+        return self._shm_meta.name
+
+    # =========================
+    #   DISPOSICIÓN EN MEMORIA
+    # =========================
+    def _tamano_metadatos(self) -> int:
+        n_nodos = 2 << self.niveles  # índice 0 sin usar
+        return (_ENCABEZADO.size
+                + n_nodos * (8 + 4 + 1)
+                + self.capacidad_nombres * (4 + _LARGO_NOMBRE))
+
+    def _mapear(self):
+        n_nodos = 2 << self.niveles
+        buf = self._shm_meta.buf
+        pos = _ENCABEZADO.size
+        # Primero los campos de 8 bytes para respetar la alineación
+        self._tam = buf[pos:pos + 8 * n_nodos].cast("q")
+        pos += 8 * n_nodos
+        self._dueno = buf[pos:pos + 4 * n_nodos].cast("i")
+        pos += 4 * n_nodos
+        self._ranura_nodo = buf[pos:pos + 4 * self.capacidad_nombres].cast("i")
+        pos += 4 * self.capacidad_nombres
+        self._mayor = buf[pos:pos + n_nodos]
+        pos += n_nodos
+        self._nombres = buf[pos:pos + _LARGO_NOMBRE * self.capacidad_nombres]
+        self.arena = self._shm_arena.buf
+
+    def _leer_contadores(self):
+        return struct.unpack_from("<4q", self._shm_meta.buf, 5 * 8)
+
+    def _escribir_contadores(self, vivos: int, lapidas: int, ocupada: int, desperdicio: int):
+        struct.pack_into("<4q", self._shm_meta.buf, 5 * 8, vivos, lapidas, ocupada, desperdicio)
+
+    def cerrar(self):
+        """Suelta las vistas y se desconecta (no destruye el heap)"""
+        for vista in (self._tam, self._dueno, self._ranura_nodo, self._mayor, self._nombres):
+            vista.release()
+        self.arena = None
+        self._shm_meta.close()
+        self._shm_arena.close()
+
+    def destruir(self):
+        """Libera los segmentos del sistema operativo (solo el creador)"""
+        self._shm_meta.unlink()
+        self._shm_arena.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # =========================
+    #   TABLA DE NOMBRES
+    # =========================
+    def _buscar_ranura(self, nombre: bytes) -> int:
+        mascara = self.capacidad_nombres - 1
+        i = _hash_nombre(nombre) & mascara
+        while True:
+            nodo = self._ranura_nodo[i]
+            if nodo == _RANURA_VACIA:
+                return -1
+            if nodo != _RANURA_BORRADA:
+                base = i * _LARGO_NOMBRE
+                if bytes(self._nombres[base:base + _LARGO_NOMBRE]).rstrip(b"\0") == nombre:
+                    return i
+            i = (i + 1) & mascara
+
+    def _insertar_nombre(self, nombre: bytes, nodo: int) -> int:
+        mascara = self.capacidad_nombres - 1
+        i = _hash_nombre(nombre) & mascara
+        while self._ranura_nodo[i] >= 0:
+            i = (i + 1) & mascara
+        self._ranura_nodo[i] = nodo
+        base = i * _LARGO_NOMBRE
+        self._nombres[base:base + _LARGO_NOMBRE] = nombre.ljust(_LARGO_NOMBRE, b"\0")
+        return i
+
+    def _reconstruir_tabla(self):
+        """Elimina las lápidas reinsertando las entradas vivas"""
+        vivas = []
+        for i in range(self.capacidad_nombres):
+            nodo = self._ranura_nodo[i]
+            if nodo >= 0:
+                base = i * _LARGO_NOMBRE
+                vivas.append((bytes(self._nombres[base:base + _LARGO_NOMBRE]).rstrip(b"\0"), nodo))
+            self._ranura_nodo[i] = _RANURA_VACIA
+        for nombre, nodo in vivas:
+            self._dueno[nodo] = self._insertar_nombre(nombre, nodo) + 1
+
+    def _nombre_de_ranura(self, ranura: int) -> str:
+        base = ranura * _LARGO_NOMBRE
+        return bytes(self._nombres[base:base + _LARGO_NOMBRE]).rstrip(b"\0").decode("utf-8")
+
+    # =========================
+    #   ASIGNACIÓN DE MEMORIA
+    # =========================
+    def asignar_memoria(self, espacio: int, proceso: str) -> Optional[int]:
+        """Asigna un bloque y devuelve su handle (índice del nodo) o None"""
+        if not proceso:
+            return None
+        clave = proceso.encode("utf-8")
+        if len(clave) > _LARGO_NOMBRE:
+            raise ValueError(f"Nombre de proceso demasiado largo (máx. {_LARGO_NOMBRE} bytes)")
+        req = max(_potencia_requerida(espacio), self.min_bloque)
+        if req > self.total:
+            return None
+        orden = (req // self.min_bloque).bit_length() - 1
+
+        with self.lock:
+            vivos, lapidas, ocupada, desperdicio = self._leer_contadores()
+            if vivos >= self.capacidad_nombres // 2 or self._buscar_ranura(clave) >= 0:
+                return None
+            mayor = self._mayor
+            if mayor[1] < orden + 1:
+                return None
+
+            # Descender por el hijo más a la izquierda con espacio suficiente
+            i = 1
+            nivel = self.niveles
+            while nivel > orden:
+                if mayor[i] == nivel + 1:
+                    # Bloque libre completo: dividir en dos buddies
+                    mayor[2 * i] = nivel
+                    mayor[2 * i + 1] = nivel
+                i = 2 * i if mayor[2 * i] >= orden + 1 else 2 * i + 1
+                nivel -= 1
+
+            mayor[i] = 0
+            self._tam[i] = espacio
+            self._dueno[i] = self._insertar_nombre(clave, i) + 1
+            self._propagar(i, orden)
+            self._escribir_contadores(vivos + 1, lapidas, ocupada + espacio,
+                                      desperdicio + (self.min_bloque << orden) - espacio)
+            return i
+
+    def _propagar(self, i: int, orden: int):
+        """Recalcula los resúmenes de los ancestros (fusionando buddies libres)"""
+        mayor = self._mayor
+        while i > 1:
+            i >>= 1
+            orden += 1
+            izq = mayor[2 * i]
+            der = mayor[2 * i + 1]
+            if izq == orden and der == orden:
+                mayor[i] = orden + 1
+            else:
+                mayor[i] = izq if izq > der else der
+
+    # =========================
+    #   LIBERACIÓN DE MEMORIA
+    # =========================
+    def liberar_memoria(self, proceso: Optional[str] = None, *, handle: Optional[int] = None) -> bool:
+        """Libera por nombre de proceso o por handle="""
+        if (handle is None) == (proceso is None) or not (proceso is None or isinstance(proceso, str)):
+            raise TypeError("liberar_memoria: el proceso va por nombre o el handle como handle=")
+        with self.lock:
+            if handle is not None:
+                i = handle
+                if not (1 <= i < len(self._dueno)) or self._dueno[i] == 0:
+                    return False
+                ranura = self._dueno[i] - 1
+            else:
+                ranura = self._buscar_ranura(proceso.encode("utf-8"))
+                if ranura < 0:
+                    return False
+                i = self._ranura_nodo[ranura]
+
+            vivos, lapidas, ocupada, desperdicio = self._leer_contadores()
+            orden = self.niveles - (i.bit_length() - 1)
+            espacio = self._tam[i]
+            self._ranura_nodo[ranura] = _RANURA_BORRADA
+            self._dueno[i] = 0
+            self._tam[i] = 0
+            self._mayor[i] = orden + 1
+            self._propagar(i, orden)
+            vivos -= 1
+            lapidas += 1
+            if lapidas > self.capacidad_nombres // 4:
+                self._reconstruir_tabla()
+                lapidas = 0
+            self._escribir_contadores(vivos, lapidas, ocupada - espacio,
+                                      desperdicio - ((self.min_bloque << orden) - espacio))
+            return True
+
+    # =========================
+    #   CONSULTAS
+    # =========================
+    def direccion_de(self, handle: int) -> int:
+        nivel = handle.bit_length() - 1
+        tamano = self.total >> nivel
+        return (handle - (1 << nivel)) * tamano
+
+    def tamano_de(self, handle: int) -> int:
+        return self.total >> (handle.bit_length() - 1)
+
+    def bloque(self, handle: int) -> memoryview:
+        """Vista sobre los bytes de la arena que pertenecen al bloque"""
+        inicio = self.direccion_de(handle)
+        return self.arena[inicio:inicio + self.tamano_de(handle)]
+
+    def buscar(self, proceso: str) -> Optional[int]:
+        """Handle del bloque de un proceso (o None)"""
+        with self.lock:
+            ranura = self._buscar_ranura(proceso.encode("utf-8"))
+            return self._ranura_nodo[ranura] if ranura >= 0 else None
+
+    def memoria_desperdiciada(self) -> int:
+        return self._leer_contadores()[3]
+
+    def memoria_ocupada(self) -> int:
+        return self._leer_contadores()[2]
+
+    def memoria_disponible(self) -> int:
+        return self.total - self.memoria_ocupada()
+
+    def obtener_buddy_address(self, direccion: int, tamano: int) -> int:
+        """Calcula la dirección del buddy de un bloque"""
+        return direccion ^ tamano
+
+    def hojas_en_orden(self) -> List[NodoMemoria]:
+        """Retorna los bloques hoja de izquierda a derecha (copias para la GUI)"""
+        hojas: List[NodoMemoria] = []
+        with self.lock:
+            pila = [1]
+            while pila:
+                i = pila.pop()
+                orden = self.niveles - (i.bit_length() - 1)
+                if self._dueno[i] or self._mayor[i] == orden + 1 or orden == 0:
+                    nodo = NodoMemoria(self.min_bloque << orden, self.direccion_de(i))
+                    if self._dueno[i]:
+                        nodo.ocupado = True
+                        nodo.proceso = self._nombre_de_ranura(self._dueno[i] - 1)
+                        nodo.tamOcupado = self._tam[i]
+                    hojas.append(nodo)
+                else:
+                    pila.append(2 * i + 1)
+                    pila.append(2 * i)
+        return hojas
+
+    def procesos_vigentes(self) -> List[str]:
+        nombres: List[str] = []
+        with self.lock:
+            for ranura in range(self.capacidad_nombres):
+                if self._ranura_nodo[ranura] >= 0:
+                    nombres.append(self._nombre_de_ranura(ranura))
+        return sorted(nombres)
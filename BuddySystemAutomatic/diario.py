@@ -0,0 +1,340 @@
+from __future__ import annotations
+from typing import Optional, List, Tuple
+import os
+import re
+import struct
+import threading
+import zlib
+
+from BuddySystem import SistemaBuddy
+from NodoMemoria import NodoMemoria
+from asignadores import resolver_handle
+from instantanea import serializar, cargar_instantanea, codigo_motor
+
+# =========================
+#   DIARIO DE ESCRITURA ANTICIPADA
+# =========================
+#
+# SistemaDiario envuelve un SistemaBuddy o SistemaBuddyPonderado (los motores
+# que instantanea.py sabe guardar; con otro lanza TypeError) y anota cada
+# asignación, liberación y redimensión en un diario de sólo agregado, para
+# recuperar el estado después de una caída sin guardar una instantánea completa
+# por operación. Se recupera en la misma clase, que guarda la instantánea base.
+#
+# Directorio:
+#   instantanea-<n>.bdsn   estado al comenzar el segmento n (ver instantanea.py)
+#   diario-<n>.log         operaciones posteriores, en marcos (largo I, crc32 I, contenido)
+#
+# Cada marco es una operación completa. Se anota la ubicación física resultante
+# (dirección, tamaño, tamOcupado, handle, pid), no la solicitud, así reproducirla
+# no depende de la política ni del estado interno de la colocación. Antes de una
+# asignación se anotan los nombres internados desde el último marco, en orden,
+# para que al recuperar cada proceso tenga el mismo id que antes de la caída.
+#
+# Durabilidad (commit en grupo): los marcos se juntan en memoria y se escriben
+# con un solo write + fsync cada `sincronizar_cada` operaciones o cada
+# `intervalo_ms`, lo que ocurra primero. Ante una caída se pierden a lo sumo
+# esas operaciones. sincronizar_cada=1 sincroniza cada operación antes de
+# devolver; 0 nunca llama a fsync (sólo write, lo resuelve el sistema operativo).
+#
+# Compactación: al superar `compactar_bytes` se rota a un segmento nuevo y la
+# instantánea del estado se escribe y sincroniza en un hilo aparte; recién
+# entonces se borran los segmentos viejos. La serialización (una pasada en
+# memoria) se hace en el hilo que opera, porque necesita un estado consistente.
+#
+# Recuperación: la instantánea más nueva que se pueda leer, más los segmentos
+# desde el suyo en adelante. Un marco incompleto o con crc inválido al final
+# (escritura cortada por la caída) se descarta.
+
+ASIGNAR, LIBERAR, REDIMENSIONAR, NOMBRE = 1, 2, 3, 4
+_MARCO = struct.Struct("<II")           # largo del contenido, crc32 del contenido
+_BLOQUE = struct.Struct("<Bqqqii")      # tipo, direccion, tamano, tamOcupado, handle, pid
+_LIBERAR = struct.Struct("<Bi")         # tipo, handle
+_NOMBRE = struct.Struct("<BH")          # tipo, largo del nombre (le sigue el nombre)
+
+_ARCHIVO = re.compile(r"^(instantanea|diario)-(\d+)\.(bdsn|log)$")
+
+def _ruta(directorio: str, tipo: str, seq: int) -> str:
+    extension = "bdsn" if tipo == "instantanea" else "log"
+    return os.path.join(directorio, f"{tipo}-{seq:08d}.{extension}")
+
+
+def _listar(directorio: str, tipo: str) -> List[int]:
+    seqs = []
+    for nombre in os.listdir(directorio):
+        m = _ARCHIVO.match(nombre)
+        if m and m.group(1) == tipo:
+            seqs.append(int(m.group(2)))
+    return sorted(seqs)
+
+
+def _escribir_sincronizado(ruta: str, datos: bytes):
+    """Escribe en un temporal, sincroniza y lo renombra (atómico ante caídas)"""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(datos)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(os.path.dirname(ruta) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+# =========================
+#   REPRODUCCIÓN
+# =========================
+def _hoja_en(sistema: SistemaBuddy, direccion: int, tamano: int) -> NodoMemoria:
+    """Baja desde la raíz hasta la hoja libre (direccion, tamano), dividiendo lo necesario"""
+    nodo = sistema.raiz
+    while nodo.tamano > tamano:
+        if nodo.es_hoja():
+            sistema._dividir(nodo)
+        nodo = nodo.hijoIzquierdo if direccion < nodo.hijoDerecho.direccion else nodo.hijoDerecho
+    if nodo.tamano != tamano or nodo.direccion != direccion or not nodo.es_hoja() or nodo.ocupado:
+        raise ValueError(f"El diario no coincide con el árbol en la dirección {direccion}")
+    return nodo
+
+
+def _aplicar(sistema: SistemaBuddy, contenido: memoryview):
+    if contenido[0] == LIBERAR:
+        sistema.liberar_memoria(handle=_LIBERAR.unpack_from(contenido)[1])
+        return
+    pos = 0
+    while pos < len(contenido):
+        if contenido[pos] == NOMBRE:
+            _, largo = _NOMBRE.unpack_from(contenido, pos)
+            pos += _NOMBRE.size
+            sistema.id_proceso(str(contenido[pos:pos + largo], "utf-8"))
+            pos += largo
+            continue
+        tipo, direccion, tamano, tam, handle, pid = _BLOQUE.unpack_from(contenido, pos)
+        pos += _BLOQUE.size
+        if tipo == REDIMENSIONAR:
+            nodo = sistema.nodo_de(handle)
+            if nodo.direccion == direccion:
+                sistema.redimensionar_memoria(handle, tam)
+            else:
+                sistema._trasladar(nodo, _hoja_en(sistema, direccion, tamano), tam)
+        else:
+            nodo = _hoja_en(sistema, direccion, tamano)
+            sistema._ocupar(nodo, tam)
+            sistema._registrar(nodo, pid, handle)
+
+
+def _reproducir_segmento(sistema: SistemaBuddy, ruta: str) -> int:
+    """Aplica los marcos válidos de un segmento; devuelve cuántos aplicó"""
+    with open(ruta, "rb") as f:
+        datos = memoryview(f.read())
+    pos = aplicados = 0
+    while pos + _MARCO.size <= len(datos):
+        largo, crc = _MARCO.unpack_from(datos, pos)
+        contenido = datos[pos + _MARCO.size:pos + _MARCO.size + largo]
+        if len(contenido) < largo or zlib.crc32(contenido) != crc:
+            break  # escritura cortada: lo que sigue no llegó a disco completo
+        _aplicar(sistema, contenido)
+        pos += _MARCO.size + largo
+        aplicados += 1
+    return aplicados
+
+
+def recuperar(directorio: str) -> Tuple[SistemaBuddy, int]:
+    """Reconstruye el estado: última instantánea legible + los diarios posteriores.
+
+    Devuelve (sistema, último número de segmento).
+    """
+    instantaneas = _listar(directorio, "instantanea")
+    for base in reversed(instantaneas):
+        try:
+            sistema = cargar_instantanea(_ruta(directorio, "instantanea", base))
+            break
+        except (ValueError, struct.error, OSError):
+            continue
+    else:
+        raise FileNotFoundError(f"No hay instantánea válida en {directorio}")
+
+    ultimo = base
+    for seq in _listar(directorio, "diario"):
+        if seq >= base:
+            _reproducir_segmento(sistema, _ruta(directorio, "diario", seq))
+            ultimo = seq
+    sistema._reconstruir_handles_libres()
+    return sistema, ultimo
+
+
+# =========================
+#   SISTEMA CON DIARIO
+# =========================
+class SistemaDiario:
+    def __init__(self, sistema: SistemaBuddy, directorio: str, sincronizar_cada: int = 256,
+                 intervalo_ms: float = 10.0, compactar_bytes: int = 64 * 1024 * 1024,
+                 _seq: Optional[int] = None):
+        # Sólo motores que se pueden guardar en una instantánea y recuperar igual
+        codigo_motor(sistema)
+        os.makedirs(directorio, exist_ok=True)
+        self.sistema = sistema
+        self.directorio = directorio
+        self.sincronizar_cada = max(0, sincronizar_cada)
+        self.compactar_bytes = compactar_bytes
+        self._candado = threading.Lock()
+        self._pendiente: List[bytes] = []
+        self._ops_pendientes = 0
+        self._bytes_segmento = 0
+        self._compactacion: Optional[threading.Thread] = None
+        # Nombres internados que ya están en la instantánea o en el diario
+        self._nombres_anotados = len(sistema._nombres)
+        # Estadísticas
+        self.sincronizaciones = 0
+        self.compactaciones = 0
+
+        if _seq is None:
+            # Directorio nuevo: la instantánea inicial es la base de la recuperación
+            _seq = max(_listar(directorio, "instantanea") + _listar(directorio, "diario") + [0]) + 1
+            _escribir_sincronizado(_ruta(directorio, "instantanea", _seq), serializar(sistema))
+        self._seq = _seq
+        self._archivo = open(_ruta(directorio, "diario", self._seq), "ab")
+
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        if intervalo_ms > 0:
+            self._hilo = threading.Thread(target=self._sincronizar_periodico,
+                                          args=(intervalo_ms / 1000.0,), daemon=True)
+            self._hilo.start()
+
+    @classmethod
+    def abrir(cls, directorio: str, tamano_total: int = 1024, tam_min_bloque: int = 1,
+              **opciones) -> "SistemaDiario":
+        """Recupera el estado del directorio o, si está vacío, empieza uno nuevo"""
+        if os.path.isdir(directorio) and _listar(directorio, "instantanea"):
+            sistema, ultimo = recuperar(directorio)
+            # Se sigue en un segmento nuevo: el anterior puede terminar en un marco cortado
+            return cls(sistema, directorio, _seq=ultimo + 1, **opciones)
+        return cls(SistemaBuddy(tamano_total, tam_min_bloque), directorio, **opciones)
+
+    # Lo que no se anota se delega en el sistema envuelto
+    def __getattr__(self, nombre):
+        if nombre == "sistema":
+            raise AttributeError(nombre)
+        return getattr(self.sistema, nombre)
+
+    # --------- Operaciones anotadas ---------
+    def asignar_memoria(self, espacio: int, *args, **kwargs) -> Optional[int]:
+        handle = self.sistema.asignar_memoria(espacio, *args, **kwargs)
+        if handle is not None:
+            self._anotar(b"".join([*self._nombres_nuevos(),
+                                   *(self._bloque(ASIGNAR, nodo) for nodo in self.sistema.nodos_de(handle))]))
+        return handle
+
+    def liberar_memoria(self, proceso: Optional[str] = None, *, handle: Optional[int] = None) -> bool:
+        handle = resolver_handle(self.sistema, proceso, handle)
+        if handle is None or not self.sistema.liberar_memoria(handle=handle):
+            return False
+        self._anotar(_LIBERAR.pack(LIBERAR, handle))
+        return True
+
+    def redimensionar_memoria(self, handle: int, espacio: int) -> bool:
+        if not self.sistema.redimensionar_memoria(handle, espacio):
+            return False
+        self._anotar(self._bloque(REDIMENSIONAR, self.sistema.nodo_de(handle)))
+        return True
+
+    @staticmethod
+    def _bloque(tipo: int, nodo: NodoMemoria) -> bytes:
+        return _BLOQUE.pack(tipo, nodo.direccion, nodo.tamano, nodo.tamOcupado, nodo.handle, nodo.pid)
+
+    def _nombres_nuevos(self) -> List[bytes]:
+        """Registros NOMBRE de lo internado desde la última anotación (en orden de id)"""
+        nombres = self.sistema._nombres
+        registros = []
+        for nombre in nombres[self._nombres_anotados:]:
+            crudo = nombre.encode("utf-8")
+            registros.append(_NOMBRE.pack(NOMBRE, len(crudo)) + crudo)
+        self._nombres_anotados = len(nombres)
+        return registros
+
+    # --------- Commit en grupo ---------
+    def _anotar(self, contenido: bytes):
+        marco = _MARCO.pack(len(contenido), zlib.crc32(contenido)) + contenido
+        with self._candado:
+            self._pendiente.append(marco)
+            self._ops_pendientes += 1
+            if self.sincronizar_cada:
+                if self._ops_pendientes >= self.sincronizar_cada:
+                    self._volcar(sincronizar=True)
+            elif self._ops_pendientes >= 1024:
+                self._volcar(sincronizar=False)
+        if self.compactar_bytes and self._bytes_segmento >= self.compactar_bytes:
+            self.compactar()
+
+    def _volcar(self, sincronizar: bool):
+        """Escribe lo pendiente con una sola llamada (con el candado tomado)"""
+        if self._pendiente:
+            datos = b"".join(self._pendiente)
+            self._archivo.write(datos)
+            self._archivo.flush()
+            self._bytes_segmento += len(datos)
+            self._pendiente.clear()
+            self._ops_pendientes = 0
+        if sincronizar:
+            os.fsync(self._archivo.fileno())
+            self.sincronizaciones += 1
+
+    def sincronizar(self):
+        """Barrera: todo lo anotado hasta ahora queda en disco"""
+        with self._candado:
+            self._volcar(sincronizar=True)
+
+    def _sincronizar_periodico(self, intervalo: float):
+        while not self._parar.wait(intervalo):
+            with self._candado:
+                if self._pendiente:
+                    self._volcar(sincronizar=self.sincronizar_cada != 0)
+
+    # --------- Compactación ---------
+    def compactar(self, esperar: bool = False):
+        """Rota el diario y guarda una instantánea nueva en segundo plano"""
+        if self._compactacion is not None and self._compactacion.is_alive():
+            if not esperar:
+                return
+            self._compactacion.join()
+        with self._candado:
+            self._volcar(sincronizar=True)
+            datos = serializar(self.sistema)
+            self._nombres_anotados = len(self.sistema._nombres)
+            self._archivo.close()
+            self._seq += 1
+            self._archivo = open(_ruta(self.directorio, "diario", self._seq), "ab")
+            self._bytes_segmento = 0
+        self._compactacion = threading.Thread(target=self._escribir_instantanea,
+                                              args=(datos, self._seq), daemon=True)
+        self._compactacion.start()
+        if esperar:
+            self._compactacion.join()
+
+    def _escribir_instantanea(self, datos: bytes, seq: int):
+        _escribir_sincronizado(_ruta(self.directorio, "instantanea", seq), datos)
+        # Con la instantánea nueva en disco, lo anterior ya no hace falta
+        for tipo in ("instantanea", "diario"):
+            for viejo in _listar(self.directorio, tipo):
+                if viejo < seq:
+                    os.remove(_ruta(self.directorio, tipo, viejo))
+        self.compactaciones += 1
+
+    def cerrar(self):
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        if self._compactacion is not None:
+            self._compactacion.join()
+        with self._candado:
+            self._volcar(sincronizar=True)
+            self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,278 @@
+from __future__ import annotations
+from typing import Optional, List, Dict, Tuple, Union
+import sys
+
+from NodoMemoria import NodoMemoria
+from asignadores import resolver_pid, resolver_handle
+
+# =========================
+#   BUDDY SYSTEM DISPERSO (ESPACIOS DE 64 BITS)
+# =========================
+#
+# Misma API que SistemaBuddy, pensada para espacios de direcciones enormes
+# (por ejemplo 1 TB con páginas de 4 KB). Los nodos se identifican como en el
+# árbol implícito de compartido.py (raíz = 1, hijos 2i y 2i+1; el nivel es
+# i.bit_length() - 1), pero en lugar de un arreglo del tamaño del espacio
+# sólo se guarda:
+#
+#   _divididos[i] = OR de los tamaños libres del subárbol   (nodos divididos)
+#   _ocupados[i]  = (pid, tamOcupado)                       (hojas asignadas)
+#
+# Una hoja libre es cualquier nodo que no figura en ninguno de los dos pero
+# cuyo padre está dividido: las regiones libres no se materializan. La memoria
+# de metadatos es O(asignaciones vivas · log(total/min)) y asignar/liberar
+# recorren un solo camino raíz-hoja, O(log(total/min)).
+#
+# El handle de una asignación es el índice de su nodo (entero de hasta 64 bits).
+
+
+def _potencia_requerida(tamano: int) -> int:
+    """Potencia de 2 más pequeña que sea >= tamaño"""
+    return 1 << (tamano - 1).bit_length() if tamano > 1 else 1
+
+
+class SistemaBuddyDisperso:
+    def __init__(self, tamano_total: int = 1024, tam_min_bloque: int = 1):
+        self.total = _potencia_requerida(max(1, tamano_total))
+        self.min_bloque = min(_potencia_requerida(max(1, tam_min_bloque)), self.total)
+        self.niveles = (self.total // self.min_bloque).bit_length() - 1
+        # Sin política ni dispersión: siempre el bloque libre más a la izquierda
+        self.politica = None
+        self.max_fragmentos = 1
+
+        self._divididos: Dict[int, int] = {}
+        self._ocupados: Dict[int, Tuple[int, int]] = {}
+
+        # Nombres de proceso internados una sola vez: nombre <-> id compacto
+        self._ids: Dict[str, int] = {}
+        self._nombres: List[str] = []
+        self._handle_de_pid: List[int] = []     # id de proceso -> handle vigente (-1 = ninguno)
+
+        # Contadores incrementales (igual que SistemaBuddy)
+        self._libres_por_orden: List[int] = [0] * self.total.bit_length()
+        self._libres_por_orden[-1] = 1
+        self._total_libre = self.total
+        self._ocupada = 0
+        self._desperdicio = 0
+
+    @staticmethod
+    def obtener_potencia_requerida(tamano: int) -> int:
+        return _potencia_requerida(tamano)
+
+    # Geometría del árbol implícito
+    def tamano_de(self, i: int) -> int:
+        return self.total >> (i.bit_length() - 1)
+
+    def direccion_de(self, i: int) -> int:
+        nivel = i.bit_length() - 1
+        return (i - (1 << nivel)) * (self.total >> nivel)
+
+    def _mascara(self, i: int) -> int:
+        mascara = self._divididos.get(i)
+        if mascara is not None:
+            return mascara
+        return 0 if i in self._ocupados else self.total >> (i.bit_length() - 1)
+
+    def _propagar(self, i: int):
+        """Recalcula los resúmenes desde i hacia la raíz hasta que dejen de cambiar"""
+        divididos = self._divididos
+        mascara_de = self._mascara
+        while i:
+            mascara = mascara_de(2 * i) | mascara_de(2 * i + 1)
+            if divididos[i] == mascara:
+                return
+            divididos[i] = mascara
+            i >>= 1
+
+    # Handles e ids de proceso
+    def id_proceso(self, nombre: str) -> int:
+        """Interna el nombre y devuelve su id compacto"""
+        pid = self._ids.get(nombre)
+        if pid is None:
+            pid = len(self._nombres)
+            nombre = sys.intern(nombre)
+            self._ids[nombre] = pid
+            self._nombres.append(nombre)
+            self._handle_de_pid.append(-1)
+        return pid
+
+    def nombre_proceso(self, pid: int) -> str:
+        return self._nombres[pid]
+
+    def handle_de(self, proceso: Union[str, int]) -> Optional[int]:
+        """Handle vigente de un proceso (por nombre o id), o None"""
+        pid = self._ids.get(proceso) if isinstance(proceso, str) else proceso
+        if pid is None or not (0 <= pid < len(self._handle_de_pid)):
+            return None
+        handle = self._handle_de_pid[pid]
+        return handle if handle >= 0 else None
+
+    def asignar_memoria(self, espacio: int, proceso: Optional[str] = None,
+                        vida: Optional[Union[int, str]] = None, *, pid: Optional[int] = None) -> Optional[int]:
+        """Solicita memoria para un proceso (nombre, o pid=id); devuelve su handle o None"""
+        pid = resolver_pid(self, proceso, pid)
+        if pid is None or self._handle_de_pid[pid] >= 0:
+            return None
+        espacio2 = max(_potencia_requerida(espacio), self.min_bloque)
+        if espacio2 > self.total or not (self._mascara(1) & -espacio2):
+            return None
+
+        # Bajar hasta la hoja libre suficiente más a la izquierda
+        divididos = self._divididos
+        i = 1
+        while i in divididos:
+            i <<= 1
+            if not (self._mascara(i) & -espacio2):
+                i += 1
+        tam = self.total >> (i.bit_length() - 1)
+        self._libres_por_orden[tam.bit_length() - 1] -= 1
+
+        # Dividir hacia la izquierda: cada mitad derecha queda libre sin materializarse
+        while tam > espacio2:
+            divididos[i] = 0  # provisional: _propagar lo recalcula (nunca es 0 tras dividir)
+            tam >>= 1
+            self._libres_por_orden[tam.bit_length() - 1] += 1
+            i <<= 1
+
+        self._ocupados[i] = (pid, espacio)
+        self._handle_de_pid[pid] = i
+        self._total_libre -= tam
+        self._ocupada += espacio
+        self._desperdicio += tam - espacio
+        self._propagar(i >> 1)
+        return i
+
+    def liberar_memoria(self, proceso: Optional[str] = None, *, handle: Optional[int] = None) -> bool:
+        """Libera por nombre de proceso o por handle="""
+        handle = resolver_handle(self, proceso, handle)
+        if handle is None:
+            return False
+        datos = self._ocupados.pop(handle, None)
+        if datos is None:
+            return False
+        pid, tam_ocupado = datos
+        self._handle_de_pid[pid] = -1
+        tam = self.total >> (handle.bit_length() - 1)
+        self._total_libre += tam
+        self._ocupada -= tam_ocupado
+        self._desperdicio -= tam - tam_ocupado
+
+        # Fusionar mientras el buddy sea una hoja libre
+        divididos, ocupados = self._divididos, self._ocupados
+        i = handle
+        while i > 1:
+            buddy = i ^ 1
+            if buddy in divididos or buddy in ocupados:
+                break
+            self._libres_por_orden[tam.bit_length() - 1] -= 1
+            i >>= 1
+            del divididos[i]
+            tam <<= 1
+        self._libres_por_orden[tam.bit_length() - 1] += 1
+        if i > 1:
+            self._propagar(i >> 1)
+        return True
+
+    # Vistas de nodos (se crean al consultar; no forman parte del estado)
+    def _vista(self, i: int) -> NodoMemoria:
+        nodo = NodoMemoria(self.tamano_de(i), self.direccion_de(i))
+        datos = self._ocupados.get(i)
+        if datos is not None:
+            nodo.ocupado = True
+            nodo.pid, nodo.tamOcupado = datos
+            nodo.proceso = self._nombres[nodo.pid]
+            nodo.handle = i
+            nodo.mascara_libres = 0
+        return nodo
+
+    def nodo_de(self, handle: int) -> Optional[NodoMemoria]:
+        return self._vista(handle) if handle in self._ocupados else None
+
+    def nodos_de(self, handle: int) -> List[NodoMemoria]:
+        nodo = self.nodo_de(handle)
+        return [nodo] if nodo is not None else []
+
+    def fragmentos_de(self, handle: int) -> int:
+        return 1 if handle in self._ocupados else 0
+
+    def _hojas(self, inicio: int = 0, fin: Optional[int] = None):
+        """Índices de las hojas (en orden de dirección) que se solapan con [inicio, fin)"""
+        fin = self.total if fin is None else fin
+        pila = [1]
+        while pila:
+            i = pila.pop()
+            direccion, tam = self.direccion_de(i), self.tamano_de(i)
+            if direccion >= fin or direccion + tam <= inicio:
+                continue
+            if i in self._divididos:
+                pila.append(2 * i + 1)
+                pila.append(2 * i)
+            else:
+                yield i
+
+    # Utilidades para GUI
+    def hojas_en_orden(self) -> List[NodoMemoria]:
+        """Retorna la lista de bloques hoja de izquierda a derecha (vistas)"""
+        return [self._vista(i) for i in self._hojas()]
+
+    def como_arreglo(self):
+        """Disposición de memoria como arreglo estructurado de NumPy (ver disposicion.py)"""
+        from disposicion import como_arreglo
+        return como_arreglo(self)
+
+    def bloque_en(self, direccion: int) -> Optional[NodoMemoria]:
+        """Hoja que contiene la dirección dada (O(log n))"""
+        if not (0 <= direccion < self.total):
+            return None
+        i, tam = 1, self.total
+        while i in self._divididos:
+            tam >>= 1
+            i = 2 * i + (1 if direccion & tam else 0)
+        return self._vista(i)
+
+    def bloques_en_rango(self, inicio: int, fin: int) -> List[NodoMemoria]:
+        return [self._vista(i) for i in self._hojas(max(0, inicio), fin)]
+
+    def procesos_vigentes(self) -> List[str]:
+        nombres = self._nombres
+        return sorted(nombres[pid] for pid, _ in self._ocupados.values())
+
+    def num_procesos_vigentes(self) -> int:
+        return len(self._ocupados)
+
+    def obtener_buddy_address(self, direccion: int, tamano: int) -> int:
+        return direccion ^ tamano
+
+    # Contabilidad y fragmentación (O(1) u O(número de órdenes))
+    def memoria_ocupada(self) -> int:
+        return self._ocupada
+
+    def memoria_desperdiciada(self) -> int:
+        return self._desperdicio
+
+    def memoria_disponible(self) -> int:
+        return self.total - self._ocupada
+
+    def memoria_libre(self) -> int:
+        return self._total_libre
+
+    def mayor_bloque_libre(self) -> int:
+        mascara = self._mascara(1)
+        return 1 << (mascara.bit_length() - 1) if mascara else 0
+
+    def histograma_libres(self) -> Dict[int, int]:
+        return {1 << orden: n for orden, n in enumerate(self._libres_por_orden) if n}
+
+    def indice_fragmentacion_externa(self) -> float:
+        if self._total_libre == 0:
+            return 0.0
+        return 1.0 - self.mayor_bloque_libre() / self._total_libre
+
+    def cabe(self, tamano: int) -> bool:
+        return max(_potencia_requerida(tamano), self.min_bloque) <= self.mayor_bloque_libre()
+
+    def bytes_metadatos(self) -> int:
+        """Memoria aproximada de los metadatos (crece con las asignaciones, no con el total)"""
+        return (sys.getsizeof(self._divididos) + sys.getsizeof(self._ocupados)
+                + sum(sys.getsizeof(v) for v in self._ocupados.values())
+                + sys.getsizeof(self._handle_de_pid) + sys.getsizeof(self._libres_por_orden))
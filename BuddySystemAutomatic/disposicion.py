@@ -0,0 +1,164 @@
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+
+# =========================
+#   DISPOSICIÓN DE MEMORIA COMO ARREGLO ESTRUCTURADO
+# =========================
+#
+# como_arreglo(sistema) devuelve un arreglo estructurado de NumPy con una fila
+# por bloque hoja, ordenado por dirección:
+#
+#   direccion, tamano (int64), orden (uint8, log2 del tamaño, piso en 3·2^k),
+#   ocupado (bool), tamOcupado (int64), pid (int32, -1 = libre)
+#
+# Con el árbol de objetos se arma en una sola pasada por la cadena de hojas,
+# sin listas intermedias. Con SistemaBuddyDisperso se calcula directo de los
+# diccionarios de índices (sin crear un NodoMemoria por bloque): las hojas
+# libres son los hijos de nodos divididos que no están ni divididos ni ocupados.
+#
+# Las funciones de abajo son vectorizadas, así analizar una disposición de un
+# millón de bloques toma milisegundos.
+#
+# Requisitos: numpy
+
+DTYPE_DISPOSICION = np.dtype([
+    ("direccion", np.int64),
+    ("tamano", np.int64),
+    ("orden", np.uint8),
+    ("ocupado", np.bool_),
+    ("tamOcupado", np.int64),
+    ("pid", np.int32),
+])
+
+
+def como_arreglo(sistema) -> np.ndarray:
+    """Arreglo estructurado (DTYPE_DISPOSICION) de los bloques hoja del sistema"""
+    if hasattr(sistema, "_divididos"):
+        return _desde_indices(sistema)
+    if hasattr(sistema, "_primera"):
+        return _desde_cadena(sistema._primera)
+    return _desde_nodos(sistema.hojas_en_orden())
+
+
+def _desde_cadena(primera) -> np.ndarray:
+    def filas():
+        n = primera
+        while n is not None:
+            tamano = n.tamano
+            yield (n.direccion, tamano, tamano.bit_length() - 1, n.ocupado, n.tamOcupado, n.pid)
+            n = n.siguiente
+    return np.fromiter(filas(), dtype=DTYPE_DISPOSICION)
+
+
+def _desde_nodos(hojas) -> np.ndarray:
+    return np.fromiter(((n.direccion, n.tamano, n.tamano.bit_length() - 1, n.ocupado, n.tamOcupado,
+                         getattr(n, "pid", -1)) for n in hojas),
+                       dtype=DTYPE_DISPOSICION, count=len(hojas))
+
+
+def _niveles(indices: np.ndarray, max_nivel: int) -> np.ndarray:
+    """Nivel (bit_length - 1) de cada índice del árbol implícito, sin pasar por float"""
+    nivel = np.zeros(len(indices), dtype=np.int64)
+    for k in range(1, max_nivel + 1):
+        nivel += indices >= (1 << k)
+    return nivel
+
+
+def _desde_indices(sistema) -> np.ndarray:
+    ocupados = sistema._ocupados
+    divididos = np.fromiter(sistema._divididos.keys(), dtype=np.int64, count=len(sistema._divididos))
+    i_ocupados = np.fromiter(ocupados.keys(), dtype=np.int64, count=len(ocupados))
+    if len(divididos):
+        # Un nodo dividido nunca tiene sus dos hijos libres (se habrían fusionado),
+        # así que las hojas libres son los hermanos de nodos divididos u ocupados
+        # que no están entre ellos. Ordenados, los hermanos (2k, 2k+1) quedan juntos.
+        cubiertos = np.sort(np.concatenate((divididos, i_ocupados)))
+        cubiertos = cubiertos[cubiertos > 1]
+        hermanos = cubiertos ^ 1
+        acompanado = np.zeros(len(cubiertos), dtype=np.bool_)
+        acompanado[:-1] |= hermanos[:-1] == cubiertos[1:]
+        acompanado[1:] |= hermanos[1:] == cubiertos[:-1]
+        libres = hermanos[~acompanado]
+    else:
+        libres = np.array([] if len(i_ocupados) else [1], dtype=np.int64)
+
+    indices = np.concatenate((i_ocupados, libres))
+    nivel = _niveles(indices, sistema.niveles)
+    arreglo = np.empty(len(indices), dtype=DTYPE_DISPOSICION)
+    tamano = np.right_shift(np.int64(sistema.total), nivel)
+    arreglo["tamano"] = tamano
+    arreglo["direccion"] = (indices - np.left_shift(np.int64(1), nivel)) * tamano
+    arreglo["orden"] = sistema.total.bit_length() - 1 - nivel
+    n_ocupados = len(i_ocupados)
+    arreglo["ocupado"][:n_ocupados] = True
+    arreglo["ocupado"][n_ocupados:] = False
+    arreglo["pid"][:n_ocupados] = np.fromiter((v[0] for v in ocupados.values()), dtype=np.int32, count=n_ocupados)
+    arreglo["pid"][n_ocupados:] = -1
+    arreglo["tamOcupado"][:n_ocupados] = np.fromiter((v[1] for v in ocupados.values()), dtype=np.int64,
+                                                     count=n_ocupados)
+    arreglo["tamOcupado"][n_ocupados:] = 0
+    return arreglo[np.argsort(arreglo["direccion"], kind="stable")]
+
+
+# =========================
+#   ANÁLISIS VECTORIZADO
+# =========================
+def desperdicio(arreglo: np.ndarray) -> int:
+    """Fragmentación interna: bytes asignados que no se pidieron"""
+    ocupados = arreglo[arreglo["ocupado"]]
+    return int((ocupados["tamano"] - ocupados["tamOcupado"]).sum())
+
+
+def fragmentacion_externa(arreglo: np.ndarray) -> float:
+    """1 - mayor bloque libre / memoria libre (0 = toda la memoria libre es contigua)"""
+    libres = arreglo["tamano"][~arreglo["ocupado"]]
+    if not len(libres):
+        return 0.0
+    return 1.0 - int(libres.max()) / int(libres.sum())
+
+
+def histograma_ordenes(arreglo: np.ndarray) -> Dict[str, np.ndarray]:
+    """Cantidad de bloques libres y ocupados por orden (índice = orden)"""
+    largo = int(arreglo["orden"].max()) + 1 if len(arreglo) else 0
+    ocupado = arreglo["ocupado"]
+    return {
+        "libres": np.bincount(arreglo["orden"][~ocupado], minlength=largo),
+        "ocupados": np.bincount(arreglo["orden"][ocupado], minlength=largo),
+    }
+
+
+def ocupacion_por_region(arreglo: np.ndarray, regiones: int = 64) -> np.ndarray:
+    """Fracción ocupada de cada una de `regiones` franjas iguales del espacio.
+
+    Se evalúa la memoria ocupada acumulada en los bordes de cada franja, así los
+    bloques más grandes que una franja se reparten exactamente entre varias.
+    """
+    if not len(arreglo):
+        return np.zeros(regiones)
+    direccion = arreglo["direccion"]
+    tamano = arreglo["tamano"]
+    total = int(direccion[-1] + tamano[-1])
+    ocupado = np.where(arreglo["ocupado"], tamano, 0)
+    antes = np.concatenate(([0], np.cumsum(ocupado)[:-1]))   # ocupado antes de cada bloque
+
+    bordes = np.linspace(0, total, regiones + 1).astype(np.int64)
+    i = np.clip(np.searchsorted(direccion, bordes, side="right") - 1, 0, len(arreglo) - 1)
+    dentro = np.minimum(bordes - direccion[i], tamano[i])
+    acumulado = antes[i] + np.where(arreglo["ocupado"][i], dentro, 0)
+    return np.diff(acumulado) / np.diff(bordes)
+
+
+def resumen(arreglo: np.ndarray) -> dict:
+    ocupado = arreglo["ocupado"]
+    libres = arreglo["tamano"][~ocupado]
+    return {
+        "bloques": len(arreglo),
+        "ocupados": int(ocupado.sum()),
+        "memoria_ocupada": int(arreglo["tamOcupado"].sum()),
+        "memoria_libre": int(libres.sum()),
+        "mayor_libre": int(libres.max()) if len(libres) else 0,
+        "desperdicio": desperdicio(arreglo),
+        "frag_externa": fragmentacion_externa(arreglo),
+    }
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from typing import Callable, List, Optional, Tuple
+
+from NodoMemoria import NodoMemoria
+
+# =========================
+#   EXPROPIACIÓN POR PRIORIDAD
+# =========================
+#
+# Cuando una solicitud grande no entra, buscar_victimas() elige el bloque buddy
+# del orden pedido cuyo vaciado es más barato, expulsando sólo asignaciones de
+# menor prioridad. Candidatos: los nodos del árbol que alcanzan para la
+# solicitud pero cuyos hijos ya no (el bloque del tamaño pedido, esté dividido u
+# ocupado entero), y las hojas ocupadas más grandes (expulsar a su dueño libera
+# un bloque que la contiene).
+# Al expulsar a todos los ocupantes de un candidato, las fusiones lo dejan
+# libre entero, así que la asignación normal lo encuentra después.
+#
+# Costo: (expulsiones, suma de sus prioridades, bytes ocupados que se pierden),
+# comparado en ese orden. Los candidatos se recorren empezando por los que
+# tienen más libre según mascara_libres (suelen tener menos ocupantes), y la
+# mejor cantidad de expulsiones hallada poda el resto: cada subárbol se corta
+# en cuanto supera esa cota o aparece un ocupante que no se puede expulsar.
+#
+# Con asignaciones dispersas cada fragmento cuenta como una expulsión (cota
+# conservadora); al expulsar se libera el handle completo.
+
+Costo = Tuple[int, int, int]
+
+
+def _costo(nodo: NodoMemoria, prioridad: int, prioridad_de: Callable[[NodoMemoria], int],
+           cota: int) -> Optional[Costo]:
+    """Costo de vaciar el subárbol, o None si no se puede o tiene más de `cota` ocupantes"""
+    expulsiones = suma = perdidos = 0
+    pila = [nodo]
+    while pila:
+        n = pila.pop()
+        if n.hijoIzquierdo is not None:
+            if n.mascara_libres != n.tamano:
+                pila.append(n.hijoDerecho)
+                pila.append(n.hijoIzquierdo)
+        elif n.ocupado:
+            p = prioridad_de(n)
+            if p >= prioridad:
+                return None
+            expulsiones += 1
+            if expulsiones > cota:
+                return None
+            suma += p
+            perdidos += n.tamOcupado
+    return expulsiones, suma, perdidos
+
+
+def _candidatos(sistema, objetivo: int) -> List[NodoMemoria]:
+    """Nodos más chicos que todavía miden >= `objetivo` (y hojas grandes), en orden de dirección"""
+    candidatos = []
+    pila = [sistema.raiz]
+    while pila:
+        n = pila.pop()
+        if n.hijoIzquierdo is None or max(n.hijoIzquierdo.tamano, n.hijoDerecho.tamano) < objetivo:
+            candidatos.append(n)
+        else:
+            for hijo in (n.hijoDerecho, n.hijoIzquierdo):
+                if hijo.tamano >= objetivo:
+                    pila.append(hijo)
+    return candidatos
+
+
+def buscar_victimas(sistema, espacio: int, prioridad: int,
+                    prioridad_de: Callable[[NodoMemoria], int]) -> Optional[Tuple[NodoMemoria, List[int]]]:
+    """Bloque más barato de vaciar para `espacio` y los handles a expulsar, o None.
+
+    Sólo se expulsan ocupantes con prioridad_de(nodo) < prioridad. Si ya hay un
+    bloque libre que alcance devuelve ese bloque sin víctimas.
+    """
+    objetivo = max(sistema.obtener_tamano_requerido(max(1, espacio)), sistema.min_bloque)
+    if objetivo > sistema.total:
+        return None
+    mejor: Optional[Costo] = None
+    elegido = None
+    # Más libre primero (mascara_libres mayor), a igualdad el de menor dirección
+    for nodo in sorted(_candidatos(sistema, objetivo), key=lambda n: -n.mascara_libres):
+        if nodo.hijoIzquierdo is None and not nodo.ocupado:
+            return nodo, []
+        costo = _costo(nodo, prioridad, prioridad_de, mejor[0] if mejor else sistema.total)
+        if costo is not None and (mejor is None or costo < mejor):
+            mejor, elegido = costo, nodo
+    if elegido is None:
+        return None
+    handles = []
+    pila = [elegido]
+    while pila:
+        n = pila.pop()
+        if n.hijoIzquierdo is not None:
+            pila.append(n.hijoDerecho)
+            pila.append(n.hijoIzquierdo)
+        elif n.ocupado:
+            handles.append(n.handle)
+    return elegido, list(dict.fromkeys(handles))
+
+
+def expropiar(sistema, espacio: int, prioridad: int,
+              prioridad_de: Callable[[NodoMemoria], int]) -> Optional[List[int]]:
+    """Libera las víctimas más baratas para que `espacio` entre; devuelve sus pids o None"""
+    if not hasattr(sistema, "raiz"):
+        return None
+    victimas = buscar_victimas(sistema, espacio, prioridad, prioridad_de)
+    if victimas is None:
+        return None
+    _, handles = victimas
+    pids = [sistema.nodo_de(h).pid for h in handles]
+    for handle in handles:
+        sistema.liberar_memoria(handle=handle)
+    return pids
@@ -4,14 +4,16 @@ GUI del Buddy System con PyQt6
 
 Características:
 - Permite especificar "Tamaño de memoria (máxima)" y "Tamaño mínimo de bloque" para inicializar el sistema.
-- Alta de procesos: nombre y tamaño solicitado.
-- Eliminación de procesos desde una lista desplegable (ComboBox).
+- Simulación automática de procesos sobre un reloj simulado.
+- Reproducción: velocidad de 1× a 1000×, pausa, paso a paso y salto a cualquier evento.
 - Visualización de la memoria como barras horizontales proporcionadas al tamaño de los bloques.
 - Muestra la fragmentación interna total (memoria desperdiciada).
 - Bloques buddies (socios) tienen el mismo color.
+- Gráfica en vivo de ocupación, desperdicio y tasa de rechazo.
+- Perfilado por fases con BUDDY_PERFIL=DIR (ver perfilado.py): un perfil por simulación.
 
-Requisitos: PyQt6
-    pip install PyQt6
+Requisitos: PyQt6, numpy
+    pip install PyQt6 numpy
 
 Ejecutar:
     python BuddySystem_GUI_PyQt6.py
@@ -20,13 +22,14 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, List, Tuple
 import hashlib
+import time
 
-from PyQt6.QtCore import Qt, QRectF
-from PyQt6.QtGui import QPainter, QFont, QPen, QBrush, QColor
+from PyQt6.QtCore import Qt, QRectF, QPointF, QTimer
+from PyQt6.QtGui import QPainter, QFont, QPen, QBrush, QColor, QPolygonF
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QDoubleSpinBox, QSpinBox, QLineEdit, QPushButton, QGroupBox, QLabel,
-    QMessageBox, QComboBox, QFrame
+    QMessageBox, QComboBox, QFrame, QSlider
 )
 
 from PyQt6.QtGui import QValidator
@@ -34,6 +37,19 @@ import math
 
 from simulator import Simulador
 from BuddySystem import SistemaBuddy, NodoMemoria
+from disperso import SistemaBuddyDisperso
+from asignadores import Asignador, crear_asignador, nombres_motores
+from registro import RegistradorSeries
+from reproduccion import Reproductor
+from perfilado import Perfilador, perfilador_de_entorno
+
+
+# A partir de esta cantidad de bloques mínimos se usa SistemaBuddyDisperso
+UMBRAL_DISPERSO = 1 << 24
+
+# Reproducción: multiplicadores de velocidad y cada cuánto (ms reales) se avanza
+VELOCIDADES = (1, 2, 5, 10, 50, 100, 500, 1000)
+INTERVALO_MS = 33
 
 
 class PowerOfTwoSpinBox(QSpinBox):
@@ -70,11 +86,15 @@ def convertir_a_bytes(valor: int, unidad: str) -> int:
         return valor * 1024 * 1024
     elif unidad == "GB":
         return valor * 1024 * 1024 * 1024
+    elif unidad == "TB":
+        return valor * 1024 ** 4
     else:  # Bytes
         return valor
 
 def formatear_tamano(bytes_val: int) -> str:
-    if bytes_val >= 1024*1024*1024:
+    if bytes_val >= 1024 ** 4:
+        return f"{bytes_val // 1024 ** 4} TB"
+    elif bytes_val >= 1024*1024*1024:
         return f"{bytes_val // (1024*1024*1024)} GB"
     elif bytes_val >= 1024*1024:
         return f"{bytes_val // (1024*1024)} MB"
@@ -94,18 +114,47 @@ class MemoriaView(QWidget):
         self.setMinimumHeight(180)
         self.setAutoFillBackground(True)
         self.setToolTip("Visualización de bloques: Ocupado=relleno, Libre=rayado. Borde indica tamaño del bloque.")
+        self.setMouseTracking(True)
         self.colores_buddies = {}  # Cache de colores para buddies
 
+    def mouseMoveEvent(self, event):
+        """Muestra qué bloque contiene la dirección bajo el cursor"""
+        sys = self.get_sistema()
+        rect_total = self.rect().adjusted(10, 20, -10, -20)
+        if not sys or rect_total.width() <= 0:
+            return
+        x = event.position().x() - rect_total.left()
+        direccion = int(x / rect_total.width() * sys.total)
+        nodo = sys.bloque_en(direccion)
+        if nodo is None:
+            return
+        estado = f"{nodo.proceso} ({formatear_tamano(nodo.tamOcupado)})" if nodo.ocupado else "LIBRE"
+        if nodo.ocupado and sys.fragmentos_de(nodo.handle) > 1:
+            estado += f" fragmento {self._fragmento(sys, nodo)}"
+        self.setToolTip(f"Dirección {direccion}: bloque {nodo.direccion}–{nodo.direccion + nodo.tamano - 1}"
+                        f" [{formatear_tamano(nodo.tamano)}] {estado}")
+
+    @staticmethod
+    def _fragmento(sys, nodo: NodoMemoria) -> str:
+        """'k/n' de un bloque de una asignación dispersa"""
+        nodos = sorted(sys.nodos_de(nodo.handle), key=lambda n: n.direccion)
+        return f"{nodos.index(nodo) + 1}/{len(nodos)}"
+
     def obtener_color_para_bloque(self, nodo: NodoMemoria) -> QColor:
         """Genera un color único para cada par de bloques buddies"""
         # Para bloques libres, usar un color especial
         if not nodo.ocupado:
             return QColor(200, 200, 200)  # Gris para bloques libres
         
-        # Calcular la dirección base del par de buddies
-        # Los buddies comparten la misma dirección base (la del bloque padre)
-        buddy_address = self.get_sistema().obtener_buddy_address(nodo.direccion, nodo.tamano)
-        base_address = min(nodo.direccion, buddy_address)
+        sistema = self.get_sistema()
+        if sistema.fragmentos_de(nodo.handle) > 1:
+            # Todos los fragmentos de un mismo proceso comparten color
+            base_address = ("proceso", nodo.proceso)
+        else:
+            # Calcular la dirección base del par de buddies
+            # Los buddies comparten la misma dirección base (la del bloque padre)
+            buddy_address = sistema.obtener_buddy_address(nodo.direccion, nodo.tamano)
+            base_address = min(nodo.direccion, buddy_address)
         
         # Generar un color único basado en la dirección base
         if base_address not in self.colores_buddies:
@@ -123,7 +172,7 @@ class MemoriaView(QWidget):
         return self.colores_buddies[base_address]
 
     def paintEvent(self, event):
-        sys: Optional[SistemaBuddy] = self.get_sistema()
+        sys: Optional[Asignador] = self.get_sistema()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
 
@@ -168,7 +217,10 @@ class MemoriaView(QWidget):
             # Texto informativo dentro del bloque
             info = []
             if nodo.ocupado and nodo.proceso:
-                info.append(f"{nodo.proceso}")
+                if sys.fragmentos_de(nodo.handle) > 1:
+                    info.append(f"{nodo.proceso} [{self._fragmento(sys, nodo)}]")
+                else:
+                    info.append(f"{nodo.proceso}")
                 info.append(f"{formatear_tamano(nodo.tamOcupado)}/{formatear_tamano(nodo.tamano)}")
             else:
                 info.append("LIBRE")
@@ -181,14 +233,69 @@ class MemoriaView(QWidget):
 
         painter.end()
 
+# =========================
+#   GRÁFICA EN VIVO (SERIES)
+# =========================
+class GraficaSeries(QWidget):
+    """Dibuja las últimas muestras del registrador como líneas normalizadas a [0, 1]"""
+    SERIES = (
+        ("ocupada", "Ocupada", QColor(80, 160, 255)),
+        ("desperdicio", "Desperdicio", QColor(255, 140, 0)),
+        ("tasa_rechazo", "Tasa de rechazo", QColor(220, 60, 60)),
+    )
+
+    def __init__(self, get_registrador, get_sistema, parent=None):
+        super().__init__(parent)
+        self.get_registrador = get_registrador
+        self.get_sistema = get_sistema
+        self.setMinimumHeight(120)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        rect = self.rect().adjusted(10, 10, -10, -10)
+        painter.setPen(QPen(Qt.GlobalColor.white, 1))
+        painter.drawRect(rect)
+
+        registrador = self.get_registrador()
+        sistema = self.get_sistema()
+        if registrador is None or sistema is None or len(registrador) < 2:
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "Sin muestras")
+            painter.end()
+            return
+
+        # A lo sumo un punto por píxel: se toma una de cada `paso` muestras
+        puntos = max(2, rect.width())
+        cantidad = min(len(registrador), puntos * 8)
+        paso = max(1, cantidad // puntos)
+        for y_texto, (columna, etiqueta, color) in enumerate(self.SERIES):
+            valores = registrador.ultimos(cantidad, columna)[::paso].astype(float)
+            if columna != "tasa_rechazo":
+                valores /= float(sistema.total)
+            n = len(valores)
+            if n < 2:
+                continue
+            poligono = QPolygonF([
+                QPointF(rect.left() + k * rect.width() / (n - 1), rect.bottom() - v * rect.height())
+                for k, v in enumerate(valores)
+            ])
+            painter.setPen(QPen(color, 1.5))
+            painter.drawPolyline(poligono)
+            painter.drawText(rect.left() + 6, rect.top() + 14 * (y_texto + 1), f"{etiqueta}: {valores[-1]:.2f}")
+        painter.end()
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Buddy System - Simulación Automática (PyQt6)")
         self.setMinimumSize(900, 560)
 
-        self.sistema: Optional[SistemaBuddy] = None
+        self.sistema: Optional[Asignador] = None
         self.simulador: Optional[Simulador] = None
+        self.registrador: Optional[RegistradorSeries] = None
+        self.reproductor: Optional[Reproductor] = None
+        self.perfil: Optional[Perfilador] = None
 
         cont = QWidget()
         self.setCentralWidget(cont)
@@ -202,7 +309,7 @@ class MainWindow(QMainWindow):
         self.spin_total = PowerOfTwoSpinBox()
         self.spin_total.setValue(1024)
         self.combo_total_unit = QComboBox()
-        self.combo_total_unit.addItems(["B", "KB", "MB", "GB"])
+        self.combo_total_unit.addItems(["B", "KB", "MB", "GB", "TB"])
         self.combo_total_unit.setCurrentText("KB")
 
         self.spin_min = PowerOfTwoSpinBox()
@@ -211,6 +318,15 @@ class MainWindow(QMainWindow):
         self.combo_min_unit.addItems(["B", "KB", "MB", "GB"])
         self.combo_min_unit.setCurrentText("KB")
 
+        # Motor de asignación (buddy o listas libres, ver asignadores.py)
+        self.combo_motor = QComboBox()
+        self.combo_motor.addItems(nombres_motores())
+
+        # Asignación dispersa: máximo de bloques por proceso (1 = desactivada)
+        self.spin_fragmentos = QSpinBox()
+        self.spin_fragmentos.setRange(1, 16)
+        self.spin_fragmentos.setValue(1)
+
         btn_init = QPushButton("Inicializar y Simular")
         btn_init.clicked.connect(self.on_inicializar)
 
@@ -224,12 +340,55 @@ class MainWindow(QMainWindow):
 
         f.addRow("Memoria total:", row_total)
         f.addRow("Bloque mínimo:", row_min)
+        f.addRow("Motor:", self.combo_motor)
+        f.addRow("Fragmentos por proceso:", self.spin_fragmentos)
         f.addRow(btn_init)
         init_group.setLayout(f)
 
+        # --- Reproducción (reloj simulado) ---
+        repro_group = QGroupBox("Reproducción")
+        repro = QHBoxLayout()
+
+        self.btn_pausa = QPushButton("Pausa")
+        self.btn_pausa.setCheckable(True)
+        self.btn_pausa.toggled.connect(self.on_pausa)
+        self.btn_paso = QPushButton("Paso")
+        self.btn_paso.clicked.connect(self.on_paso)
+
+        self.combo_velocidad = QComboBox()
+        self.combo_velocidad.addItems([f"{v}×" for v in VELOCIDADES])
+
+        # Deslizador sobre los eventos ya recorridos; el SpinBox permite ir más allá
+        self.slider_evento = QSlider(Qt.Orientation.Horizontal)
+        self.slider_evento.setRange(0, 0)
+        self.slider_evento.sliderMoved.connect(self.ir_a)
+        self.spin_evento = QSpinBox()
+        self.spin_evento.setRange(0, 2_147_483_647)
+        btn_ir = QPushButton("Ir")
+        btn_ir.clicked.connect(lambda: self.ir_a(self.spin_evento.value()))
+
+        self.lbl_evento = QLabel("Evento 0 | t = 0 ms")
+
+        repro.addWidget(self.btn_pausa)
+        repro.addWidget(self.btn_paso)
+        repro.addWidget(QLabel("Velocidad:"))
+        repro.addWidget(self.combo_velocidad)
+        repro.addWidget(self.slider_evento, 1)
+        repro.addWidget(self.spin_evento)
+        repro.addWidget(btn_ir)
+        repro.addWidget(self.lbl_evento)
+        repro_group.setLayout(repro)
+
+        # Avanza el reloj simulado según el tiempo real transcurrido y la velocidad
+        self.timer = QTimer(self)
+        self.timer.setInterval(INTERVALO_MS)
+        self.timer.timeout.connect(self.on_tick)
+        self._ultimo_tick = time.monotonic()
+
         # --- Indicadores ---
         info_bar = QHBoxLayout()
-        self.lbl_info = QLabel("Total: 0 | Min bloque: 0\nOcupada: 0 | Disponible: 0 | Desperdicio: 0")
+        self.lbl_info = QLabel("Total: 0 | Min bloque: 0\nOcupada: 0 | Disponible: 0 | Desperdicio: 0\n"
+                               "Mayor libre: 0 | Frag. externa: 0.00")
         self.lbl_info.setStyleSheet("font-weight: bold;")
         self.lbl_info.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
 
@@ -242,6 +401,7 @@ class MainWindow(QMainWindow):
 
         # --- Vista de memoria ---
         self.mem_view = MemoriaView(self.get_sistema)
+        self.grafica = GraficaSeries(lambda: self.registrador, self.get_sistema)
 
         # --- Listado de procesos ---
         procesos_bar = QHBoxLayout()
@@ -258,14 +418,16 @@ class MainWindow(QMainWindow):
 
         # Ensamblar layout principal
         layout.addWidget(init_group)
+        layout.addWidget(repro_group)
         layout.addLayout(info_bar)
         layout.addLayout(procesos_bar)   # ⬅️ Nuevo
         layout.addWidget(sep)
         layout.addWidget(self.mem_view, 1)
+        layout.addWidget(self.grafica)
 
 
     # --------- Callbacks ---------
-    def get_sistema(self) -> Optional[SistemaBuddy]:
+    def get_sistema(self) -> Optional[Asignador]:
         return self.sistema
 
     def on_inicializar(self):
@@ -281,35 +443,114 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Valores inválidos", "El bloque mínimo no puede ser mayor que la memoria total.")
             return
 
-        self.sistema = SistemaBuddy(total_pow2, min_pow2)
+        motor = self.combo_motor.currentText()
+        if motor != "buddy":
+            self.sistema = crear_asignador(motor, total_pow2, min_pow2)
+        elif total_pow2 // min_pow2 >= UMBRAL_DISPERSO:
+            # Espacios enormes: sólo se guardan los nodos divididos y las asignaciones
+            self.sistema = SistemaBuddyDisperso(total_pow2, min_pow2)
+        else:
+            self.sistema = SistemaBuddy(total_pow2, min_pow2, max_fragmentos=self.spin_fragmentos.value())
+        self.actualizar_ui()
+
+        # Iniciar simulador automático sobre el reloj simulado (con registro de series para la gráfica)
+        self.registrador = RegistradorSeries(capacidad=100_000)
+        self._iniciar_perfil(motor)
+        self.reproductor = Reproductor(self.sistema, registrador=self.registrador)
+        self._sincronizar()
+        self._ultimo_tick = time.monotonic()
+        self.timer.start()
+
+    # --------- Perfilado ---------
+    def _iniciar_perfil(self, motor: str):
+        """Con BUDDY_PERFIL cada simulación escribe su propio perfil (un salto lo reinstrumenta)"""
+        self._cerrar_perfil()
+        self.perfil = perfilador_de_entorno(f"gui-{motor}-{time.strftime('%Y%m%d-%H%M%S')}")
+        if self.perfil is None:
+            return
+        self.perfil.instrumentar(self.sistema, self.registrador)
+        self.perfil.envolver_metodos(self, "ui", ("actualizar_ui",))
+        self.perfil.envolver_metodos(self.mem_view, "pintar", ("paintEvent",))
+        self.perfil.envolver_metodos(self.grafica, "pintar", ("paintEvent",))
+        self.perfil.iniciar()
+
+    def _cerrar_perfil(self):
+        if self.perfil is not None:
+            print(*self.perfil.detener(), sep="\n")
+            self.perfil = None
+
+    def closeEvent(self, event):
+        self._cerrar_perfil()
+        super().closeEvent(event)
+
+    # --------- Reproducción ---------
+    def velocidad(self) -> int:
+        return VELOCIDADES[self.combo_velocidad.currentIndex()]
+
+    def _sincronizar(self):
+        """Toma el simulador y el asignador vigentes (un salto los reemplaza) y refresca"""
+        rep = self.reproductor
+        self.simulador = rep.simulador
+        if self.perfil is not None and rep.sistema is not self.sistema:
+            self.perfil.instrumentar(rep.sistema, self.registrador)
+        self.sistema = rep.sistema
+        self.slider_evento.setMaximum(rep.max_eventos)
+        if not self.slider_evento.isSliderDown():
+            self.slider_evento.setValue(rep.evento)
+        fin = " (fin)" if rep.terminado() else ""
+        self.lbl_evento.setText(f"Evento {rep.evento} / {rep.max_eventos} | t = {rep.ahora} ms{fin}")
         self.actualizar_ui()
 
-        # Iniciar simulador automático
-        self.simulador = Simulador(self.sistema, self.actualizar_ui)
-        self.simulador.iniciar()
+    def on_tick(self):
+        ahora = time.monotonic()
+        # Como mucho 250 ms reales por tick (la ventana pudo estar bloqueada)
+        real_ms = min(250.0, (ahora - self._ultimo_tick) * 1000)
+        self._ultimo_tick = ahora
+        if self.reproductor is None or self.btn_pausa.isChecked() or self.reproductor.terminado():
+            return
+        self.reproductor.avanzar(int(real_ms * self.velocidad()))
+        self._sincronizar()
+
+    def on_pausa(self, pausado: bool):
+        self.btn_pausa.setText("Reanudar" if pausado else "Pausa")
+
+    def on_paso(self):
+        """Un solo evento; pausa la reproducción"""
+        if self.reproductor is None:
+            return
+        self.btn_pausa.setChecked(True)
+        self.reproductor.paso()
+        self._sincronizar()
+
+    def ir_a(self, evento: int):
+        if self.reproductor is None:
+            return
+        self.btn_pausa.setChecked(True)
+        self.reproductor.ir_a(evento)
+        self._sincronizar()
 
     def actualizar_ui(self):
         if self.sistema:
             desperdicio = formatear_tamano(self.sistema.memoria_desperdiciada())
             ocupada = formatear_tamano(self.sistema.memoria_ocupada())
             disponible = formatear_tamano(self.sistema.memoria_disponible())
+            mayor_libre = formatear_tamano(self.sistema.mayor_bloque_libre())
+            frag_externa = self.sistema.indice_fragmentacion_externa()
 
             self.lbl_info.setText(
                 f"Total: {formatear_tamano(self.sistema.total)} | Min bloque: {formatear_tamano(self.sistema.min_bloque)}\n"
-                f"Ocupada: {ocupada} | Disponible: {disponible} | Desperdicio: {desperdicio}"
+                f"Ocupada: {ocupada} | Disponible: {disponible} | Desperdicio: {desperdicio}\n"
+                f"Mayor libre: {mayor_libre} | Frag. externa: {frag_externa:.2f}"
             )
 
             
 
             # --- Actualizar procesos ---
             if self.simulador:
-                estados = self.simulador.estados
-                total = len(estados)  # procesos totales (fijo)
+                total = len(self.simulador.estados)  # procesos totales (fijo)
 
-                pendientes = sum(1 for e in estados.values() if e == "pendiente")
-                en_ejec = sum(1 for e in estados.values() if e == "en ejecución")
-                finalizados = sum(1 for e in estados.values() if e == "finalizado")
-                no_ejecutados = sum(1 for e in estados.values() if e == "no ejecutado")
+                # Conteos mantenidos por el simulador en cada transición
+                pendientes, en_ejec, finalizados, no_ejecutados = self.simulador.conteo
 
                 # "Procesos restantes" = pendientes (los que aún no se intentaron)
                 restantes = pendientes
@@ -326,6 +567,7 @@ class MainWindow(QMainWindow):
             self.lbl_estado.setText("Sin inicializar")
 
         self.mem_view.update()
+        self.grafica.update()
 
 
 
@@ -0,0 +1,274 @@
+from __future__ import annotations
+from collections import deque
+from typing import Optional, List, Dict, Callable
+import os
+import threading
+import time
+
+# =========================
+#   INSTRUMENTACIÓN DEL ASIGNADOR
+# =========================
+#
+# Las métricas se activan con SistemaBuddy.habilitar_metricas(). En ese momento
+# se instalan envoltorios como atributos de la instancia (asignar_memoria,
+# _asignar, _dividir, _fusionar, ...) que cuentan y miden; al deshabilitarlas se
+# borran y la clase queda intacta, así que apagadas no cuestan nada.
+
+
+class Histograma:
+    """Histograma con cubetas en potencias de 2 (cubeta k: valores < 2**k)"""
+    __slots__ = ("cubetas", "n", "suma")
+
+    def __init__(self):
+        self.cubetas: List[int] = [0] * 65
+        self.n = 0
+        self.suma = 0
+
+    def agregar(self, valor: int):
+        self.cubetas[min(valor.bit_length(), 64)] += 1
+        self.n += 1
+        self.suma += valor
+
+    def percentil(self, p: float) -> int:
+        """Cota superior de la cubeta que contiene el percentil p (0-100)"""
+        if not self.n:
+            return 0
+        objetivo = p / 100.0 * self.n
+        acumulado = 0
+        for k, c in enumerate(self.cubetas):
+            acumulado += c
+            if acumulado >= objetivo:
+                return (1 << k) - 1
+        return (1 << 64) - 1
+
+    def como_dict(self) -> dict:
+        return {
+            "n": self.n,
+            "promedio": self.suma / self.n if self.n else 0.0,
+            "p50": self.percentil(50),
+            "p90": self.percentil(90),
+            "p99": self.percentil(99),
+            "cubetas": {(1 << k) - 1: c for k, c in enumerate(self.cubetas) if c},
+        }
+
+
+class Metricas:
+    def __init__(self, niveles: int, muestreo: int = 64, max_serie: int = 4096):
+        self.divisiones = 0
+        self.fusiones = 0
+        self.asignaciones = 0
+        self.liberaciones = 0
+        self.fallos_por_orden: Dict[int, int] = {}
+        # Nodos visitados por asignación: la recursión de _asignar, o el camino
+        # raíz -> hoja que recorren las políticas, la colocación por vida y los fragmentos
+        self.visitados_asignar = Histograma()
+        self.latencia_asignar = Histograma()    # ns
+        self.latencia_liberar = Histograma()    # ns
+
+        # Forma del árbol, mantenida con cada división/fusión
+        self.hojas = 1
+        self.hojas_por_nivel: List[int] = [0] * (niveles + 1)
+        self.hojas_por_nivel[0] = 1
+
+        # Serie temporal (operación, profundidad, hojas) cada `muestreo` operaciones
+        self.muestreo = max(1, muestreo)
+        self.serie: deque = deque(maxlen=max_serie)
+        self._ops = 0
+        self._visitados = 0
+        self._hilo_volcado: Optional[threading.Timer] = None
+
+    def profundidad(self) -> int:
+        for nivel in range(len(self.hojas_por_nivel) - 1, -1, -1):
+            if self.hojas_por_nivel[nivel]:
+                return nivel
+        return 0
+
+    def _contar_operacion(self):
+        self._ops += 1
+        if self._ops % self.muestreo == 0:
+            self.serie.append((self._ops, self.profundidad(), self.hojas))
+
+    # =========================
+    #   SALIDAS
+    # =========================
+    def instantanea(self) -> dict:
+        return {
+            "operaciones": self._ops,
+            "asignaciones": self.asignaciones,
+            "liberaciones": self.liberaciones,
+            "divisiones": self.divisiones,
+            "fusiones": self.fusiones,
+            "fallos_por_orden": dict(self.fallos_por_orden),
+            "hojas": self.hojas,
+            "profundidad": self.profundidad(),
+            "visitados_asignar": self.visitados_asignar.como_dict(),
+            "latencia_asignar_ns": self.latencia_asignar.como_dict(),
+            "latencia_liberar_ns": self.latencia_liberar.como_dict(),
+            "serie": list(self.serie),
+        }
+
+    def exposicion_texto(self, prefijo: str = "buddy") -> str:
+        """Formato de texto tipo Prometheus para que lo lea un recolector local"""
+        lineas: List[str] = []
+
+        def contador(nombre, valor, etiquetas=""):
+            lineas.append(f"{prefijo}_{nombre}{etiquetas} {valor}")
+
+        for nombre, valor in (("asignaciones_total", self.asignaciones), ("liberaciones_total", self.liberaciones),
+                              ("divisiones_total", self.divisiones), ("fusiones_total", self.fusiones)):
+            lineas.append(f"# TYPE {prefijo}_{nombre} counter")
+            contador(nombre, valor)
+        lineas.append(f"# TYPE {prefijo}_fallos_total counter")
+        for orden, n in sorted(self.fallos_por_orden.items()):
+            contador("fallos_total", n, f'{{orden="{orden}"}}')
+        for nombre, valor in (("hojas", self.hojas), ("profundidad", self.profundidad())):
+            lineas.append(f"# TYPE {prefijo}_{nombre} gauge")
+            contador(nombre, valor)
+        for nombre, h in (("visitados_asignar", self.visitados_asignar),
+                          ("latencia_asignar_ns", self.latencia_asignar),
+                          ("latencia_liberar_ns", self.latencia_liberar)):
+            lineas.append(f"# TYPE {prefijo}_{nombre} histogram")
+            acumulado = 0
+            for k, c in enumerate(h.cubetas):
+                acumulado += c
+                if c:
+                    contador(f"{nombre}_bucket", acumulado, f'{{le="{(1 << k) - 1}"}}')
+            contador(f"{nombre}_bucket", h.n, '{le="+Inf"}')
+            contador(f"{nombre}_sum", h.suma)
+            contador(f"{nombre}_count", h.n)
+        return "\n".join(lineas) + "\n"
+
+    def iniciar_volcado(self, intervalo: float, destino=None):
+        """Vuelca las métricas cada `intervalo` segundos.
+
+        destino puede ser una función (recibe el dict de instantanea()) o la ruta
+        de un archivo donde se reescribe la exposición de texto.
+        """
+        self.detener_volcado()
+
+        def _tick():
+            if callable(destino):
+                destino(self.instantanea())
+            elif destino:
+                temporal = f"{destino}.tmp"
+                with open(temporal, "w", encoding="utf-8") as f:
+                    f.write(self.exposicion_texto())
+                os.replace(temporal, destino)
+            else:
+                print(self.instantanea())
+            self._hilo_volcado = threading.Timer(intervalo, _tick)
+            self._hilo_volcado.daemon = True
+            self._hilo_volcado.start()
+
+        self._hilo_volcado = threading.Timer(intervalo, _tick)
+        self._hilo_volcado.daemon = True
+        self._hilo_volcado.start()
+
+    def detener_volcado(self):
+        if self._hilo_volcado is not None:
+            self._hilo_volcado.cancel()
+            self._hilo_volcado = None
+
+
+# =========================
+#   ENVOLTORIOS
+# =========================
+_ENVUELTOS = ("asignar_memoria", "liberar_memoria", "_asignar", "_dividir", "_fusionar")
+
+
+def _largo_camino(nodo) -> int:
+    """Nodos del camino raíz -> nodo (ambos incluidos)"""
+    largo = 0
+    while nodo is not None:
+        largo += 1
+        nodo = nodo.padre
+    return largo
+
+
+def instrumentar(sistema, metricas: Metricas):
+    """Instala los envoltorios instrumentados en la instancia"""
+    clase = type(sistema)
+    asignar_memoria = clase.asignar_memoria
+    liberar_memoria = clase.liberar_memoria
+    asignar = clase._asignar
+    dividir = clase._dividir
+    fusionar = clase._fusionar
+    reloj = time.perf_counter_ns
+    m = metricas
+
+    def nivel(nodo) -> int:
+        return (sistema.total // nodo.tamano).bit_length() - 1
+
+    def _asignar_memoria(espacio, *args, **kwargs):
+        m._visitados = 0
+        inicio = reloj()
+        handle = asignar_memoria(sistema, espacio, *args, **kwargs)
+        m.latencia_asignar.agregar(reloj() - inicio)
+        if handle is not None and (m._visitados == 0 or sistema.fragmentos_de(handle) > 1):
+            # Políticas, vida y fragmentos bajan por un solo camino desde la raíz
+            # (mascara_libres guía cada paso y _colocar lo continúa al dividir)
+            m._visitados += sum(_largo_camino(n) for n in sistema.nodos_de(handle))
+        elif handle is None and m._visitados == 0:
+            m._visitados = 1  # mascara_libres de la raíz ya descarta la solicitud
+        m.visitados_asignar.agregar(m._visitados)
+        if handle is None:
+            orden = sistema.obtener_potencia_requerida(max(1, espacio)).bit_length() - 1
+            m.fallos_por_orden[orden] = m.fallos_por_orden.get(orden, 0) + 1
+        else:
+            m.asignaciones += 1
+        m._contar_operacion()
+        return handle
+
+    def _liberar_memoria(*args, **kwargs):
+        inicio = reloj()
+        ok = liberar_memoria(sistema, *args, **kwargs)
+        m.latencia_liberar.agregar(reloj() - inicio)
+        if ok:
+            m.liberaciones += 1
+        m._contar_operacion()
+        return ok
+
+    def _asignar(nodo, espacio2, *args):
+        m._visitados += 1
+        return asignar(sistema, nodo, espacio2, *args)
+
+    def _dividir(nodo):
+        dividir(sistema, nodo)
+        d = nivel(nodo)
+        m.hojas_por_nivel[d] -= 1
+        m.hojas_por_nivel[d + 1] += 2
+        m.hojas += 1
+        m.divisiones += 1
+
+    def _fusionar(nodo):
+        padre = nodo.padre
+        dividido = padre is not None and not padre.es_hoja()
+        fusionar(sistema, nodo)
+        if dividido and padre.es_hoja():
+            d = nivel(padre)
+            m.hojas_por_nivel[d + 1] -= 2
+            m.hojas_por_nivel[d] += 1
+            m.hojas -= 1
+            m.fusiones += 1
+
+    envoltorios = {
+        "asignar_memoria": _asignar_memoria,
+        "liberar_memoria": _liberar_memoria,
+        "_asignar": _asignar,
+        "_dividir": _dividir,
+        "_fusionar": _fusionar,
+    }
+    for nombre in _ENVUELTOS:
+        setattr(sistema, nombre, envoltorios[nombre])
+
+    # Forma inicial del árbol
+    m.hojas_por_nivel = [0] * len(m.hojas_por_nivel)
+    m.hojas = 0
+    for hoja in sistema.hojas_en_orden():
+        m.hojas_por_nivel[nivel(hoja)] += 1
+        m.hojas += 1
+
+
+def desinstrumentar(sistema):
+    for nombre in _ENVUELTOS:
+        sistema.__dict__.pop(nombre, None)
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Barrido de semillas del Simulador con NumPy, unas 18 veces más rápido por arena que el escalar.
+
+Simula muchas arenas buddy independientes a la vez, con la misma carga que el
+Simulador (generar_procesos, lotes de 5 cada 2,5 s, vidas de 2 a 3 s). Cada
+arena da exactamente el mismo resultado que simular(SistemaBuddy(...), n,
+semilla) con su semilla. Sólo cubre SistemaBuddy sin política, expropiación
+ni vida; para todo lo demás sigue haciendo falta el barrido escalar.
+
+Es una aceleración acotada, no un reemplazo del barrido escalar. Medido con
+4096 KB / 4 KB y 200 procesos: 10.000 arenas tardan ~1,7 s, lo mismo que ~540
+corridas escalares (~3 ms cada una). La corrida escalar ya es barata y aquí
+domina el costo fijo de cada paso de NumPy (más ~0,3 s de sembrar 10.000
+Mersenne Twisters). La última línea de la salida da la equivalencia en la
+máquina en que se corre.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python montecarlo.py --arenas 10000 --procesos 200 --total-kb 4096 --min-kb 4
+    python montecarlo.py --arenas 1000 --verificar 20
+"""
+from __future__ import annotations
+import argparse
+import time
+from typing import Dict, Sequence
+
+import numpy as np
+
+# =========================
+#   CARGA (RÉPLICA DE random.Random)
+# =========================
+#
+# Las decisiones aleatorias del Simulador no dependen de lo que pase en el
+# asignador: primero generar_procesos sortea tamaños, y luego se sortea una vida
+# por proceso en orden. Así la carga de todas las arenas se genera de antemano.
+# random.Random(s) es un MT19937 sembrado con init_by_array, igual que
+# numpy.random.RandomState sembrado con la misma clave; random() y randint()
+# se reproducen sobre esas palabras de 32 bits (con el mismo rechazo).
+#
+# Requisitos: numpy
+
+LOTE = 5
+INTERVALO_MS = 2500
+VIDA_MS = (2000, 3000)
+
+
+def _clave(semilla: int):
+    """Clave de init_by_array que usa random.seed() para un entero"""
+    semilla = abs(semilla)
+    return [(semilla >> (32 * j)) & 0xFFFFFFFF for j in range(max(1, (semilla.bit_length() + 31) // 32))]
+
+
+class _FlujoMT:
+    """random.Random(semilla) para varias semillas a la vez (una fila por semilla)"""
+
+    def __init__(self, semillas: Sequence[int], palabras: int):
+        self._buf = np.empty((len(semillas), palabras), dtype=np.uint32)
+        rs = np.random.RandomState()
+        for k, semilla in enumerate(semillas):
+            rs.seed(_clave(semilla))
+            self._buf[k] = rs.randint(0, 1 << 32, size=palabras, dtype=np.uint32)
+        self._pos = np.zeros(len(semillas), dtype=np.int64)
+        self._filas = np.arange(len(semillas))
+
+    def _siguiente(self, filas: np.ndarray) -> np.ndarray:
+        pos = self._pos[filas]
+        if len(pos) and pos.max() >= self._buf.shape[1]:
+            raise RuntimeError("se agotaron las palabras pseudoaleatorias precalculadas")
+        self._pos[filas] = pos + 1
+        return self._buf[filas, pos].astype(np.int64)
+
+    def random(self) -> np.ndarray:
+        a = self._siguiente(self._filas) >> 5
+        b = self._siguiente(self._filas) >> 6
+        return (a * 67108864.0 + b) * (1.0 / 9007199254740992.0)
+
+    def randbelow(self, n: int) -> np.ndarray:
+        """Como random._randbelow(n): getrandbits(n.bit_length()) hasta que sea < n"""
+        corrimiento = 32 - n.bit_length()
+        r = self._siguiente(self._filas) >> corrimiento
+        pendientes = np.flatnonzero(r >= n)
+        while len(pendientes):
+            r[pendientes] = self._siguiente(pendientes) >> corrimiento
+            pendientes = pendientes[r[pendientes] >= n]
+        return r
+
+    def randint(self, a: int, b: int) -> np.ndarray:
+        return a + self.randbelow(b - a + 1)
+
+
+def generar_carga(semillas: Sequence[int], n_procesos: int):
+    """Tamaños (bytes) y vidas (ms) de cada proceso, forma (arenas, procesos)"""
+    flujo = _FlujoMT(semillas, 8 * n_procesos + 64)
+    tamanos = np.empty((len(semillas), n_procesos), dtype=np.int64)
+    vidas = np.empty((len(semillas), n_procesos), dtype=np.int64)
+    for i in range(n_procesos):
+        chico = flujo.random() < 0.7
+        # randint(1, 1024) o randint(1025, 2048): el mismo rango, sólo cambia el inicio
+        tamanos[:, i] = (np.where(chico, 1, 1025) + flujo.randbelow(1024)) * 1024
+    for i in range(n_procesos):
+        vidas[:, i] = flujo.randint(*VIDA_MS)
+    return tamanos, vidas
+
+
+# =========================
+#   ARENAS EN ÁRBOLES IMPLÍCITOS
+# =========================
+#
+# Cada arena es una fila de `mayor`, un árbol implícito (raíz = 1, hijos 2i y
+# 2i+1) como en compartido.py: mayor[i] = orden + 1 del bloque libre más grande
+# del subárbol (0 = nada libre), con el orden relativo a min_bloque. Un bloque
+# libre entero deja a todos sus descendientes también "enteros", así dividir es
+# sólo bajar, y fusionar es que el padre vuelva a valer su propio orden + 1.
+#
+# Asignar baja a la izquierda mientras ese lado tenga un libre que alcance, igual
+# que SistemaBuddy._asignar; todas las arenas bajan juntas, un nivel por paso.
+
+
+class MonteCarloBuddy:
+    def __init__(self, tamano_total: int = 4 * 1024 * 1024, tam_min_bloque: int = 4 * 1024,
+                 n_procesos: int = 200, max_bytes: int = 256 * 1024 * 1024):
+        self.total = 1 << (max(1, tamano_total) - 1).bit_length()
+        self.min_bloque = min(1 << (max(1, tam_min_bloque) - 1).bit_length(), self.total)
+        self.niveles = (self.total // self.min_bloque).bit_length() - 1
+        self.n_procesos = n_procesos
+        # Las arenas se corren en tandas para acotar la memoria de los árboles
+        self.arenas_por_tanda = max(1, max_bytes // (2 << self.niveles))
+
+    def correr(self, semillas: Sequence[int]) -> Dict[str, np.ndarray]:
+        """Resultados por arena (un arreglo por métrica, en el orden de `semillas`)"""
+        semillas = list(semillas)
+        tandas = [self._correr_tanda(semillas[i:i + self.arenas_por_tanda])
+                  for i in range(0, len(semillas), self.arenas_por_tanda)]
+        return {clave: np.concatenate([t[clave] for t in tandas]) for clave in tandas[0]}
+
+    def _correr_tanda(self, semillas: Sequence[int]) -> Dict[str, np.ndarray]:
+        K, L, n = len(semillas), self.niveles, self.n_procesos
+        N = 2 << L
+        tamanos, vidas = generar_carga(semillas, n)
+
+        # Orden requerido (relativo a min_bloque); > L no entra nunca
+        ordenes = np.zeros((K, n), dtype=np.int64)
+        potencia = self.min_bloque
+        for _ in range(L + 1):
+            ordenes += tamanos > potencia
+            potencia <<= 1
+
+        profundidad = np.zeros(N, dtype=np.int64)
+        for d in range(1, L + 1):
+            profundidad[1 << d:2 << d] = d
+        self._lleno = (L - profundidad + 1).astype(np.int8)   # valor de cada nodo entero y libre
+        self._mayor = np.tile(self._lleno, K)                   # arenas aplanadas: fila k en k*N
+        self._base = np.arange(K, dtype=np.int64) * N
+
+        nodo = np.full((K, n), -1, dtype=np.int64)
+        libre = np.full(K, self.total, dtype=np.int64)
+        asignados = np.zeros(K, dtype=np.int64)
+        rechazos = np.zeros(K, dtype=np.int64)
+        por_fragmentacion = np.zeros(K, dtype=np.int64)
+        suma_indice = np.zeros(K)
+        max_indice = np.zeros(K)
+
+        llegada = (np.arange(n) // LOTE) * INTERVALO_MS
+        vence = llegada + vidas
+        ventana = -(-VIDA_MS[1] // INTERVALO_MS) + 1   # lotes anteriores que pueden liberar
+        liberado = np.zeros((K, n), dtype=bool)
+
+        for lote in range((n + LOTE - 1) // LOTE):
+            ahora = lote * INTERVALO_MS
+            # Primero las liberaciones vencidas (a igual tiempo se programaron antes)
+            for j in range(max(0, (lote - ventana) * LOTE), lote * LOTE):
+                filas = np.flatnonzero((nodo[:, j] >= 0) & ~liberado[:, j] & (vence[:, j] <= ahora))
+                if len(filas):
+                    self._liberar(filas, nodo[filas, j])
+                    libre[filas] += self.min_bloque << (L - profundidad[nodo[filas, j]])
+                    liberado[filas, j] = True
+
+            for j in range(lote * LOTE, min(n, (lote + 1) * LOTE)):
+                o = ordenes[:, j]
+                raiz = self._mayor[self._base + 1]
+                cabe = (o <= L) & (raiz > o)
+                filas = np.flatnonzero(cabe)
+                if len(filas):
+                    nodo[filas, j] = self._asignar(filas, o[filas])
+                    libre[filas] -= self.min_bloque << o[filas]
+                    asignados[filas] += 1
+                filas = np.flatnonzero(~cabe)
+                if len(filas):
+                    # Métricas del rechazo (como Simulador._registrar_rechazo)
+                    mayor_libre = np.where(raiz[filas] > 0,
+                                           self.min_bloque << np.maximum(raiz[filas].astype(np.int64) - 1, 0), 0)
+                    indice = np.where(libre[filas] > 0, 1.0 - mayor_libre / np.maximum(libre[filas], 1), 0.0)
+                    rechazos[filas] += 1
+                    suma_indice[filas] += indice
+                    max_indice[filas] = np.maximum(max_indice[filas], indice)
+                    por_fragmentacion[filas] += libre[filas] >= tamanos[filas, j]
+
+        return {
+            "semilla": np.asarray(semillas, dtype=np.int64),
+            "asignados": asignados,
+            "rechazos": rechazos,
+            "rechazos_por_fragmentacion": por_fragmentacion,
+            "indice_frag_promedio_en_rechazo": np.where(rechazos > 0, suma_indice / np.maximum(rechazos, 1), 0.0),
+            "indice_frag_max_en_rechazo": max_indice,
+        }
+
+    def _asignar(self, filas: np.ndarray, orden: np.ndarray) -> np.ndarray:
+        """Baja en todas las arenas de `filas` hasta un bloque libre del orden pedido"""
+        mayor, base = self._mayor, self._base[filas]
+        necesario = orden + 1
+        objetivo = self.niveles - orden            # profundidad del bloque a ocupar
+        i = np.ones(len(filas), dtype=np.int64)
+        for d in range(int(objetivo.max())):
+            izq = 2 * i
+            i = np.where(d < objetivo, np.where(mayor[base + izq] >= necesario, izq, izq + 1), i)
+        mayor[base + i] = 0
+        self._propagar(base, i)
+        return i
+
+    def _liberar(self, filas: np.ndarray, i: np.ndarray):
+        base = self._base[filas]
+        self._mayor[base + i] = self._lleno[i]
+        self._propagar(base, i)
+
+    def _propagar(self, base: np.ndarray, i: np.ndarray):
+        """Recalcula los ancestros: padre entero si ambos hijos lo están, si no el mayor de los dos"""
+        mayor, lleno = self._mayor, self._lleno
+        p = i >> 1
+        while True:
+            vivos = np.flatnonzero(p >= 1)
+            if not len(vivos):
+                return
+            b, q = base[vivos], p[vivos]
+            izq, der = mayor[b + 2 * q], mayor[b + 2 * q + 1]
+            hijo_lleno = lleno[2 * q]
+            mayor[b + q] = np.where((izq == hijo_lleno) & (der == hijo_lleno), lleno[q], np.maximum(izq, der))
+            p = p >> 1
+
+
+def resumir(resultados: Dict[str, np.ndarray], n_procesos: int) -> dict:
+    tasa = resultados["rechazos"] / n_procesos
+    return {
+        "arenas": len(tasa),
+        "tasa_rechazo_media": float(tasa.mean()),
+        "tasa_rechazo_p5": float(np.percentile(tasa, 5)),
+        "tasa_rechazo_p50": float(np.percentile(tasa, 50)),
+        "tasa_rechazo_p95": float(np.percentile(tasa, 95)),
+        "rechazos_por_fragmentacion_media": float(resultados["rechazos_por_fragmentacion"].mean()),
+        "indice_frag_en_rechazo_medio": float(resultados["indice_frag_promedio_en_rechazo"].mean()),
+    }
+
+
+def verificar(mc: MonteCarloBuddy, resultados: Dict[str, np.ndarray], cuantas: int) -> float:
+    """Compara las primeras `cuantas` arenas con el Simulador escalar; devuelve su tiempo por corrida"""
+    from BuddySystem import SistemaBuddy
+    from simulator import simular
+    inicio = time.perf_counter()
+    for k in range(cuantas):
+        r = simular(SistemaBuddy(mc.total, mc.min_bloque), mc.n_procesos, semilla=int(resultados["semilla"][k])).resumen()
+        esperado = (r["finalizado"], r["rechazos"], r["rechazos_por_fragmentacion"],
+                    r["indice_frag_promedio_en_rechazo"], r["indice_frag_max_en_rechazo"])
+        obtenido = (resultados["asignados"][k], resultados["rechazos"][k], resultados["rechazos_por_fragmentacion"][k],
+                    resultados["indice_frag_promedio_en_rechazo"][k], resultados["indice_frag_max_en_rechazo"][k])
+        if tuple(map(float, esperado)) != tuple(map(float, obtenido)):
+            raise AssertionError(f"semilla {resultados['semilla'][k]}: escalar {esperado} != vectorizado {obtenido}")
+    return (time.perf_counter() - inicio) / max(1, cuantas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--arenas", type=int, default=10_000,
+                        help="semillas a simular (10.000 cuestan lo que ~540 corridas escalares)")
+    parser.add_argument("--procesos", type=int, default=200)
+    parser.add_argument("--total-kb", type=int, default=4096)
+    parser.add_argument("--min-kb", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=1, help="semilla de la primera arena (las demás siguen)")
+    parser.add_argument("--verificar", type=int, default=5, help="arenas a comparar con el Simulador escalar")
+    args = parser.parse_args()
+
+    mc = MonteCarloBuddy(args.total_kb * 1024, args.min_kb * 1024, args.procesos)
+    inicio = time.perf_counter()
+    resultados = mc.correr(range(args.semilla, args.semilla + args.arenas))
+    t_vectorizado = time.perf_counter() - inicio
+    for clave, valor in resumir(resultados, args.procesos).items():
+        print(f"{clave:<34}{valor:.4f}" if isinstance(valor, float) else f"{clave:<34}{valor}")
+    print(f"{args.arenas} arenas vectorizadas: {t_vectorizado:.2f} s")
+    if args.verificar:
+        t_escalar = verificar(mc, resultados, min(args.verificar, args.arenas))
+        print(f"escalar: {t_escalar * 1000:.1f} ms por corrida "
+              f"(las {args.arenas} arenas equivalen a {t_vectorizado / t_escalar:.0f} corridas escalares); "
+              f"{min(args.verificar, args.arenas)} arenas verificadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+from __future__ import annotations
+from collections import defaultdict
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
+import os
+import signal
+import sys
+import time
+
+# =========================
+#   PERFILADO POR FASES
+# =========================
+#
+# Se activa con --perfil DIR en `python -m BuddySystemAutomatic simular|reproducir`
+# o con la variable de entorno BUDDY_PERFIL=DIR (también en la GUI automática).
+# --muestreo-ms MS (o BUDDY_PERFIL_MUESTREO=MS) usa el muestreador por señales.
+#
+# Las fases se miden envolviendo métodos de la instancia, como hace
+# metricas.instrumentar (sin perfil no se agrega ningún costo):
+#   asignar   asignar_memoria del asignador
+#   liberar   liberar_memoria
+#   metricas  memoria_*, mayor_bloque_libre, indice_fragmentacion_externa, ... y
+#             el muestreo del registrador de series
+#   ui        actualizar_ui de la ventana
+#   pintar    paintEvent de las vistas
+# Una fase dentro de otra (métricas durante el refresco) descuenta su tiempo del
+# tiempo propio de la de afuera.
+#
+# Determinista: mientras hay una fase activa sys.setprofile lleva la pila de
+# llamadas y acumula el tiempo propio de cada pila; fuera de las fases no corre.
+# Muestreo: setitimer(ITIMER_PROF) interrumpe cada MS ms de CPU y cuenta la pila
+# de ese momento (sólo Unix, hilo principal). Su costo no depende de cuántas
+# llamadas se hagan, así que sirve para corridas largas.
+#
+# Al detener se escriben en DIR, por corrida:
+#   <nombre>.folded  pilas colapsadas "[fase];función;... valor" para flamegraph.pl
+#                    o speedscope (valor en µs, o en muestras)
+#   <nombre>.txt     tabla por fase (llamadas, tiempo total y propio, µs por
+#                    llamada) y las funciones con más tiempo propio en cada fase
+
+FASES = ("asignar", "liberar", "metricas", "ui", "pintar")
+
+METODOS_METRICAS = ("memoria_ocupada", "memoria_desperdiciada", "memoria_disponible", "memoria_libre",
+                    "mayor_bloque_libre", "histograma_libres", "indice_fragmentacion_externa")
+
+# Pila de las muestras tomadas fuera de toda fase
+FUERA_DE_FASES = "[otros]"
+
+_NOMBRE = itemgetter(1)
+
+
+def _nombre_codigo(codigo) -> str:
+    return f"{os.path.basename(codigo.co_filename)}:{getattr(codigo, 'co_qualname', codigo.co_name)}"
+
+
+def _nombre_c(funcion) -> str:
+    modulo = getattr(funcion, "__module__", None) or "builtins"
+    return f"{modulo}:{getattr(funcion, '__qualname__', repr(funcion))}"
+
+
+class Perfilador:
+    def __init__(self, directorio: str, nombre: str = "perfil", muestreo_ms: Optional[float] = None):
+        self.directorio = directorio
+        self.nombre = nombre
+        self.muestreo_ms = muestreo_ms
+        # Fases activas: [fase, inicio, tiempo de las fases anidadas]
+        self._fases: List[list] = []
+        self.llamadas: Dict[str, int] = defaultdict(int)
+        self.total: Dict[str, float] = defaultdict(float)
+        self.propio: Dict[str, float] = defaultdict(float)
+        # Pila colapsada -> segundos propios (determinista) o muestras
+        self.pilas: Dict[Tuple[str, ...], float] = defaultdict(float)
+        # Determinista: marcos abiertos [marca, nombre, inicio, tiempo de los hijos]
+        self._pila: List[list] = []
+        # Marcos del propio perfilador, que no se cuentan
+        self._propios = {self._entrar.__code__, self._salir.__code__, self._cerrar.__code__}
+        self._envoltorio = None
+        self._inicio = 0.0
+        self.duracion = 0.0
+        self.activo = False
+
+    # =========================
+    #   FASES
+    # =========================
+    def envolver(self, fase: str, funcion: Callable) -> Callable:
+        """`funcion` medida como `fase` (las llamadas recursivas cuentan una vez)"""
+        def envoltorio(*args, **kwargs):
+            if not self.activo or (self._fases and self._fases[-1][0] == fase):
+                return funcion(*args, **kwargs)
+            self._entrar(fase)
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                self._salir()
+        envoltorio._fase = fase
+        envoltorio.__wrapped__ = funcion
+        self._envoltorio = envoltorio.__code__
+        self._propios.add(envoltorio.__code__)
+        return envoltorio
+
+    def envolver_metodos(self, objeto, fase: str, nombres):
+        """Reemplaza en la instancia los métodos `nombres` que tenga por su versión medida"""
+        for nombre in nombres:
+            if not hasattr(objeto, nombre):
+                continue
+            # Una copia del objeto (p. ej. un punto de control) trae los envoltorios
+            # del original: se descartan y se envuelve el método de esta instancia
+            anterior = objeto.__dict__.get(nombre)
+            if getattr(anterior, "_fase", None) is not None:
+                del objeto.__dict__[nombre]
+            setattr(objeto, nombre, self.envolver(fase, getattr(objeto, nombre)))
+
+    def instrumentar(self, sistema, registrador=None):
+        """Fases asignar, liberar y metricas de un asignador (y del registrador de series)"""
+        self.envolver_metodos(sistema, "asignar", ("asignar_memoria",))
+        self.envolver_metodos(sistema, "liberar", ("liberar_memoria",))
+        self.envolver_metodos(sistema, "metricas", METODOS_METRICAS)
+        if registrador is not None:
+            self.envolver_metodos(registrador, "metricas", ("muestrear",))
+
+    def _entrar(self, fase: str):
+        ahora = time.perf_counter()
+        self._fases.append([fase, ahora, 0.0])
+        if self.muestreo_ms is None:
+            self._pila.append([None, f"[{fase}]", ahora, 0.0])
+            if len(self._fases) == 1:
+                sys.setprofile(self._trazar)
+
+    def _salir(self):
+        ahora = time.perf_counter()
+        if self.muestreo_ms is None:
+            if len(self._fases) == 1:
+                sys.setprofile(None)
+            # Quedan abiertos los marcos del propio perfilador (este mismo)
+            while self._pila and self._pila[-1][0] is not None:
+                self._pila.pop()
+            self._cerrar(ahora)
+        fase, inicio, anidadas = self._fases.pop()
+        total = ahora - inicio
+        self.llamadas[fase] += 1
+        self.total[fase] += total
+        self.propio[fase] += total - anidadas
+        if self._fases:
+            self._fases[-1][2] += total
+
+    # =========================
+    #   DETERMINISTA
+    # =========================
+    def _trazar(self, marco, evento: str, arg):
+        ahora = time.perf_counter()
+        if marco.f_code in self._propios:
+            return
+        if evento == "call":
+            self._pila.append([marco, _nombre_codigo(marco.f_code), ahora, 0.0])
+        elif evento == "c_call":
+            self._pila.append([arg, _nombre_c(arg), ahora, 0.0])
+        elif self._pila and self._pila[-1][0] is (marco if evento == "return" else arg):
+            self._cerrar(ahora)
+
+    def _cerrar(self, ahora: float):
+        pila = self._pila
+        marca, _, inicio, hijos = pila[-1]
+        transcurrido = ahora - inicio
+        self.pilas[tuple(map(_NOMBRE, pila))] += transcurrido - hijos
+        pila.pop()
+        if pila:
+            pila[-1][3] += transcurrido
+
+    # =========================
+    #   MUESTREO
+    # =========================
+    def _muestra(self, signum, marco):
+        codigos = []
+        while marco is not None:
+            codigos.append(marco.f_code)
+            marco = marco.f_back
+        codigos.reverse()
+        if self._fases:
+            # Sólo lo que está por debajo de la fase más externa
+            desde = codigos.index(self._envoltorio) if self._envoltorio in codigos else 0
+            clave = tuple(f"[{f[0]}]" for f in self._fases)
+        else:
+            desde, clave = 0, (FUERA_DE_FASES,)
+        clave += tuple(_nombre_codigo(c) for c in codigos[desde:] if c not in self._propios)
+        self.pilas[clave] += 1
+
+    # =========================
+    #   CORRIDA
+    # =========================
+    def iniciar(self):
+        self.activo = True
+        self._inicio = time.perf_counter()
+        if self.muestreo_ms is not None:
+            if not hasattr(signal, "setitimer"):
+                raise RuntimeError("el muestreo por señales requiere setitimer (Unix)")
+            signal.signal(signal.SIGPROF, self._muestra)
+            intervalo = self.muestreo_ms / 1000
+            signal.setitimer(signal.ITIMER_PROF, intervalo, intervalo)
+
+    def detener(self) -> Tuple[str, str]:
+        """Termina la corrida y escribe la salida; devuelve las rutas (.folded, .txt)"""
+        if self.activo:
+            self.activo = False
+            self.duracion = time.perf_counter() - self._inicio
+            if self.muestreo_ms is not None:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+                signal.signal(signal.SIGPROF, signal.SIG_DFL)
+        os.makedirs(self.directorio, exist_ok=True)
+        base = os.path.join(self.directorio, self.nombre)
+        with open(f"{base}.folded", "w", encoding="utf-8") as f:
+            f.write(self.colapsado())
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(self.tabla())
+        return f"{base}.folded", f"{base}.txt"
+
+    def colapsado(self) -> str:
+        """Pilas colapsadas (una por línea, valor en µs o en muestras)"""
+        escala = 1 if self.muestreo_ms is not None else 1e6
+        lineas = []
+        for pila, valor in sorted(self.pilas.items()):
+            valor = int(round(valor * escala))
+            if valor > 0:
+                lineas.append(f"{';'.join(pila)} {valor}")
+        return "\n".join(lineas) + "\n"
+
+    def tabla(self, top: int = 5) -> str:
+        """Resumen por fase y las funciones con más tiempo propio de cada una"""
+        unidad = "muestras" if self.muestreo_ms is not None else "µs"
+        lineas = [f"perfil {self.nombre}: {self.duracion * 1000:.1f} ms"
+                  + (f", muestreo cada {self.muestreo_ms:g} ms de CPU" if self.muestreo_ms is not None else ""),
+                  "",
+                  f"{'fase':<10}{'llamadas':>10}{'total ms':>11}{'propio ms':>11}{'% corrida':>11}{'µs/llamada':>12}"]
+        for fase in [*FASES, *sorted(set(self.llamadas) - set(FASES))]:
+            n = self.llamadas.get(fase, 0)
+            if not n:
+                continue
+            propio = self.propio[fase]
+            lineas.append(f"{fase:<10}{n:>10}{self.total[fase] * 1000:>11.2f}{propio * 1000:>11.2f}"
+                          f"{propio / self.duracion if self.duracion else 0.0:>11.1%}"
+                          f"{self.total[fase] / n * 1e6:>12.1f}")
+
+        # Tiempo propio por (fase más interna, función de la hoja)
+        por_fase: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for pila, valor in self.pilas.items():
+            fase = next((p for p in reversed(pila) if p.startswith("[")), FUERA_DE_FASES)
+            por_fase[fase][pila[-1]] += valor
+        escala = 1 if self.muestreo_ms is not None else 1e6
+        for fase in sorted(por_fase, key=lambda f: -sum(por_fase[f].values())):
+            funciones = sorted(por_fase[fase].items(), key=lambda kv: -kv[1])[:top]
+            lineas += ["", f"{fase} (tiempo propio, {unidad})"]
+            lineas += [f"  {valor * escala:>12.0f}  {nombre}" for nombre, valor in funciones]
+        return "\n".join(lineas) + "\n"
+
+
+def perfilador_de_entorno(nombre: str) -> Optional[Perfilador]:
+    """Perfilador según BUDDY_PERFIL / BUDDY_PERFIL_MUESTREO, o None si no está activado"""
+    directorio = os.environ.get("BUDDY_PERFIL")
+    if not directorio:
+        return None
+    muestreo = os.environ.get("BUDDY_PERFIL_MUESTREO")
+    return Perfilador(directorio, nombre, float(muestreo) if muestreo else None)
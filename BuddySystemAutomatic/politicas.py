@@ -0,0 +1,94 @@
+from __future__ import annotations
+from typing import Optional, Dict
+
+from NodoMemoria import NodoMemoria
+
+# =========================
+#   POLÍTICAS DE COLOCACIÓN
+# =========================
+#
+# Una política decide en qué hoja libre se coloca una solicitud. Todas bajan
+# por el árbol guiadas por mascara_libres (OR de los tamaños libres de cada
+# subárbol), así que cuestan O(log n). Luego SistemaBuddy._colocar divide la
+# hoja elegida hasta el tamaño requerido, bajando hacia `objetivo`.
+#
+#   sistema = SistemaBuddy(total, minimo, politica=PoliticaMejorAjuste())
+
+
+class PoliticaColocacion:
+    nombre = "base"
+    objetivo = 0  # dirección hacia la que se dividen los bloques grandes
+
+    def elegir(self, sistema, espacio2: int) -> Optional[NodoMemoria]:
+        """Hoja libre de tamaño >= espacio2 donde colocar la solicitud (o None)"""
+        raise NotImplementedError
+
+
+class PoliticaIzquierda(PoliticaColocacion):
+    """Bloque libre más a la izquierda (el comportamiento clásico de SistemaBuddy)"""
+    nombre = "izquierda"
+
+    def elegir(self, sistema, espacio2: int) -> Optional[NodoMemoria]:
+        return sistema._buscar_extremo(sistema.raiz, espacio2)
+
+
+def _mejor_ajuste(nodo: NodoMemoria, espacio2: int) -> Optional[NodoMemoria]:
+    """Baja hasta el bloque libre más chico que alcance (el más a la izquierda de ese tamaño)"""
+    candidatos = nodo.mascara_libres & -espacio2
+    if not candidatos:
+        return None
+    tamano = candidatos & -candidatos  # bit más bajo = bloque suficiente más chico
+    while not nodo.es_hoja():
+        nodo = nodo.hijoIzquierdo if nodo.hijoIzquierdo.mascara_libres & tamano else nodo.hijoDerecho
+    return nodo
+
+
+class PoliticaMejorAjuste(PoliticaColocacion):
+    """Prefiere el bloque libre más chico que alcance, preservando los grandes"""
+    nombre = "mejor_ajuste"
+
+    def elegir(self, sistema, espacio2: int) -> Optional[NodoMemoria]:
+        return _mejor_ajuste(sistema.raiz, espacio2)
+
+
+class PoliticaSugerenciaDireccion(PoliticaColocacion):
+    """Coloca lo más cerca posible de una dirección sugerida"""
+    nombre = "sugerencia"
+
+    def __init__(self, direccion: int = 0):
+        self.objetivo = direccion
+
+    def elegir(self, sistema, espacio2: int) -> Optional[NodoMemoria]:
+        nodo = sistema.raiz
+        if not (nodo.mascara_libres & -espacio2):
+            return None
+        while not nodo.es_hoja():
+            izq, der = nodo.hijoIzquierdo, nodo.hijoDerecho
+            if self.objetivo < der.direccion:
+                preferido, otro, otro_a_la_derecha = izq, der, True
+            else:
+                preferido, otro, otro_a_la_derecha = der, izq, False
+            if preferido.mascara_libres & -espacio2:
+                nodo = preferido
+            else:
+                # Del otro lado, el extremo más cercano a la sugerencia
+                return sistema._buscar_extremo(otro, espacio2, derecha=not otro_a_la_derecha)
+        return nodo
+
+
+class PoliticaMitadAltaLibre(PoliticaColocacion):
+    """Mejor ajuste dentro de la mitad baja; la mitad alta sólo si no queda otra"""
+    nombre = "mitad_alta_libre"
+
+    def elegir(self, sistema, espacio2: int) -> Optional[NodoMemoria]:
+        raiz = sistema.raiz
+        if not raiz.es_hoja():
+            nodo = _mejor_ajuste(raiz.hijoIzquierdo, espacio2)
+            if nodo is not None:
+                return nodo
+        return _mejor_ajuste(raiz, espacio2)
+
+
+POLITICAS: Dict[str, type] = {
+    p.nombre: p for p in (PoliticaIzquierda, PoliticaMejorAjuste, PoliticaSugerenciaDireccion, PoliticaMitadAltaLibre)
+}
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from typing import Optional, Dict, Tuple
+
+from NodoMemoria import NodoMemoria
+from BuddySystem import SistemaBuddy
+
+# =========================
+#   BUDDY PONDERADO (2^k y 3·2^k)
+# =========================
+#
+# Variante de SistemaBuddy con divisiones no binarias: además de las potencias
+# de 2 existen bloques de 3·2^k, así una solicitud de 1025 KB ocupa 1536 KB en
+# lugar de 2048 KB (el redondeo pierde a lo sumo 1/3 en vez de 1/2).
+#
+#   2^k   -> 3·2^(k-2) (izq) + 2^(k-2) (der)      (si ambos >= min_bloque;
+#                                                    si no, mitades iguales)
+#   3·2^k -> 2^(k+1)   (izq) + 2^k     (der)
+#
+# mascara_libres guarda un bit por clase de tamaño (no por tamaño): las clases
+# están ordenadas de menor a mayor, así que las mismas búsquedas O(log n) de la
+# versión binaria (y las políticas de politicas.py) funcionan sin cambios.
+
+
+def clase_de(tamano: int) -> int:
+    """Índice de clase: 2^k -> 2k, 3·2^(k-1) -> 2k+1 (crece con el tamaño)"""
+    k = tamano.bit_length() - 1
+    return 2 * k if tamano == 1 << k else 2 * k + 1
+
+
+def tamano_de_clase(clase: int) -> int:
+    k = clase >> 1
+    return 1 << k if clase % 2 == 0 else 3 << (k - 1)
+
+
+class SistemaBuddyPonderado(SistemaBuddy):
+    def __init__(self, tamano_total: int = 1024, tam_min_bloque: int = 1, politica=None):
+        # (sin asignación dispersa: sus contadores son por clase, no por orden)
+        super().__init__(tamano_total, tam_min_bloque, politica)
+        # Contadores de libres indexados por clase en lugar de por orden
+        self._libres_por_orden = [0] * (clase_de(self.total) + 1)
+        self._libres_por_orden[-1] = 1
+        self.raiz.mascara_libres = 1 << clase_de(self.total)
+
+    def dividir_tamano(self, tamano: int) -> Optional[Tuple[int, int]]:
+        """Tamaños (izq, der) en que se divide un bloque, o None si no se puede"""
+        if tamano & (tamano - 1):
+            # 3·2^k
+            der = tamano // 3
+            return (2 * der, der) if der >= self.min_bloque else None
+        cuarto = tamano // 4
+        if cuarto >= self.min_bloque:
+            return 3 * cuarto, cuarto
+        mitad = tamano // 2
+        return (mitad, mitad) if mitad >= self.min_bloque else None
+
+    def obtener_tamano_requerido(self, espacio: int) -> int:
+        """Menor tamaño de bloque disponible (2^k o 3·2^k) que sea >= espacio"""
+        potencia = max(self.obtener_potencia_requerida(espacio), self.min_bloque)
+        tres_cuartos = 3 * potencia // 4
+        if potencia >= 4 * self.min_bloque and tres_cuartos >= espacio:
+            return tres_cuartos
+        return potencia
+
+    def _dividir(self, nodo: NodoMemoria):
+        tam_izq, tam_der = self.dividir_tamano(nodo.tamano)
+        self._libres_por_orden[clase_de(nodo.tamano)] -= 1
+        self._libres_por_orden[clase_de(tam_izq)] += 1
+        self._libres_por_orden[clase_de(tam_der)] += 1
+
+        izq = nodo.hijoIzquierdo = self._nuevo_nodo(tam_izq, nodo.direccion)
+        der = nodo.hijoDerecho = self._nuevo_nodo(tam_der, nodo.direccion + tam_izq)
+        izq.padre = nodo
+        der.padre = nodo
+        izq.mascara_libres = 1 << clase_de(tam_izq)
+        der.mascara_libres = 1 << clase_de(tam_der)
+
+        # Los hijos ocupan el lugar del nodo en la cadena de hojas
+        izq.anterior = nodo.anterior
+        izq.siguiente = der
+        der.anterior = izq
+        der.siguiente = nodo.siguiente
+        if nodo.anterior is not None:
+            nodo.anterior.siguiente = izq
+        else:
+            self._primera = izq
+        if nodo.siguiente is not None:
+            nodo.siguiente.anterior = der
+        nodo.anterior = nodo.siguiente = None
+
+    def _bit_de(self, tamano: int) -> int:
+        # Las búsquedas reciben el bit de la clase requerida
+        return 1 << clase_de(tamano)
+
+    def _elegir_hoja(self, requerido: int) -> Optional[NodoMemoria]:
+        bit = self._bit_de(requerido)
+        if self.politica is None:
+            nodo, objetivo = self._buscar_extremo(self.raiz, bit), 0
+        else:
+            nodo, objetivo = self.politica.elegir(self, bit), self.politica.objetivo
+        return None if nodo is None else self._colocar(nodo, requerido, objetivo)
+
+    def _colocar(self, nodo: NodoMemoria, requerido: int, objetivo: int = 0) -> NodoMemoria:
+        """Divide hasta el bloque más chico que alcance (hacia `objetivo` si los hijos son iguales)"""
+        while nodo.tamano > requerido:
+            division = self.dividir_tamano(nodo.tamano)
+            if division is None or max(division) < requerido:
+                break
+            self._dividir(nodo)
+            izq, der = nodo.hijoIzquierdo, nodo.hijoDerecho
+            if der.tamano < requerido:
+                nodo = izq
+            elif izq.tamano != der.tamano:
+                nodo = der if der.tamano < izq.tamano else izq
+            else:
+                nodo = izq if objetivo < der.direccion else der
+        return nodo
+
+    def _ocupar(self, nodo: NodoMemoria, espacio: int):
+        nodo.ocupado = True
+        nodo.tamOcupado = espacio
+        self._libres_por_orden[clase_de(nodo.tamano)] -= 1
+        self._total_libre -= nodo.tamano
+        self._ocupada += espacio
+        self._desperdicio += nodo.tamano - espacio
+        nodo.mascara_libres = 0
+        self._propagar_resumen(nodo)
+
+    def _liberar_hoja(self, nodo: NodoMemoria):
+        self._libres_por_orden[clase_de(nodo.tamano)] += 1
+        self._total_libre += nodo.tamano
+        self._ocupada -= nodo.tamOcupado
+        self._desperdicio -= nodo.tamano - nodo.tamOcupado
+        nodo.ocupado = False
+        nodo.proceso = None
+        nodo.tamOcupado = 0
+        nodo.pid = -1
+        nodo.handle = -1
+        nodo.mascara_libres = 1 << clase_de(nodo.tamano)
+        self._fusionar(nodo)
+
+    def _fusionar(self, nodo: NodoMemoria):
+        padre = nodo.padre
+        while padre is not None:
+            izq, der = padre.hijoIzquierdo, padre.hijoDerecho
+            if izq.ocupado or der.ocupado or not izq.es_hoja() or not der.es_hoja():
+                break
+            padre.hijoIzquierdo = None
+            padre.hijoDerecho = None
+            self._libres_por_orden[clase_de(izq.tamano)] -= 1
+            self._libres_por_orden[clase_de(der.tamano)] -= 1
+            self._libres_por_orden[clase_de(padre.tamano)] += 1
+            # El padre vuelve a la cadena de hojas en lugar de sus hijos
+            padre.anterior = izq.anterior
+            padre.siguiente = der.siguiente
+            if izq.anterior is not None:
+                izq.anterior.siguiente = padre
+            else:
+                self._primera = padre
+            if der.siguiente is not None:
+                der.siguiente.anterior = padre
+            padre.mascara_libres = 1 << clase_de(padre.tamano)
+            self._retirar(izq, der)
+            nodo, padre = padre, padre.padre
+        self._propagar_resumen(nodo)
+
+    def obtener_buddy_address(self, direccion: int, tamano: int) -> int:
+        """Dirección del buddy de un bloque (-1 si no existe ese bloque).
+
+        Con divisiones desiguales el buddy ya no es direccion ^ tamano: el hijo
+        izquierdo tiene su buddy en direccion + tamano y el derecho en la
+        dirección del padre, así que se baja desde la raíz hasta el bloque.
+        """
+        n = self.raiz
+        while n.direccion != direccion or n.tamano != tamano:
+            if n.es_hoja():
+                return -1
+            n = n.hijoIzquierdo if direccion < n.hijoDerecho.direccion else n.hijoDerecho
+        if n.padre is None:
+            return -1
+        padre = n.padre
+        return padre.hijoDerecho.direccion if n is padre.hijoIzquierdo else padre.hijoIzquierdo.direccion
+
+    def mayor_bloque_libre(self) -> int:
+        mascara = self.raiz.mascara_libres
+        return tamano_de_clase(mascara.bit_length() - 1) if mascara else 0
+
+    def histograma_libres(self) -> Dict[int, int]:
+        """Cantidad de bloques libres por tamaño de bloque"""
+        return {tamano_de_clase(c): n for c, n in enumerate(self._libres_por_orden) if n}
+
+    def cabe(self, tamano: int) -> bool:
+        return self.obtener_tamano_requerido(tamano) <= self.mayor_bloque_libre()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+
+# =========================
+#   REGISTRO DE SERIES TEMPORALES
+# =========================
+#
+# Guarda una muestra de los contadores del asignador y del simulador en cada
+# evento (o cada `cada` eventos) dentro de buffers circulares de NumPy
+# preasignados: tomar una muestra sólo escribe escalares en arreglos ya
+# existentes, sin crear objetos por muestra. Cuando se llena se sobrescriben
+# las muestras más antiguas, así que la memoria queda acotada por `capacidad`.
+#
+# Requisitos: numpy
+
+# Columna -> tipo (estructura de arreglos: un arreglo contiguo por columna)
+COLUMNAS = (
+    ("tiempo_ms", np.int64),
+    ("evento", np.int64),
+    ("ocupada", np.int64),
+    ("desperdicio", np.int64),
+    ("mayor_libre", np.int64),
+    ("indice_frag", np.float32),
+    ("en_ejecucion", np.int32),
+    ("rechazos", np.int32),
+    ("tasa_rechazo", np.float32),
+)
+
+
+class RegistradorSeries:
+    def __init__(self, capacidad: int = 1_000_000, cada: int = 1):
+        self.capacidad = max(1, capacidad)
+        self.cada = max(1, cada)
+        self.columnas: Dict[str, np.ndarray] = {nombre: np.zeros(self.capacidad, dtype=tipo)
+                                                for nombre, tipo in COLUMNAS}
+        self.n = 0           # muestras tomadas en total (puede superar la capacidad)
+        self._eventos = 0
+        self._desde = 0      # primera muestra todavía válida (ver retroceder)
+
+    def __len__(self) -> int:
+        return self.n - max(self._desde, self.n - self.capacidad, 0)
+
+    def bytes_usados(self) -> int:
+        return sum(c.nbytes for c in self.columnas.values())
+
+    # =========================
+    #   MUESTREO
+    # =========================
+    def muestrear(self, tiempo_ms: int, sistema, simulador=None):
+        """Toma una muestra (respetando el submuestreo `cada`)"""
+        self._eventos += 1
+        if self._eventos % self.cada:
+            return
+        i = self.n % self.capacidad
+        c = self.columnas
+        c["tiempo_ms"][i] = tiempo_ms
+        c["evento"][i] = self._eventos
+        c["ocupada"][i] = sistema.memoria_ocupada()
+        c["desperdicio"][i] = sistema.memoria_desperdiciada()
+        c["mayor_libre"][i] = sistema.mayor_bloque_libre()
+        c["indice_frag"][i] = sistema.indice_fragmentacion_externa()
+        if simulador is not None:
+            intentados = len(simulador.estados) - simulador.conteo[0]
+            c["en_ejecucion"][i] = simulador.conteo[1]
+            c["rechazos"][i] = simulador.rechazos
+            c["tasa_rechazo"][i] = simulador.rechazos / intentados if intentados else 0.0
+        self.n += 1
+
+    def reposicionar(self, n: int, eventos: int):
+        """Continúa desde la muestra número `n` (al restaurar un punto de control)"""
+        if n <= self.n:
+            # Hacia atrás: las muestras anteriores a n siguen en el buffer salvo
+            # las que ya pisó alguna de las descartadas
+            self._desde = min(max(self._desde, self.n - self.capacidad), n)
+        else:
+            # Hacia adelante: no se tomaron las muestras intermedias
+            self._desde = n
+        self.n = n
+        self._eventos = eventos
+
+    # =========================
+    #   CONSULTA Y EXPORTACIÓN
+    # =========================
+    def columna(self, nombre: str) -> np.ndarray:
+        """Columna en orden cronológico (copia sólo si el buffer ya dio la vuelta)"""
+        return self.ultimos(len(self), nombre)
+
+    def ultimos(self, cantidad: int, nombre: str) -> np.ndarray:
+        """Las últimas `cantidad` muestras de una columna (para la gráfica en vivo)"""
+        cantidad = min(cantidad, len(self))
+        if cantidad <= 0:
+            return self.columnas[nombre][:0]
+        fin = self.n % self.capacidad if self.n >= self.capacidad else self.n
+        datos = self.columnas[nombre]
+        if fin >= cantidad:
+            return datos[fin - cantidad:fin]
+        return np.concatenate((datos[self.capacidad - (cantidad - fin):], datos[:fin]))
+
+    def como_arreglo(self) -> np.ndarray:
+        """Arreglo estructurado con todas las columnas en orden cronológico"""
+        salida = np.empty(len(self), dtype=[(nombre, tipo) for nombre, tipo in COLUMNAS])
+        for nombre, _ in COLUMNAS:
+            salida[nombre] = self.columna(nombre)
+        return salida
+
+    def exportar_npy(self, ruta: str):
+        np.save(ruta, self.como_arreglo())
+
+    def exportar_csv(self, ruta: str):
+        arreglo = self.como_arreglo()
+        formatos = ["%.6g" if np.issubdtype(tipo, np.floating) else "%d" for _, tipo in COLUMNAS]
+        np.savetxt(ruta, arreglo, delimiter=",", fmt=formatos,
+                   header=",".join(nombre for nombre, _ in COLUMNAS), comments="")
@@ -0,0 +1,54 @@
+from __future__ import annotations
+from typing import Optional, Callable, List, Tuple
+import heapq
+
+# =========================
+#   RELOJ SIMULADO
+# =========================
+#
+# Sustituto de QTimer.singleShot para correr el Simulador sin GUI: los eventos
+# se guardan en un heap (tiempo, secuencia) y se ejecutan en orden, sin esperar
+# tiempo real. A igual tiempo se respeta el orden en que se programaron, igual
+# que con los temporizadores de Qt.
+
+
+class RelojSimulado:
+    def __init__(self):
+        self.ahora = 0          # ms simulados
+        self.eventos = 0        # eventos ejecutados
+        self._cola: List[Tuple[int, int, Callable, tuple]] = []
+        self._secuencia = 0
+
+    def programar(self, ms: int, funcion: Callable, *args):
+        """Ejecuta funcion(*args) dentro de `ms` milisegundos simulados"""
+        heapq.heappush(self._cola, (self.ahora + ms, self._secuencia, funcion, args))
+        self._secuencia += 1
+
+    def pendientes(self) -> int:
+        return len(self._cola)
+
+    def proximo(self) -> Optional[int]:
+        """Tiempo del siguiente evento (o None si no hay)"""
+        return self._cola[0][0] if self._cola else None
+
+    def paso(self) -> bool:
+        """Ejecuta el siguiente evento; False si la cola está vacía"""
+        if not self._cola:
+            return False
+        tiempo, _, funcion, args = heapq.heappop(self._cola)
+        self.ahora = tiempo
+        self.eventos += 1
+        funcion(*args)
+        return True
+
+    def correr(self, hasta: Optional[int] = None, max_eventos: Optional[int] = None):
+        """Ejecuta eventos hasta vaciar la cola, llegar al tiempo `hasta` o a `max_eventos`"""
+        ejecutados = 0
+        while self._cola:
+            if hasta is not None and self._cola[0][0] > hasta:
+                self.ahora = hasta
+                break
+            if max_eventos is not None and ejecutados >= max_eventos:
+                break
+            self.paso()
+            ejecutados += 1
@@ -0,0 +1,214 @@
+from __future__ import annotations
+from bisect import bisect_right
+from collections import deque
+from itertools import compress, repeat
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional
+import copy
+
+from NodoMemoria import NodoMemoria
+from reloj import RelojSimulado
+from simulator import Simulador
+
+# =========================
+#   REPRODUCCIÓN CON PUNTOS DE CONTROL
+# =========================
+#
+# Corre el Simulador sobre un RelojSimulado para poder controlar la reproducción
+# desde la GUI: avanzar a cualquier velocidad, pausar, dar un paso (un evento) o
+# saltar a un número de evento cualquiera.
+#
+# Cada `cada` eventos se guarda un punto de control: una copia del asignador,
+# del simulador y de la cola del reloj (las listas fijas de procesos y el
+# registrador de series se comparten). Saltar restaura el punto de control más
+# cercano anterior al destino y reproduce sólo los eventos que faltan, tanto
+# hacia atrás como hacia adelante si esa parte ya se recorrió. Con más de
+# `max_puntos` se descarta uno de cada dos y se duplica el intervalo, así la
+# memoria queda acotada y un salto nunca reproduce más de ~eventos/max_puntos.
+
+
+_CAMPOS = NodoMemoria.__slots__
+_leer_campos = attrgetter(*_CAMPOS)
+_leer_enlaces = attrgetter("padre", "hijoIzquierdo", "hijoDerecho", "anterior", "siguiente")
+
+
+def _copiar_nodos(raices: List[NodoMemoria], memo: Dict[int, object]):
+    """Copia los NodoMemoria alcanzables sin recursión y los registra en `memo`.
+
+    copy.deepcopy seguiría la cadena anterior/siguiente de hoja en hoja y
+    agotaría la pila con unos cientos de bloques.
+    """
+    originales = []
+    pila = [n for n in raices if id(n) not in memo]
+    while pila:
+        nodo = pila.pop()
+        if id(nodo) in memo:
+            continue
+        memo[id(nodo)] = NodoMemoria.__new__(NodoMemoria)
+        originales.append(nodo)
+        for enlace in _leer_enlaces(nodo):
+            if enlace is not None and id(enlace) not in memo:
+                pila.append(enlace)
+    for nodo in originales:
+        nuevo = memo[id(nodo)]
+        for campo, valor in zip(_CAMPOS, _leer_campos(nodo)):
+            setattr(nuevo, campo, memo[id(valor)] if type(valor) is NodoMemoria else valor)
+
+
+_ESCALARES = frozenset((int, float, str, bool, type(None)))
+_PLANOS = _ESCALARES | {NodoMemoria}
+
+
+def _solo_nodos(valores) -> List[NodoMemoria]:
+    return list(compress(valores, map(isinstance, valores, repeat(NodoMemoria))))
+
+
+def _nodos_en(objeto) -> List[NodoMemoria]:
+    """NodoMemoria referenciados directamente por el asignador (atributos, listas, diccionarios)"""
+    nodos = []
+    for valor in vars(objeto).values():
+        if isinstance(valor, NodoMemoria):
+            nodos.append(valor)
+        elif isinstance(valor, (list, tuple)):
+            nodos.extend(_solo_nodos(valor))
+        elif isinstance(valor, dict):
+            valores = list(valor.values())
+            nodos.extend(_solo_nodos(valores))
+            if not set(map(type, valores)) <= _PLANOS:
+                for v in valores:
+                    if isinstance(v, (list, tuple)):
+                        nodos.extend(_solo_nodos(v))
+    return nodos
+
+
+
+
+def _copiar_planos(objeto, memo: Dict[int, object]):
+    """Copia superficial (en C) de los contenedores de escalares de un objeto.
+
+    Las listas por proceso del simulador y los índices del asignador sólo tienen
+    enteros o nombres; deepcopy los recorrería elemento por elemento.
+    """
+    for valor in vars(objeto).values():
+        if id(valor) in memo:
+            continue
+        if isinstance(valor, bytearray):
+            memo[id(valor)] = bytearray(valor)
+        elif isinstance(valor, (list, deque)) and set(map(type, valor)) <= _ESCALARES:
+            memo[id(valor)] = valor.copy()
+        elif isinstance(valor, dict) and set(map(type, valor.values())) <= _ESCALARES:
+            memo[id(valor)] = valor.copy()
+
+
+class Reproductor:
+    def __init__(self, sistema, n_procesos: int = 200, semilla: Optional[int] = None,
+                 registrador=None, cada: int = 64, max_puntos: int = 256,
+                 al_cambiar: Optional[Callable[[], None]] = None, **opciones):
+        self.cada = max(1, cada)
+        self.max_puntos = max(2, max_puntos)
+        self.registrador = registrador
+        self.reloj = RelojSimulado()
+        # La GUI se refresca una vez por avance (no en cada evento)
+        self.simulador = Simulador(sistema, al_cambiar or (lambda: None), n_procesos, reloj=self.reloj,
+                                   semilla=semilla, verbose=False, registrador=registrador, **opciones)
+        self.simulador.iniciar()
+        # Lo que no cambia durante la corrida se comparte entre los puntos de control
+        sim = self.simulador
+        self._compartidos = [sim.actualizar_ui, sim.procesos, sim.pids, sim.prioridades,
+                             sim._indice_de_pid, registrador]
+        self._eventos_puntos: List[int] = []
+        self._puntos: List[dict] = []
+        self.max_eventos = 0    # eventos recorridos al menos una vez
+        self._guardar_punto()
+
+    @property
+    def sistema(self):
+        return self.simulador.sistema
+
+    @property
+    def evento(self) -> int:
+        return self.reloj.eventos
+
+    @property
+    def ahora(self) -> int:
+        return self.reloj.ahora
+
+    def terminado(self) -> bool:
+        return self.reloj.pendientes() == 0
+
+    # =========================
+    #   PUNTOS DE CONTROL
+    # =========================
+    def _copiar(self, estado: dict) -> dict:
+        memo = {id(o): o for o in self._compartidos if o is not None}
+        simulador = estado["simulador"]
+        _copiar_planos(simulador, memo)
+        _copiar_planos(simulador.sistema, memo)
+        _copiar_nodos(_nodos_en(simulador.sistema), memo)
+        return copy.deepcopy(estado, memo)
+
+    def _guardar_punto(self):
+        estado = {"reloj": self.reloj, "simulador": self.simulador}
+        punto = self._copiar(estado)
+        if self.registrador is not None:
+            punto["muestras"] = (self.registrador.n, self.registrador._eventos)
+        self._eventos_puntos.append(self.reloj.eventos)
+        self._puntos.append(punto)
+        if len(self._puntos) > self.max_puntos:
+            # Uno de cada dos (siempre se conserva el inicial) y el doble de intervalo
+            self._eventos_puntos = self._eventos_puntos[::2]
+            self._puntos = self._puntos[::2]
+            self.cada *= 2
+
+    def _restaurar(self, k: int):
+        punto = self._puntos[k]
+        estado = self._copiar({"reloj": punto["reloj"], "simulador": punto["simulador"]})
+        self.reloj = estado["reloj"]
+        self.simulador = estado["simulador"]
+        if self.registrador is not None:
+            self.registrador.reposicionar(*punto["muestras"])
+
+    # =========================
+    #   CONTROL DE REPRODUCCIÓN
+    # =========================
+    def paso(self) -> bool:
+        """Ejecuta un evento; False si la simulación ya terminó"""
+        if not self.reloj.paso():
+            return False
+        evento = self.reloj.eventos
+        if evento > self.max_eventos:
+            self.max_eventos = evento
+            if evento % self.cada == 0 and evento > self._eventos_puntos[-1]:
+                self._guardar_punto()
+        return True
+
+    def avanzar(self, ms: int) -> int:
+        """Ejecuta los eventos de los próximos `ms` ms simulados; devuelve cuántos"""
+        limite = self.reloj.ahora + ms
+        ejecutados = 0
+        while True:
+            proximo = self.reloj.proximo()
+            if proximo is None or proximo > limite:
+                break
+            self.paso()
+            ejecutados += 1
+        if not self.terminado():
+            self.reloj.ahora = limite
+        return ejecutados
+
+    def ir_a(self, evento: int) -> int:
+        """Salta al estado tras `evento` eventos (o al final); devuelve el evento alcanzado"""
+        evento = max(0, evento)
+        k = bisect_right(self._eventos_puntos, evento) - 1
+        # Se restaura si hay que volver atrás o si un punto guardado ahorra camino
+        if evento < self.reloj.eventos or self._eventos_puntos[k] > self.reloj.eventos:
+            self._restaurar(k)
+        while self.reloj.eventos < evento and self.paso():
+            pass
+        return self.reloj.eventos
+
+    def correr(self) -> int:
+        """Corre hasta el final (recorriéndolo una vez fija max_eventos)"""
+        while self.paso():
+            pass
+        return self.reloj.eventos
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio local de asignación: un SistemaBuddy (o cualquier motor de
+asignadores.py) atendido por asyncio en un socket Unix o TCP con un protocolo
+binario compacto.
+
+Ejecutar (desde BuddySystemAutomatic):
+    python servidor.py --unix /tmp/buddy.sock --total-kb 65536 --min-kb 4
+    python servidor.py --tcp 127.0.0.1:7070 --motor tlsf
+
+Protocolo (little-endian). Cada petición es un encabezado + cuerpo:
+
+    encabezado  <IBIH   largo del cuerpo, operación, id de petición, n
+    ASIGNAR       (1)   cuerpo: <q tamaño + nombre UTF-8              -> 1 valor: handle (-1 = rechazo)
+    LIBERAR       (2)   cuerpo: <q handle                             -> 1 valor: 1 / 0
+    ASIGNAR_LOTE  (3)   n × (<qH tamaño, largo del nombre + nombre)   -> n handles
+    LIBERAR_LOTE  (4)   n × <q handle                                 -> n valores 1 / 0
+    ESTADISTICAS  (5)   sin cuerpo                                    -> total, ocupada, desperdicio,
+                                                                         libre, mayor libre, vigentes
+
+Cada respuesta es <IBH (id de petición, estado, n) seguido de n enteros <q.
+Una petición mal formada (cuerpo de largo distinto al que indican n y los
+nombres, tamaño <= 0, nombre que no es UTF-8 válido, operación desconocida)
+recibe estado ERROR sin valores y no modifica nada; la conexión sigue abierta.
+Un encabezado que anuncia un cuerpo de más de max_cuerpo bytes (--max-cuerpo-kb,
+1 MB por omisión) recibe ERROR y se cierra la conexión, sin esperar ese cuerpo.
+Los clientes pueden encadenar peticiones sin esperar respuestas (pipelining):
+el servidor procesa juntas todas las peticiones completas que llegaron en una
+lectura y contesta con una sola escritura por vuelta del event loop.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import struct
+from typing import Optional, List, Set
+
+ENCABEZADO = struct.Struct("<IBIH")
+RESPUESTA = struct.Struct("<IBH")
+ENTERO = struct.Struct("<q")
+ENTRADA_LOTE = struct.Struct("<qH")
+
+ASIGNAR, LIBERAR, ASIGNAR_LOTE, LIBERAR_LOTE, ESTADISTICAS = range(1, 6)
+OK, ERROR = 0, 1
+
+PUERTO = 7070
+# Largo máximo de un cuerpo. El mayor legítimo es un ASIGNAR_LOTE de n=65535
+# con nombres cortos (LIBERAR_LOTE llega a 512 KB)
+MAX_CUERPO = 1 << 20
+
+
+class ServidorBuddy:
+    def __init__(self, sistema, max_cuerpo: int = MAX_CUERPO):
+        self.sistema = sistema
+        self.max_cuerpo = max_cuerpo
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        # Tareas de las conexiones abiertas (cerrar() las termina)
+        self._tareas: Set[asyncio.Task] = set()
+        # Estadísticas del servicio
+        self.conexiones = 0
+        self.peticiones = 0
+        self.vueltas = 0  # escrituras (una por tanda de peticiones procesadas juntas)
+
+    async def iniciar(self, unix: Optional[str] = None, host: str = "127.0.0.1", puerto: int = PUERTO):
+        if unix:
+            self._servidor = await asyncio.start_unix_server(self._atender, path=unix)
+        else:
+            self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor
+
+    async def servir(self, **destino):
+        servidor = await self.iniciar(**destino)
+        try:
+            await servidor.serve_forever()
+        finally:
+            await self.cerrar()
+
+    async def cerrar(self):
+        """Deja de aceptar conexiones y cierra las abiertas"""
+        if self._servidor is not None:
+            self._servidor.close()
+            tareas = list(self._tareas)
+            for tarea in tareas:
+                tarea.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+            await self._servidor.wait_closed()
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.conexiones += 1
+        tarea = asyncio.current_task()
+        self._tareas.add(tarea)
+        buffer = bytearray()
+        tam_encabezado = ENCABEZADO.size
+        try:
+            while True:
+                datos = await reader.read(1 << 16)
+                if not datos:
+                    break
+                buffer += datos
+                respuestas: List[bytes] = []
+                consumido = 0
+                excedido = False
+                while len(buffer) - consumido >= tam_encabezado:
+                    largo, op, id_peticion, n = ENCABEZADO.unpack_from(buffer, consumido)
+                    if largo > self.max_cuerpo:
+                        # No se acumula un cuerpo fuera de límite: se contesta y se corta
+                        respuestas.append(RESPUESTA.pack(id_peticion, ERROR, 0))
+                        excedido = True
+                        break
+                    inicio = consumido + tam_encabezado
+                    if inicio + largo > len(buffer):
+                        break
+                    cuerpo = memoryview(buffer)[inicio:inicio + largo]
+                    try:
+                        respuestas.append(self._procesar(op, id_peticion, n, cuerpo))
+                    except Exception:
+                        # Entrada mal formada: se rechaza esta petición y se sigue con las demás
+                        respuestas.append(RESPUESTA.pack(id_peticion, ERROR, 0))
+                    finally:
+                        cuerpo.release()
+                    consumido = inicio + largo
+                if consumido:
+                    del buffer[:consumido]
+                if respuestas:
+                    self.peticiones += len(respuestas)
+                    self.vueltas += 1
+                    writer.write(b"".join(respuestas))
+                    await writer.drain()
+                if excedido:
+                    break
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        except asyncio.CancelledError:
+            # El servidor se cierra: la conexión termina sin propagar la cancelación
+            pass
+        finally:
+            self._tareas.discard(tarea)
+            writer.close()
+
+    @staticmethod
+    def _lote_asignar(n: int, cuerpo: memoryview) -> List[tuple]:
+        """(tamaño, nombre) de un ASIGNAR_LOTE; ValueError si el cuerpo no es exactamente n entradas"""
+        entradas = []
+        pos = 0
+        for _ in range(n):
+            if pos + ENTRADA_LOTE.size > len(cuerpo):
+                raise ValueError("cuerpo más corto que n entradas")
+            tamano, largo = ENTRADA_LOTE.unpack_from(cuerpo, pos)
+            pos += ENTRADA_LOTE.size
+            if pos + largo > len(cuerpo):
+                raise ValueError("nombre más largo que el cuerpo")
+            entradas.append((tamano, str(cuerpo[pos:pos + largo], "utf-8")))
+            pos += largo
+        if pos != len(cuerpo):
+            raise ValueError("cuerpo más largo que n entradas")
+        return entradas
+
+    def _procesar(self, op: int, id_peticion: int, n: int, cuerpo: memoryview) -> bytes:
+        """Respuesta a una petición; ValueError (u otra excepción) si está mal formada.
+
+        Todo el cuerpo se valida antes de tocar el asignador.
+        """
+        sistema = self.sistema
+        if op == ASIGNAR:
+            if len(cuerpo) < ENTERO.size:
+                raise ValueError("cuerpo más corto que el tamaño")
+            tamano, = ENTERO.unpack_from(cuerpo)
+            nombre = str(cuerpo[ENTERO.size:], "utf-8")
+            if tamano <= 0:
+                raise ValueError("tamaño no positivo")
+            handle = sistema.asignar_memoria(tamano, nombre)
+            valores = [-1 if handle is None else handle]
+        elif op == LIBERAR:
+            if len(cuerpo) != ENTERO.size:
+                raise ValueError("cuerpo de largo inválido")
+            handle, = ENTERO.unpack_from(cuerpo)
+            valores = [int(sistema.liberar_memoria(handle=handle))]
+        elif op == ASIGNAR_LOTE:
+            entradas = self._lote_asignar(n, cuerpo)
+            if any(tamano <= 0 for tamano, _ in entradas):
+                raise ValueError("tamaño no positivo")
+            valores = []
+            for tamano, nombre in entradas:
+                handle = sistema.asignar_memoria(tamano, nombre)
+                valores.append(-1 if handle is None else handle)
+        elif op == LIBERAR_LOTE:
+            if len(cuerpo) != n * ENTERO.size:
+                raise ValueError("cuerpo de largo distinto a n handles")
+            valores = [int(sistema.liberar_memoria(handle=h)) for h in struct.unpack_from(f"<{n}q", cuerpo)]
+        elif op == ESTADISTICAS:
+            valores = [sistema.total, sistema.memoria_ocupada(), sistema.memoria_desperdiciada(),
+                       sistema.memoria_libre(), sistema.mayor_bloque_libre(), sistema.num_procesos_vigentes()]
+        else:
+            return RESPUESTA.pack(id_peticion, ERROR, 0)
+        return RESPUESTA.pack(id_peticion, OK, len(valores)) + struct.pack(f"<{len(valores)}q", *valores)
+
+
+def crear_sistema(motor: str, total_kb: int, min_kb: int):
+    from asignadores import crear_asignador
+    return crear_asignador(motor, total_kb * 1024, min_kb * 1024)
+
+
+def _destino(args) -> dict:
+    if args.unix:
+        return {"unix": args.unix}
+    host, _, puerto = args.tcp.rpartition(":")
+    return {"host": host or "127.0.0.1", "puerto": int(puerto)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de asignación buddy")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--unix", help="ruta del socket Unix")
+    grupo.add_argument("--tcp", default=f"127.0.0.1:{PUERTO}", help="host:puerto")
+    parser.add_argument("--motor", default="buddy")
+    parser.add_argument("--total-kb", type=int, default=64 * 1024)
+    parser.add_argument("--min-kb", type=int, default=4)
+    parser.add_argument("--max-cuerpo-kb", type=int, default=MAX_CUERPO // 1024,
+                        help="largo máximo del cuerpo de una petición")
+    args = parser.parse_args()
+
+    servidor = ServidorBuddy(crear_sistema(args.motor, args.total_kb, args.min_kb),
+                             max_cuerpo=args.max_cuerpo_kb * 1024)
+    print(f"Sirviendo {args.motor} en {args.unix or args.tcp}")
+    try:
+        asyncio.run(servidor.servir(**_destino(args)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
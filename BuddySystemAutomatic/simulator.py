@@ -1,80 +1,285 @@
-import random, json
-from PyQt6.QtCore import QTimer
+import random, json, os, time
+from collections import deque
+
+# Estados de un proceso, guardados como códigos pequeños en un bytearray
+PENDIENTE, EN_EJECUCION, FINALIZADO, NO_EJECUTADO = range(4)
+NOMBRES_ESTADO = ("pendiente", "en ejecución", "finalizado", "no ejecutado")
+
+# Junto a este módulo, sin importar desde dónde se ejecute
+ARCHIVO_PROCESOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "procesos.json")
+
+
+def _programar_qt(ms, funcion, *args):
+    # Qt sólo se importa si de verdad se usa el temporizador de la GUI
+    from PyQt6.QtCore import QTimer
+    QTimer.singleShot(ms, lambda: funcion(*args))
+
 
 class Simulador:
-    def __init__(self, sistema, actualizar_ui, n_procesos=200):
+    def __init__(self, sistema, actualizar_ui, n_procesos=200, reloj=None, semilla=None,
+                 verbose=True, archivo_procesos=ARCHIVO_PROCESOS, registrador=None, segregar_por_vida=False,
+                 prioridades=None, expropiar=False, reencolar=True, fraccion_larga=0.0):
         self.sistema = sistema
         self.actualizar_ui = actualizar_ui
-        self.procesos = self.generar_procesos(200)
+        # Sin reloj se usa QTimer (GUI); con un RelojSimulado corre sin Qt
+        self.reloj = reloj
+        self.programar = reloj.programar if reloj is not None else _programar_qt
+        self._inicio_real = time.monotonic()
+        # Registrador de series temporales (opcional): una muestra por evento
+        self.registrador = registrador
+        self.verbose = verbose
+        # Informar al asignador la vida de cada proceso (colocación segregada;
+        # experimental, no mejora al mejor ajuste: ver BuddySystem.py)
+        self.segregar_por_vida = segregar_por_vida
+        # Fracción de procesos de vida larga (10–30 s en vez de 2–3 s, como en traza.py)
+        self.fraccion_larga = fraccion_larga
+        # Expropiación (ver expropiacion.py): si un proceso no entra, se expulsan
+        # procesos de menor prioridad; los expulsados vuelven a la cola o quedan
+        # como "no ejecutados"
+        self.expropiar = expropiar
+        self.reencolar = reencolar
+        self.random = random.Random(semilla)
+        self.procesos = self.generar_procesos(n_procesos, archivo_procesos)
         self.index = 0  # posición en la lista de procesos
+        # Los nombres se internan una vez en el asignador; aquí todo se indexa
+        # por la posición del proceso en la lista
+        self.pids = [sistema.id_proceso(p["nombre"]) for p in self.procesos]
+        self.handles = [-1] * len(self.procesos)
         # Estados: "pendiente" (no intentado aún), "en ejecución", "finalizado", "no ejecutado"
-        self.estados = {p["nombre"]: "pendiente" for p in self.procesos}
+        self.estados = bytearray(len(self.procesos))  # todos PENDIENTE
+        self.conteo = [len(self.procesos), 0, 0, 0]   # procesos por estado
+        self.vidas = [0] * len(self.procesos)
+        # Cada asignación de un proceso tiene su turno: la liberación programada
+        # de un proceso expulsado no debe liberar su reasignación posterior
+        self.turnos = [0] * len(self.procesos)
+        # Prioridad de cada proceso: la clave "prioridad" del proceso, o
+        # prioridades(proceso) si se pasa una función (0 por omisión)
+        self.prioridades = [p.get("prioridad", prioridades(p) if prioridades else 0) for p in self.procesos]
+        self._indice_de_pid = {pid: i for i, pid in enumerate(self.pids)}
+        self.cola_expulsados = deque()
+        self.expulsiones = 0
+        self.admisiones_con_expulsion = 0
+        # Expropiaciones cuyas víctimas se expulsaron pero el reintento no entró
+        self.expropiaciones_fallidas = 0
+
+        # Fragmentación externa observada en cada rechazo
+        self.rechazos = 0
+        self.rechazos_por_fragmentacion = 0  # había memoria libre suficiente, pero no contigua
+        self.suma_indice_frag = 0.0
+        self.max_indice_frag = 0.0
+        self.eventos = 0
+
+    def _cambiar_estado(self, i, nuevo):
+        self.conteo[self.estados[i]] -= 1
+        self.conteo[nuevo] += 1
+        self.estados[i] = nuevo
 
-    def generar_procesos(self, n=200):
+    def estado_de(self, i) -> str:
+        return NOMBRES_ESTADO[self.estados[i]]
+
+    def tiempo_ms(self) -> int:
+        """Tiempo de la simulación: simulado con reloj, real con QTimer"""
+        if self.reloj is not None:
+            return self.reloj.ahora
+        return int((time.monotonic() - self._inicio_real) * 1000)
+
+    def _log(self, mensaje):
+        if self.verbose:
+            print(mensaje)
+
+    def generar_procesos(self, n=200, archivo=ARCHIVO_PROCESOS):
         procesos = []
         for i in range(n):
             nombre = f"P{i+1}"
 
-            r = random.random() 
-            if r < 0.7:  
-                tamano = random.randint(1, 1024)
-            else:  
-                tamano = random.randint(1025, 2048)
+            r = self.random.random()
+            if r < 0.7:
+                tamano = self.random.randint(1, 1024)
+            else:
+                tamano = self.random.randint(1025, 2048)
 
             unidad = "KB"
             procesos.append({"nombre": nombre, "tamano": tamano, "unidad": unidad})
 
         # Guardar en archivo JSON
-        with open("BuddySystemAutomatic/procesos.json", "w", encoding="utf-8") as f:
-            json.dump(procesos, f, indent=2, ensure_ascii=False)
+        if archivo:
+            with open(archivo, "w", encoding="utf-8") as f:
+                json.dump(procesos, f, indent=2, ensure_ascii=False)
 
         return procesos
-    
+
     def iniciar(self):
         self.procesar_lote()
 
     def procesar_lote(self):
+        # Los expulsados esperando vuelven a intentar antes que los nuevos
+        if self.cola_expulsados:
+            self.reintentar_expulsados()
         if self.index >= len(self.procesos):
-            print("✅ Simulación finalizada")
+            if self.cola_expulsados:
+                self.programar(2500, self.procesar_lote)
+                return
+            self._log("✅ Simulación finalizada")
             return
 
-        lote = self.procesos[self.index:self.index+5]
-        self.index += 5
+        inicio = self.index
+        self.index = min(self.index + 5, len(self.procesos))
 
-        for p in lote:
+        for i in range(inicio, self.index):
             # Intentamos asignar cada proceso del lote
-            self.asignar_proceso(p)
+            self.asignar_proceso(i)
 
         # esperar 1 seg y luego seguir con el siguiente lote
-        QTimer.singleShot(2500, self.procesar_lote)
+        self.programar(2500, self.procesar_lote)
 
-    def asignar_proceso(self, p):
+    def asignar_proceso(self, i):
+        p = self.procesos[i]
         nombre = p["nombre"]
         tam = convertir_a_bytes(p["tamano"], p["unidad"])
-        nodo = self.sistema.asignar_memoria(tam, nombre)
+        # La vida (2–3 seg, o 10–30 seg si es larga) se sortea antes de asignar para poder informarla
+        t = self.random.randint(2000, 3000)
+        # Sólo se sortea si hay procesos largos: la secuencia por omisión no cambia
+        if self.fraccion_larga and self.random.random() < self.fraccion_larga:
+            t = self.random.randint(10_000, 30_000)
+        self.vidas[i] = t
+        handle = self._pedir_memoria(i, tam, t)
 
         # Marcamos que ya fue intentado: si se asignó => "en ejecución", si no => "no ejecutado"
-        if nodo:
-            print(f"[+] Asignado {nombre} ({p['tamano']} {p['unidad']})")
-            self.estados[nombre] = "en ejecución"
-            self.actualizar_ui()
-            # Liberar después de 2–3 seg
-            t = random.randint(2000, 3000)
-            QTimer.singleShot(t, lambda nombre=nombre, t=t: self.liberar_proceso(nombre, t))
+        if handle is not None:
+            self._log(f"[+] Asignado {nombre} ({p['tamano']} {p['unidad']})")
+            self._admitir(i, handle)
         else:
-            print(f"[!] No se pudo asignar {nombre} ({p['tamano']} {p['unidad']})")
+            self._log(f"[!] No se pudo asignar {nombre} ({p['tamano']} {p['unidad']})")
+            self._registrar_rechazo(tam)
             # Aumentamos el contador de "no ejecutados"
-            self.estados[nombre] = "no ejecutado"
+            self._cambiar_estado(i, NO_EJECUTADO)
+            self._muestrear()
             self.actualizar_ui()
 
-    def liberar_proceso(self, nombre, t):
-        ok = self.sistema.liberar_memoria(nombre)
+    def _pedir_memoria(self, i, tam, t):
+        handle = self._asignar_memoria(i, tam, t)
+        if handle is None and self.expropiar:
+            from expropiacion import expropiar
+            expulsados = expropiar(self.sistema, tam, self.prioridades[i], self._prioridad_de_nodo)
+            if expulsados:
+                for pid in expulsados:
+                    self._expulsar(self._indice_de_pid[pid])
+                self.expulsiones += len(expulsados)
+                handle = self._asignar_memoria(i, tam, t)
+                # La admisión cuenta sólo si el reintento entró; las expulsiones
+                # ya ocurrieron igual
+                if handle is None:
+                    self.expropiaciones_fallidas += 1
+                else:
+                    self.admisiones_con_expulsion += 1
+        return handle
+
+    def _asignar_memoria(self, i, tam, t):
+        if self.segregar_por_vida:
+            handle = self.sistema.asignar_memoria(tam, pid=self.pids[i], vida=t)
+        else:
+            handle = self.sistema.asignar_memoria(tam, pid=self.pids[i])
+        self.eventos += 1
+        return handle
+
+    def _admitir(self, i, handle):
+        self.handles[i] = handle
+        self._cambiar_estado(i, EN_EJECUCION)
+        self._muestrear()
+        self.actualizar_ui()
+        # Liberar cuando termine su vida
+        self.programar(self.vidas[i], self.liberar_proceso, i, self.vidas[i], self.turnos[i])
+
+    def _prioridad_de_nodo(self, nodo):
+        return self.prioridades[self._indice_de_pid[nodo.pid]]
+
+    def _expulsar(self, i):
+        """Marca como expulsado a un proceso cuya memoria ya se liberó"""
+        self._log(f"[x] Expulsado {self.procesos[i]['nombre']}")
+        self.handles[i] = -1
+        self.turnos[i] += 1
+        if self.reencolar:
+            # Vuelve a la cola y al reingresar corre su vida completa otra vez
+            self.cola_expulsados.append(i)
+            self._cambiar_estado(i, PENDIENTE)
+        else:
+            self._cambiar_estado(i, NO_EJECUTADO)
+
+    def reintentar_expulsados(self):
+        esperando = len(self.cola_expulsados)
+        for _ in range(esperando):
+            i = self.cola_expulsados.popleft()
+            p = self.procesos[i]
+            handle = self._pedir_memoria(i, convertir_a_bytes(p["tamano"], p["unidad"]), self.vidas[i])
+            if handle is not None:
+                self._log(f"[+] Reasignado {p['nombre']}")
+                self._admitir(i, handle)
+            elif self.conteo[EN_EJECUCION] == 0 and self.index >= len(self.procesos):
+                # Nada más va a liberar memoria: no va a entrar nunca
+                self._cambiar_estado(i, NO_EJECUTADO)
+            else:
+                self.cola_expulsados.append(i)
+
+    def _registrar_rechazo(self, tam):
+        indice = self.sistema.indice_fragmentacion_externa()
+        self.rechazos += 1
+        self.suma_indice_frag += indice
+        self.max_indice_frag = max(self.max_indice_frag, indice)
+        if self.sistema.memoria_libre() >= tam:
+            self.rechazos_por_fragmentacion += 1
+
+    def _muestrear(self):
+        if self.registrador is not None:
+            self.registrador.muestrear(self.tiempo_ms(), self.sistema, self)
+
+    def liberar_proceso(self, i, t, turno=None):
+        if turno is not None and turno != self.turnos[i]:
+            return  # el proceso fue expulsado después de programar esta liberación
+        ok = self.sistema.liberar_memoria(handle=self.handles[i])
+        self.eventos += 1
         if ok:
-            print(f"[-] Liberado {nombre} después de {t/1000:.1f}s")
+            self._log(f"[-] Liberado {self.procesos[i]['nombre']} después de {t/1000:.1f}s")
+            self.handles[i] = -1
             # Solo marcar como finalizado si estaba en ejecución (seguro)
-            self.estados[nombre] = "finalizado"
+            self._cambiar_estado(i, FINALIZADO)
+            self._muestrear()
             self.actualizar_ui()
 
+    def resumen(self) -> dict:
+        """Resultados de la corrida (incluida la fragmentación externa observada)"""
+        return {
+            "procesos": len(self.procesos),
+            **{NOMBRES_ESTADO[k]: n for k, n in enumerate(self.conteo)},
+            "rechazos": self.rechazos,
+            "rechazos_por_fragmentacion": self.rechazos_por_fragmentacion,
+            "indice_frag_promedio_en_rechazo": self.suma_indice_frag / self.rechazos if self.rechazos else 0.0,
+            "indice_frag_max_en_rechazo": self.max_indice_frag,
+            "desperdicio": self.sistema.memoria_desperdiciada(),
+            "mayor_bloque_libre": self.sistema.mayor_bloque_libre(),
+            **({
+                "expulsiones": self.expulsiones,
+                "admisiones_con_expulsion": self.admisiones_con_expulsion,
+                "expropiaciones_fallidas": self.expropiaciones_fallidas,
+                "expulsiones_por_admision": (self.expulsiones / self.admisiones_con_expulsion
+                                             if self.admisiones_con_expulsion else 0.0),
+            } if self.expropiar else {}),
+        }
+
+
+def simular(sistema, n_procesos=200, semilla=None, verbose=False, registrador=None, segregar_por_vida=False,
+            prioridades=None, expropiar=False, reencolar=True, fraccion_larga=0.0):
+    """Corre el Simulador completo sin GUI sobre un reloj simulado"""
+    from reloj import RelojSimulado
+    reloj = RelojSimulado()
+    sim = Simulador(sistema, lambda: None, n_procesos, reloj=reloj, semilla=semilla,
+                    verbose=verbose, archivo_procesos=None, registrador=registrador,
+                    segregar_por_vida=segregar_por_vida, prioridades=prioridades,
+                    expropiar=expropiar, reencolar=reencolar, fraccion_larga=fraccion_larga)
+    sim.iniciar()
+    reloj.correr()
+    return sim
+
+
 def convertir_a_bytes(valor: int, unidad: str) -> int:
     if unidad == "KB":
         return valor * 1024
@@ -83,4 +288,4 @@ def convertir_a_bytes(valor: int, unidad: str) -> int:
     elif unidad == "GB":
         return valor * 1024 * 1024 * 1024
     else:  # Bytes
-        return valor
\ No newline at end of file
+        return valor
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de los invariantes del árbol buddy y de lo que se apoya en ellos:
+división y fusión, mascara_libres, contadores, instantáneas, diario,
+selección de víctimas de la expropiación y el Monte Carlo vectorizado.
+
+Ejecutar (desde BuddySystemAutomatic, o desde la raíz del repositorio):
+    python -m unittest test_buddy
+    python -m pytest -q
+"""
+from __future__ import annotations
+import os
+import random
+import tempfile
+import unittest
+from typing import List
+
+from BuddySystem import SistemaBuddy
+from NodoMemoria import NodoMemoria
+from ponderado import SistemaBuddyPonderado
+from disperso import SistemaBuddyDisperso
+from politicas import PoliticaMejorAjuste, PoliticaMitadAltaLibre
+from instantanea import (serializar, deserializar, guardar_instantanea, cargar_instantanea,
+                         InstantaneaMapeada)
+from diario import SistemaDiario, recuperar
+from expropiacion import buscar_victimas, expropiar
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MOTORES = (SistemaBuddy, SistemaBuddyPonderado)
+
+
+# =========================
+#   AUXILIARES
+# =========================
+def verificar_invariantes(prueba: unittest.TestCase, s: SistemaBuddy):
+    """Recorre el árbol completo y compara con lo que el sistema mantiene incrementalmente"""
+    hojas: List[NodoMemoria] = []
+    pila = [s.raiz]
+    while pila:
+        n = pila.pop()
+        if n.es_hoja():
+            hojas.append(n)
+            prueba.assertEqual(n.mascara_libres, 0 if n.ocupado else s._bit_de(n.tamano), n)
+            continue
+        izq, der = n.hijoIzquierdo, n.hijoDerecho
+        prueba.assertFalse(n.ocupado, n)
+        prueba.assertIs(izq.padre, n)
+        prueba.assertIs(der.padre, n)
+        if isinstance(s, SistemaBuddyPonderado):
+            prueba.assertEqual((izq.tamano, der.tamano), s.dividir_tamano(n.tamano), n)
+        else:
+            prueba.assertEqual((izq.tamano, der.tamano), (n.tamano // 2, n.tamano // 2), n)
+        prueba.assertEqual(izq.direccion, n.direccion)
+        prueba.assertEqual(der.direccion, n.direccion + izq.tamano)
+        prueba.assertEqual(n.mascara_libres, izq.mascara_libres | der.mascara_libres, n)
+        # Dos hermanos libres sin dividir se tendrían que haber fusionado
+        prueba.assertFalse(izq.es_hoja() and der.es_hoja() and not izq.ocupado and not der.ocupado, n)
+        pila += [der, izq]
+
+    # Cadena de hojas: mismo orden que el recorrido y enlaces en ambos sentidos
+    prueba.assertEqual(hojas, s.hojas_en_orden())
+    for anterior, siguiente in zip(hojas, hojas[1:]):
+        prueba.assertIs(siguiente.anterior, anterior)
+    prueba.assertIsNone(hojas[0].anterior)
+
+    libres = [h for h in hojas if not h.ocupado]
+    ocupadas = [h for h in hojas if h.ocupado]
+    prueba.assertEqual(s.memoria_libre(), sum(h.tamano for h in libres))
+    prueba.assertEqual(s.memoria_ocupada(), sum(h.tamOcupado for h in ocupadas))
+    prueba.assertEqual(s.memoria_desperdiciada(), sum(h.tamano - h.tamOcupado for h in ocupadas))
+    conteo = [0] * len(s._libres_por_orden)
+    for h in libres:
+        conteo[s._bit_de(h.tamano).bit_length() - 1] += 1
+    prueba.assertEqual(conteo, s._libres_por_orden)
+
+    # Cada hoja ocupada pertenece a exactamente un handle vigente
+    registradas = []
+    for handle, nodo in enumerate(s._bloques):
+        if nodo is None:
+            continue
+        prueba.assertEqual(s._handle_de_pid[nodo.pid], handle)
+        for n in s.nodos_de(handle):
+            prueba.assertTrue(n.ocupado and n.es_hoja())
+            prueba.assertEqual((n.handle, n.pid), (handle, nodo.pid))
+            registradas.append(n)
+    prueba.assertCountEqual(registradas, ocupadas)
+
+
+def operar(s, rnd: random.Random, operaciones: int, vivos: List[int], max_kb: int = 9000,
+           vida: bool = False, prefijo: str = "p"):
+    """Asigna, libera y redimensiona al azar; devuelve los handles vigentes"""
+    for i in range(operaciones):
+        x = rnd.random()
+        if vivos and x < 0.4:
+            assert s.liberar_memoria(handle=vivos.pop(rnd.randrange(len(vivos))))
+        elif vivos and x < 0.5:
+            s.redimensionar_memoria(rnd.choice(vivos), rnd.randint(1, max_kb))
+        else:
+            opciones = {"vida": rnd.choice([5, 50, 500])} if vida else {}
+            handle = s.asignar_memoria(rnd.randint(1, max_kb), f"{prefijo}{i}", **opciones)
+            if handle is not None:
+                vivos.append(handle)
+    return vivos
+
+
+def foto(s) -> list:
+    """Estado observable de las hojas, en orden de dirección"""
+    return [(h.direccion, h.tamano, h.ocupado, h.tamOcupado, h.pid, h.handle, h.proceso)
+            for h in s.hojas_en_orden()]
+
+
+# =========================
+#   ÁRBOL: DIVISIÓN, FUSIÓN, MÁSCARAS Y CONTADORES
+# =========================
+class PruebaInvariantes(unittest.TestCase):
+    def test_division_y_fusion_completa(self):
+        for clase in MOTORES:
+            s = clase(1 << 12, 16)
+            handle = s.asignar_memoria(1, "a")
+            verificar_invariantes(self, s)
+            self.assertEqual(s.nodo_de(handle).tamano, 16)
+            self.assertTrue(s.liberar_memoria(handle=handle))
+            # Al liberar todo vuelve a quedar la raíz sola y libre
+            self.assertTrue(s.raiz.es_hoja())
+            self.assertEqual(s.histograma_libres(), {s.total: 1})
+            verificar_invariantes(self, s)
+
+    def test_carga_aleatoria(self):
+        for clase in MOTORES:
+            for politica in (None, PoliticaMejorAjuste(), PoliticaMitadAltaLibre()):
+                for vida in (False, True):
+                    with self.subTest(motor=clase.__name__, politica=type(politica).__name__, vida=vida):
+                        rnd = random.Random(3)
+                        s = clase(1 << 18, 16, politica)
+                        vivos = []
+                        for _ in range(6):
+                            operar(s, rnd, 300, vivos, vida=vida, prefijo=f"r{len(s._nombres)}-")
+                            verificar_invariantes(self, s)
+                        for handle in vivos:
+                            s.liberar_memoria(handle=handle)
+                        self.assertTrue(s.raiz.es_hoja())
+                        verificar_invariantes(self, s)
+
+    def test_asignacion_dispersa(self):
+        rnd = random.Random(5)
+        s = SistemaBuddy(1 << 16, 16, max_fragmentos=3)
+        vivos = []
+        dispersas = 0
+        for _ in range(5):
+            operar(s, rnd, 300, vivos, max_kb=20000, prefijo=f"d{len(s._nombres)}-")
+            verificar_invariantes(self, s)
+            dispersas += sum(s.fragmentos_de(h) > 1 for h in vivos)
+        self.assertGreater(dispersas, 0)
+
+
+# =========================
+#   INSTANTÁNEAS
+# =========================
+class PruebaInstantanea(unittest.TestCase):
+    def test_ida_y_vuelta(self):
+        for clase in MOTORES:
+            with self.subTest(motor=clase.__name__):
+                rnd = random.Random(11)
+                s = clase(1 << 18, 16)
+                vivos = operar(s, rnd, 3000, [])
+                s.id_proceso("sin_bloque")
+                r = deserializar(serializar(s))
+                self.assertIs(type(r), clase)
+                verificar_invariantes(self, r)
+                self.assertEqual(foto(r), foto(s))
+                self.assertEqual(r._nombres, s._nombres)
+                self.assertEqual(r._handle_de_pid, s._handle_de_pid)
+
+                # Después de restaurar, las mismas operaciones colocan en los mismos lugares
+                # (los handles libres se reusan en otro orden, así que se comparan por bloque)
+                pares = [(h, h) for h in vivos]
+                for i in range(2000):
+                    if pares and rnd.random() < 0.45:
+                        a, b = pares.pop(rnd.randrange(len(pares)))
+                        self.assertTrue(s.liberar_memoria(handle=a) and r.liberar_memoria(handle=b))
+                    else:
+                        tam = rnd.randint(1, 9000)
+                        a, b = s.asignar_memoria(tam, f"q{i}"), r.asignar_memoria(tam, f"q{i}")
+                        self.assertEqual(a is None, b is None)
+                        if a is not None:
+                            self.assertEqual(s.nodo_de(a).direccion, r.nodo_de(b).direccion)
+                            pares.append((a, b))
+                verificar_invariantes(self, r)
+                self.assertEqual([f[:5] for f in foto(r)], [f[:5] for f in foto(s)])
+
+    def test_archivo_y_vista(self):
+        rnd = random.Random(2)
+        s = SistemaBuddyPonderado(1 << 16, 16)
+        operar(s, rnd, 500, [])
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "estado.bdsn")
+            guardar_instantanea(s, ruta)
+            with InstantaneaMapeada(ruta) as vista:
+                self.assertEqual(vista.memoria_ocupada(), s.memoria_ocupada())
+                self.assertEqual(vista.memoria_desperdiciada(), s.memoria_desperdiciada())
+                self.assertEqual(vista.nombres(), s._nombres)
+                self.assertEqual(vista.n_asignadas, sum(h.ocupado for h in s.hojas_en_orden()))
+            self.assertEqual(foto(cargar_instantanea(ruta)), foto(s))
+
+    def test_rechazos(self):
+        with self.assertRaises(TypeError):
+            serializar(SistemaBuddyDisperso(1024))
+        datos = bytearray(serializar(SistemaBuddy(1024)))
+        datos[0:4] = b"XXXX"
+        with self.assertRaises(ValueError):
+            deserializar(bytes(datos))
+
+
+# =========================
+#   DIARIO
+# =========================
+class PruebaDiario(unittest.TestCase):
+    def _cargar(self, s, rnd: random.Random, operaciones: int):
+        vivos = []
+        for i in range(operaciones):
+            x = rnd.random()
+            if x < 0.05:
+                s.id_proceso(f"solo{i}")  # internado sin asignar
+            elif vivos and x < 0.45:
+                s.liberar_memoria(handle=vivos.pop(rnd.randrange(len(vivos))))
+            elif vivos and x < 0.55:
+                s.redimensionar_memoria(rnd.choice(vivos), rnd.randint(1, 12000))
+            else:
+                handle = s.asignar_memoria(rnd.randint(1, 9000), f"p{rnd.randrange(3000)}")
+                if handle is not None:
+                    vivos.append(handle)
+
+    def _comparar(self, base, recuperado):
+        verificar_invariantes(self, recuperado)
+        self.assertIs(type(recuperado), type(base))
+        self.assertEqual(foto(recuperado), foto(base))
+        # Los nombres internados después de la última asignación no se anotan
+        n = len(recuperado._nombres)
+        self.assertEqual(recuperado._nombres, base._nombres[:n])
+        self.assertEqual(recuperado._handle_de_pid, base._handle_de_pid[:n])
+
+    def test_recuperacion(self):
+        for clase in MOTORES:
+            for compactar in (0, 4096):
+                with self.subTest(motor=clase.__name__, compactar=compactar), \
+                        tempfile.TemporaryDirectory() as directorio:
+                    base = clase(1 << 18, 16)
+                    s = SistemaDiario(base, directorio, sincronizar_cada=0, intervalo_ms=0,
+                                      compactar_bytes=compactar)
+                    self._cargar(s, random.Random(7), 3000)
+                    s.sincronizar()
+                    if compactar:
+                        s.compactar(esperar=True)
+                        self.assertGreater(s.compactaciones, 0)
+                    # Sin cerrar: como después de una caída
+                    recuperado, _ = recuperar(directorio)
+                    self._comparar(base, recuperado)
+                    s.cerrar()
+
+    def test_marco_cortado(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            base = SistemaBuddy(1 << 16, 16)
+            s = SistemaDiario(base, directorio, sincronizar_cada=0, intervalo_ms=0, compactar_bytes=0)
+            self._cargar(s, random.Random(9), 500)
+            s.sincronizar()
+            esperado = foto(base)
+            s.cerrar()
+            # Una escritura cortada por la caída deja medio marco al final
+            ultimo = sorted(n for n in os.listdir(directorio) if n.startswith("diario-"))[-1]
+            with open(os.path.join(directorio, ultimo), "ab") as f:
+                f.write(b"\x40\x00\x00\x00\x01\x02\x03")
+            recuperado, _ = recuperar(directorio)
+            verificar_invariantes(self, recuperado)
+            self.assertEqual(foto(recuperado), esperado)
+
+    def test_motor_no_soportado(self):
+        with tempfile.TemporaryDirectory() as directorio, self.assertRaises(TypeError):
+            SistemaDiario(SistemaBuddyDisperso(1024), directorio)
+
+
+# =========================
+#   EXPROPIACIÓN
+# =========================
+def _victimas_por_fuerza_bruta(s: SistemaBuddy, espacio: int, prioridad: int, prioridad_de):
+    """Menor costo entre todos los bloques alineados del tamaño pedido"""
+    objetivo = max(s.obtener_tamano_requerido(espacio), s.min_bloque)
+    ocupadas = [h for h in s.hojas_en_orden() if h.ocupado]
+    mejor = None
+    for base in range(0, s.total, objetivo):
+        dentro = [h for h in ocupadas if h.direccion < base + objetivo and base < h.direccion + h.tamano]
+        if any(prioridad_de(h) >= prioridad for h in dentro):
+            continue
+        costo = (len(dentro), sum(map(prioridad_de, dentro)), sum(h.tamOcupado for h in dentro))
+        if mejor is None or costo < mejor:
+            mejor = costo
+    return mejor
+
+
+class PruebaExpropiacion(unittest.TestCase):
+    def test_contra_fuerza_bruta(self):
+        rnd = random.Random(1)
+        for caso in range(150):
+            s = SistemaBuddy(1 << 12, 16)
+            prioridades = {}
+            for i in range(rnd.randint(5, 60)):
+                handle = s.asignar_memoria(rnd.randint(1, 600), f"p{i}")
+                if handle is not None:
+                    prioridades[s.nodo_de(handle).pid] = rnd.randrange(4)
+            for handle in [h for h, n in enumerate(s._bloques) if n is not None]:
+                if rnd.random() < 0.3:
+                    s.liberar_memoria(handle=handle)
+            prioridad_de = lambda nodo: prioridades[nodo.pid]
+            espacio, prioridad = rnd.randint(1, 2500), rnd.randrange(1, 5)
+
+            esperado = _victimas_por_fuerza_bruta(s, espacio, prioridad, prioridad_de)
+            resultado = buscar_victimas(s, espacio, prioridad, prioridad_de)
+            with self.subTest(caso=caso):
+                if esperado is None:
+                    self.assertIsNone(resultado)
+                    continue
+                nodos = [s.nodo_de(h) for h in resultado[1]]
+                costo = (len(nodos), sum(map(prioridad_de, nodos)), sum(n.tamOcupado for n in nodos))
+                self.assertEqual(costo, esperado)
+                # Expulsadas las víctimas, la solicitud entra
+                self.assertIsNotNone(expropiar(s, espacio, prioridad, prioridad_de))
+                self.assertIsNotNone(s.asignar_memoria(espacio, "nuevo"))
+                verificar_invariantes(self, s)
+
+
+# =========================
+#   MONTE CARLO
+# =========================
+@unittest.skipIf(numpy is None, "requiere numpy")
+class PruebaMonteCarlo(unittest.TestCase):
+    def test_igual_al_simulador(self):
+        from montecarlo import MonteCarloBuddy, verificar
+        mc = MonteCarloBuddy(4096 * 1024, 4 * 1024, 100)
+        resultados = mc.correr(range(1, 41))
+        # Lanza AssertionError si alguna arena difiere de simular() con su semilla
+        verificar(mc, resultados, 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
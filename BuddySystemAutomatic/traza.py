@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import Optional, List, NamedTuple
+import csv
+import json
+import random
+
+from reloj import RelojSimulado
+
+# =========================
+#   TRAZAS DE CARGA
+# =========================
+#
+# Una traza es la lista de procesos con su llegada, tamaño y duración. Se puede
+# generar con la misma distribución que Simulador.generar_procesos (lotes de 5
+# cada 2500 ms, 70% de 1-1024 KB y 30% de 1025-2048 KB, vida de 2-3 s), guardar,
+# cargar y reproducir sobre cualquier asignador con la API de SistemaBuddy, de
+# modo que distintas configuraciones se comparen con exactamente la misma carga.
+
+
+class ProcesoTraza(NamedTuple):
+    nombre: str
+    llegada_ms: int
+    tamano: int        # bytes
+    duracion_ms: int
+
+
+def generar_traza(n: int = 200, semilla: Optional[int] = None, lote: int = 5,
+                  intervalo_ms: int = 2500, fraccion_larga: float = 0.0) -> List[ProcesoTraza]:
+    """Traza con la distribución del Simulador; `fraccion_larga` de los procesos vive 10-30 s"""
+    rnd = random.Random(semilla)
+    traza: List[ProcesoTraza] = []
+    for i in range(n):
+        if rnd.random() < 0.7:
+            tamano_kb = rnd.randint(1, 1024)
+        else:
+            tamano_kb = rnd.randint(1025, 2048)
+        duracion = rnd.randint(2000, 3000)
+        if fraccion_larga and rnd.random() < fraccion_larga:
+            duracion = rnd.randint(10_000, 30_000)
+        traza.append(ProcesoTraza(f"P{i+1}", (i // lote) * intervalo_ms, tamano_kb * 1024, duracion))
+    return traza
+
+
+def guardar_traza(traza: List[ProcesoTraza], ruta: str):
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(ProcesoTraza._fields)
+        escritor.writerows(traza)
+
+
+def cargar_traza(ruta: str, semilla: Optional[int] = None) -> List[ProcesoTraza]:
+    """Carga una traza CSV, o un procesos.json del Simulador (sin tiempos: se generan)"""
+    if ruta.endswith(".json"):
+        from simulator import convertir_a_bytes
+        rnd = random.Random(semilla)
+        with open(ruta, encoding="utf-8") as f:
+            procesos = json.load(f)
+        return [ProcesoTraza(p["nombre"], p.get("llegada_ms", (i // 5) * 2500),
+                             convertir_a_bytes(p["tamano"], p.get("unidad", "B")),
+                             p.get("duracion_ms") or rnd.randint(2000, 3000))
+                for i, p in enumerate(procesos)]
+    with open(ruta, newline="", encoding="utf-8") as f:
+        return [ProcesoTraza(fila["nombre"], int(fila["llegada_ms"]), int(fila["tamano"]), int(fila["duracion_ms"]))
+                for fila in csv.DictReader(f)]
+
+
+# =========================
+#   REPRODUCCIÓN
+# =========================
+def reproducir(sistema, traza: List[ProcesoTraza], informar_vida: bool = False) -> dict:
+    """Reproduce la traza sobre un reloj simulado y devuelve las estadísticas.
+
+    Con informar_vida=True cada solicitud lleva su duración (colocación segregada,
+    experimental: ver barrido.py --vida).
+    """
+    reloj = RelojSimulado()
+    stats = {"asignados": 0, "rechazados": 0, "rechazos_por_fragmentacion": 0,
+             "suma_desperdicio": 0, "max_desperdicio": 0, "suma_frag": 0.0, "suma_mayor_libre": 0,
+             "suma_ocupada": 0, "muestras": 0}
+
+    def muestrear():
+        desperdicio = sistema.memoria_desperdiciada()
+        stats["suma_desperdicio"] += desperdicio
+        stats["max_desperdicio"] = max(stats["max_desperdicio"], desperdicio)
+        stats["suma_frag"] += sistema.indice_fragmentacion_externa()
+        stats["suma_mayor_libre"] += sistema.mayor_bloque_libre()
+        stats["suma_ocupada"] += sistema.memoria_ocupada()
+        stats["muestras"] += 1
+
+    def llegar(p: ProcesoTraza):
+        if informar_vida:
+            handle = sistema.asignar_memoria(p.tamano, p.nombre, vida=p.duracion_ms)
+        else:
+            handle = sistema.asignar_memoria(p.tamano, p.nombre)
+        if handle is None:
+            stats["rechazados"] += 1
+            if sistema.memoria_libre() >= p.tamano:
+                stats["rechazos_por_fragmentacion"] += 1
+        else:
+            stats["asignados"] += 1
+            reloj.programar(p.duracion_ms, liberar, handle)
+        muestrear()
+
+    def liberar(handle: int):
+        sistema.liberar_memoria(handle=handle)
+        muestrear()
+
+    for p in traza:
+        # Las llegadas se programan desde t=0, en orden de la traza
+        reloj.programar(p.llegada_ms, llegar, p)
+    reloj.correr()
+
+    muestras = max(1, stats["muestras"])
+    total = stats["asignados"] + stats["rechazados"]
+    return {
+        "asignados": stats["asignados"],
+        "rechazados": stats["rechazados"],
+        "tasa_rechazo": stats["rechazados"] / total if total else 0.0,
+        "rechazos_por_fragmentacion": stats["rechazos_por_fragmentacion"],
+        "desperdicio_promedio": stats["suma_desperdicio"] / muestras,
+        "desperdicio_max": stats["max_desperdicio"],
+        "frag_externa_promedio": stats["suma_frag"] / muestras,
+        "mayor_libre_promedio": stats["suma_mayor_libre"] / muestras,
+        "ocupada_promedio": stats["suma_ocupada"] / muestras,
+    }
@@ -1,8 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass
 from typing import Optional, List, Tuple
-import hashlib
-import math
 
 from NodoMemoria import NodoMemoria
 # =========================
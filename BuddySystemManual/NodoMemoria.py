@@ -1,8 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass
 from typing import Optional, List, Tuple
-import hashlib
-import math
 
 class NodoMemoria:
     def __init__(self, tamano: int, direccion: int = 0):
@@ -0,0 +1,50 @@
+from __future__ import annotations
+from typing import List, Tuple
+import csv
+import json
+
+# =========================
+#   IMPORTACIÓN DE PROCESOS
+# =========================
+#
+# Lee listas de procesos (nombre, bytes) para asignarlas en lote:
+#   - JSON: lista de {"nombre", "tamano", "unidad"} (como el procesos.json del
+#     simulador automático; sin "unidad" el tamaño está en bytes)
+#   - CSV: encabezado con columnas nombre y tamano (y opcional unidad)
+#   - Trazas CSV de BuddySystemAutomatic/traza.py (nombre, llegada_ms, tamano,
+#     duracion_ms): se asignan en orden de llegada
+
+FACTORES = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def _a_bytes(tamano, unidad) -> int:
+    return int(tamano) * FACTORES[(unidad or "B").strip().upper()]
+
+
+def cargar_procesos(ruta: str) -> List[Tuple[str, int]]:
+    """Procesos (nombre, tamaño en bytes) de un archivo JSON, CSV o de traza.
+
+    Un archivo mal formado (CSV inválido, columna o unidad faltante, tamaño no
+    entero) lanza ValueError; los errores de lectura siguen siendo OSError.
+    """
+    try:
+        return _leer_procesos(ruta)
+    except csv.Error as e:
+        raise ValueError(f"CSV mal formado: {e}") from e
+    except KeyError as e:
+        raise ValueError(f"falta el campo o la unidad {e}") from e
+    except (TypeError, AttributeError) as e:
+        raise ValueError(f"formato inválido: {e}") from e
+
+
+def _leer_procesos(ruta: str) -> List[Tuple[str, int]]:
+    if ruta.lower().endswith(".json"):
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        return [(str(p["nombre"]), _a_bytes(p["tamano"], p.get("unidad"))) for p in datos]
+
+    with open(ruta, newline="", encoding="utf-8") as f:
+        filas = list(csv.DictReader(f))
+    if filas and "llegada_ms" in filas[0]:
+        filas.sort(key=lambda fila: int(fila["llegada_ms"]))  # estable: a igual llegada, orden del archivo
+    return [(fila["nombre"], _a_bytes(fila["tamano"], fila.get("unidad"))) for fila in filas]
@@ -4,11 +4,12 @@ GUI del Buddy System con PyQt6
 
 Características:
 - Permite especificar "Tamaño de memoria (máxima)" y "Tamaño mínimo de bloque" para inicializar el sistema.
-- Alta de procesos: nombre y tamaño solicitado.
-- Eliminación de procesos desde una lista desplegable 
+- Alta de procesos: nombre y tamaño solicitado, o en lote desde un archivo JSON/CSV/traza.
+- Tabla de procesos vigentes con búsqueda; se pueden liberar varios seleccionados a la vez.
 - Visualización de la memoria como barras horizontales proporcionadas al tamaño de los bloques.
 - Muestra la fragmentación interna total (memoria desperdiciada).
 - Bloques buddies (socios) tienen el mismo color.
+- Deshacer/Rehacer instantáneo (Ctrl+Z / Ctrl+Y) sobre un árbol persistente.
 
 Requisitos: PyQt6
     pip install PyQt6
@@ -28,17 +29,19 @@ from dataclasses import dataclass
 from typing import Optional, List, Tuple
 import hashlib
 
-from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtCore import Qt, QRectF, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QPainter, QFont, QPen, QBrush, QColor
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QDoubleSpinBox, QSpinBox, QLineEdit, QPushButton, QGroupBox, QLabel,
-    QMessageBox, QComboBox, QFrame
+    QMessageBox, QComboBox, QFrame, QTableView, QAbstractItemView, QHeaderView, QFileDialog
 )
 
-from PyQt6.QtGui import QValidator
+from PyQt6.QtGui import QValidator, QKeySequence, QShortcut
 import math
 from BuddySystem import SistemaBuddy, NodoMemoria
+from persistente import SistemaBuddyPersistente
+from importar import cargar_procesos
 
 
 
@@ -157,8 +160,24 @@ class MemoriaView(QWidget):
         fuente.setPointSize(9)
         painter.setFont(fuente)
 
+        # Los bloques de menos de un píxel se acumulan en franjas de ~1 px
+        # (ocupada si alguno lo está), así miles de procesos se dibujan rápido
+        franja_x, franja_ancho, franja_ocupada = x, 0.0, False
         for nodo in hojas:
             ancho = nodo.tamano * escala
+            if ancho < 1:
+                if franja_ancho == 0:
+                    franja_x = x
+                franja_ancho += ancho
+                franja_ocupada |= nodo.ocupado
+                x += ancho
+                if franja_ancho >= 1:
+                    self._dibujar_franja(painter, QRectF(franja_x, rect_total.top(), franja_ancho, alto), franja_ocupada)
+                    franja_ancho, franja_ocupada = 0.0, False
+                continue
+            if franja_ancho:
+                self._dibujar_franja(painter, QRectF(franja_x, rect_total.top(), franja_ancho, alto), franja_ocupada)
+                franja_ancho, franja_ocupada = 0.0, False
             bloque = QRectF(x, rect_total.top(), ancho, alto)
 
             # Color/estilo según estado
@@ -172,7 +191,10 @@ class MemoriaView(QWidget):
             painter.setPen(QPen(Qt.GlobalColor.white, 1))
             painter.drawRect(bloque)
 
-            # Texto informativo dentro del bloque
+            # Texto informativo dentro del bloque (si cabe)
+            if ancho < 40:
+                x += ancho
+                continue
             info = []
             if nodo.ocupado and nodo.proceso:
                 info.append(f"{nodo.proceso}")
@@ -186,8 +208,100 @@ class MemoriaView(QWidget):
 
             x += ancho
 
+        if franja_ancho:
+            self._dibujar_franja(painter, QRectF(franja_x, rect_total.top(), franja_ancho, alto), franja_ocupada)
         painter.end()
 
+    def _dibujar_franja(self, painter: QPainter, rect: QRectF, ocupada: bool):
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QBrush(QColor(90, 90, 90)) if ocupada else QBrush(Qt.BrushStyle.Dense4Pattern))
+        painter.drawRect(rect)
+
+
+# =========================
+#   TABLA DE PROCESOS (MODELO)
+# =========================
+class ModeloProcesos(QAbstractTableModel):
+    """Procesos vigentes como tabla virtualizada.
+
+    La vista sólo pide las filas visibles; los datos de cada bloque se buscan al
+    dibujarlas (O(log n)). Los cambios de cada versión del sistema se aplican
+    fila por fila, y si son muchos (un lote) se reconstruye la lista entera.
+    """
+    COLUMNAS = ("Proceso", "Solicitado", "Bloque", "Dirección")
+    MAX_INCREMENTAL = 64
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sistema: Optional[SistemaBuddyPersistente] = None
+        self._todos: List[str] = []    # procesos vigentes en orden de asignación
+        self._filas: List[str] = []    # los que pasan el filtro de búsqueda
+        self._filtro = ""
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.ItemDataRole.DisplayRole):
+        if rol == Qt.ItemDataRole.DisplayRole and orientacion == Qt.Orientation.Horizontal:
+            return self.COLUMNAS[seccion]
+        return None
+
+    def data(self, index, rol=Qt.ItemDataRole.DisplayRole):
+        if rol != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        nombre = self._filas[index.row()]
+        columna = index.column()
+        if columna == 0:
+            return nombre
+        direccion = self.sistema.direccion_de(nombre)
+        if direccion is None:
+            return None
+        if columna == 3:
+            return f"0x{direccion:X}"
+        nodo = self.sistema.bloque_en(direccion)
+        return formatear_tamano(nodo.tamOcupado if columna == 1 else nodo.tamano)
+
+    def nombre_en(self, fila: int) -> str:
+        return self._filas[fila]
+
+    def _pasa(self, nombre: str) -> bool:
+        return self._filtro in nombre.lower()
+
+    def reiniciar(self, sistema: Optional[SistemaBuddyPersistente]):
+        self.beginResetModel()
+        self.sistema = sistema
+        self._todos = sistema.procesos_en_orden() if sistema else []
+        self._filas = [n for n in self._todos if self._pasa(n)] if self._filtro else list(self._todos)
+        self.endResetModel()
+
+    def filtrar(self, texto: str):
+        self._filtro = texto.strip().lower()
+        self.reiniciar(self.sistema)
+
+    def aplicar_cambios(self, cambios, hacia_adelante: bool = True):
+        """Refleja los cambios (nombre, antes, después) de una versión del sistema"""
+        if len(cambios) > self.MAX_INCREMENTAL:
+            self.reiniciar(self.sistema)
+            return
+        for nombre, antes, despues in (cambios if hacia_adelante else reversed(cambios)):
+            if (despues if hacia_adelante else antes) is None:
+                self._todos.remove(nombre)
+                if self._pasa(nombre):
+                    fila = self._filas.index(nombre)
+                    self.beginRemoveRows(QModelIndex(), fila, fila)
+                    del self._filas[fila]
+                    self.endRemoveRows()
+            else:
+                self._todos.append(nombre)
+                if self._pasa(nombre):
+                    fila = len(self._filas)
+                    self.beginInsertRows(QModelIndex(), fila, fila)
+                    self._filas.append(nombre)
+                    self.endInsertRows()
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -195,7 +309,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Buddy System - Administrador de Memoria (PyQt6)")
         self.setMinimumSize(900, 560)
 
-        self.sistema: Optional[SistemaBuddy] = None
+        self.sistema: Optional[SistemaBuddyPersistente] = None
 
         cont = QWidget()
         self.setCentralWidget(cont)
@@ -255,18 +369,25 @@ class MainWindow(QMainWindow):
         btn_add = QPushButton("Asignar proceso")
         btn_add.clicked.connect(self.on_asignar)
 
-        self.combo_borrar = QComboBox()
-        self.combo_borrar.setPlaceholderText("Selecciona proceso a liberar")
-        btn_free = QPushButton("Liberar proceso")
-        btn_free.clicked.connect(self.on_liberar)
+        btn_importar = QPushButton("Importar procesos…")
+        btn_importar.clicked.connect(self.on_importar)
 
         ops_layout.addRow("Nombre:", self.edit_nombre)
         ops_layout.addRow("Tamaño solicitado:", row_proc)
         ops_layout.addRow(btn_add)
-
-        ops_layout.addRow(QLabel("\nEliminar proceso:"))
-        ops_layout.addRow("Proceso:", self.combo_borrar)
-        ops_layout.addRow(btn_free)
+        ops_layout.addRow(btn_importar)
+
+        # Historial (deshacer / rehacer)
+        row_hist = QHBoxLayout()
+        self.btn_deshacer = QPushButton("Deshacer")
+        self.btn_deshacer.clicked.connect(self.on_deshacer)
+        self.btn_rehacer = QPushButton("Rehacer")
+        self.btn_rehacer.clicked.connect(self.on_rehacer)
+        row_hist.addWidget(self.btn_deshacer)
+        row_hist.addWidget(self.btn_rehacer)
+        ops_layout.addRow(row_hist)
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.on_deshacer)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.on_rehacer)
         ops_group.setLayout(ops_layout)
 
         # --- Indicadores ---
@@ -282,6 +403,34 @@ class MainWindow(QMainWindow):
         sep.setFrameShape(QFrame.Shape.HLine)
         sep.setFrameShadow(QFrame.Shadow.Sunken)
 
+        # --- Tabla de procesos vigentes (búsqueda + liberación múltiple) ---
+        procs_group = QGroupBox("Procesos vigentes")
+        procs_layout = QVBoxLayout()
+        self.edit_buscar = QLineEdit()
+        self.edit_buscar.setPlaceholderText("Buscar proceso…")
+        self.edit_buscar.setClearButtonEnabled(True)
+        self.modelo = ModeloProcesos(self)
+        self.edit_buscar.textChanged.connect(self.modelo.filtrar)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tabla.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.tabla.verticalHeader().setVisible(False)
+        # Filas de alto fijo: la vista no mide filas fuera de pantalla
+        self.tabla.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.tabla.verticalHeader().setDefaultSectionSize(22)
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+        btn_free = QPushButton("Liberar seleccionados")
+        btn_free.clicked.connect(self.on_liberar)
+        self.lbl_procesos = QLabel("0 procesos")
+        row_free = QHBoxLayout()
+        row_free.addWidget(self.lbl_procesos, 1)
+        row_free.addWidget(btn_free)
+        procs_layout.addWidget(self.edit_buscar)
+        procs_layout.addWidget(self.tabla, 1)
+        procs_layout.addLayout(row_free)
+        procs_group.setLayout(procs_layout)
+
         # --- Vista de memoria ---
         self.mem_view = MemoriaView(self.get_sistema)
 
@@ -289,6 +438,7 @@ class MainWindow(QMainWindow):
         top = QHBoxLayout()
         top.addWidget(init_group, 1)
         top.addWidget(ops_group, 1)
+        top.addWidget(procs_group, 1)
 
         layout.addLayout(top)
         layout.addLayout(info_bar)
@@ -296,7 +446,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.mem_view, 1)
 
     # --------- Callbacks ---------
-    def get_sistema(self) -> Optional[SistemaBuddy]:
+    def get_sistema(self) -> Optional[SistemaBuddyPersistente]:
         return self.sistema
 
     def on_inicializar(self):
@@ -312,7 +462,8 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Valores inválidos", "El bloque mínimo no puede ser mayor que la memoria total.")
             return
 
-        self.sistema = SistemaBuddy(total_pow2, min_pow2)
+        self.sistema = SistemaBuddyPersistente(total_pow2, min_pow2)
+        self.modelo.reiniciar(self.sistema)
         self.actualizar_ui()
 
     def on_asignar(self):
@@ -327,7 +478,7 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Dato faltante", "Ingresa un nombre para el proceso.")
             return
 
-        if nombre in self.sistema.procesos_vigentes():
+        if self.sistema.direccion_de(nombre) is not None:
             QMessageBox.warning(self, "Duplicado", f"Ya existe un proceso con el nombre '{nombre}'.")
             return
 
@@ -337,36 +488,84 @@ class MainWindow(QMainWindow):
                 self, "Sin espacio",
                 "No se pudo asignar memoria al proceso (espacio insuficiente o fragmentación)."
             )
+        else:
+            self.modelo.aplicar_cambios(self.sistema.cambios(self.sistema.version))
 
         self.actualizar_ui()
 
+    def on_importar(self):
+        if not self.sistema:
+            QMessageBox.warning(self, "No inicializado", "Primero inicializa el sistema.")
+            return
+        ruta, _ = QFileDialog.getOpenFileName(self, "Importar procesos", "",
+                                              "Procesos (*.json *.csv *.trace *.txt);;Todos (*)")
+        if ruta:
+            self.importar(ruta)
+
+    def importar(self, ruta: str) -> int:
+        """Asigna en lote (una sola versión) los procesos de un archivo; devuelve cuántos entraron"""
+        try:
+            procesos = cargar_procesos(ruta)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Archivo inválido", f"No se pudo leer {ruta}:\n{e}")
+            return 0
+        hojas = self.sistema.asignar_lote(procesos)
+        asignados = len(hojas) - hojas.count(None)
+        if asignados:
+            self.modelo.aplicar_cambios(self.sistema.cambios(self.sistema.version))
+        self.actualizar_ui()
+        if asignados < len(procesos):
+            QMessageBox.information(
+                self, "Importación",
+                f"Asignados {asignados} de {len(procesos)} procesos "
+                f"(el resto no entró o su nombre ya estaba vigente)."
+            )
+        return asignados
+
     def on_liberar(self):
         if not self.sistema:
             QMessageBox.warning(self, "No inicializado", "Primero inicializa el sistema.")
             return
-        proc = self.combo_borrar.currentText().strip()
-        if not proc:
-            QMessageBox.information(self, "Seleccione", "No hay proceso seleccionado.")
+        filas = self.tabla.selectionModel().selectedRows()
+        if not filas:
+            QMessageBox.information(self, "Seleccione", "No hay procesos seleccionados.")
             return
-        ok = self.sistema.liberar_memoria(proc)
-        if not ok:
-            QMessageBox.information(self, "No encontrado", "Ese proceso no existe o ya fue liberado.")
+        nombres = [self.modelo.nombre_en(i.row()) for i in filas]
+        if self.sistema.liberar_lote(nombres):
+            self.tabla.clearSelection()
+            self.modelo.aplicar_cambios(self.sistema.cambios(self.sistema.version))
         self.actualizar_ui()
 
+    def on_deshacer(self):
+        if not self.sistema:
+            return
+        cambios = self.sistema.cambios(self.sistema.version)
+        if self.sistema.deshacer():
+            self.modelo.aplicar_cambios(cambios, hacia_adelante=False)
+            self.actualizar_ui()
+
+    def on_rehacer(self):
+        if self.sistema and self.sistema.rehacer():
+            self.modelo.aplicar_cambios(self.sistema.cambios(self.sistema.version))
+            self.actualizar_ui()
+
     def actualizar_ui(self):
         if self.sistema:
-            procesos = self.sistema.procesos_vigentes()
-            self.combo_borrar.clear()
-            self.combo_borrar.addItems(procesos)
+            self.lbl_procesos.setText(f"{self.sistema.num_procesos()} procesos")
             desperdicio = formatear_tamano(self.sistema.memoria_desperdiciada())
             self.lbl_frag.setText(f"Desperdicio: {desperdicio}")
             self.lbl_estado.setText(
                 f"Total: {formatear_tamano(self.sistema.total)} | Mín. bloque: {formatear_tamano(self.sistema.min_bloque)}"
+                f" | Versión: {self.sistema.version}"
             )
+            self.btn_deshacer.setEnabled(self.sistema.puede_deshacer())
+            self.btn_rehacer.setEnabled(self.sistema.puede_rehacer())
         else:
-            self.combo_borrar.clear()
+            self.lbl_procesos.setText("0 procesos")
             self.lbl_frag.setText("Desperdicio: 0")
             self.lbl_estado.setText("Sin inicializar")
+            self.btn_deshacer.setEnabled(False)
+            self.btn_rehacer.setEnabled(False)
 
         self.mem_view.update()
 
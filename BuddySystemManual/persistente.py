@@ -0,0 +1,306 @@
+from __future__ import annotations
+from typing import Optional, List, Tuple, Dict, Iterable
+
+from BuddySystem import SistemaBuddy
+
+# =========================
+#   BUDDY SYSTEM PERSISTENTE (COPY-ON-WRITE)
+# =========================
+#
+# Cada asignación o liberación produce una nueva versión del árbol copiando
+# únicamente el camino raíz -> bloque modificado (O(log n) nodos nuevos); el
+# resto de los subárboles se comparte entre versiones. Así deshacer/rehacer o
+# saltar a cualquier versión del historial es inmediato.
+#
+# Los nodos son inmutables por convención: nunca se modifican después de crearlos.
+
+
+class NodoPersistente:
+    __slots__ = ("tamano", "direccion", "ocupado", "proceso", "tamOcupado",
+                 "hijoIzquierdo", "hijoDerecho", "mayor_libre", "ocupada", "desperdicio")
+
+    def __init__(self, tamano: int, direccion: int, proceso: Optional[str] = None, tamOcupado: int = 0,
+                 hijoIzquierdo: Optional[NodoPersistente] = None, hijoDerecho: Optional[NodoPersistente] = None):
+        self.tamano = tamano
+        self.direccion = direccion
+        self.proceso = proceso
+        self.ocupado = proceso is not None
+        self.tamOcupado = tamOcupado
+        self.hijoIzquierdo = hijoIzquierdo
+        self.hijoDerecho = hijoDerecho
+        # Resúmenes del subárbol, para búsquedas y métricas en O(1)/O(log n)
+        if hijoIzquierdo is not None:
+            self.mayor_libre = max(hijoIzquierdo.mayor_libre, hijoDerecho.mayor_libre)
+            self.ocupada = hijoIzquierdo.ocupada + hijoDerecho.ocupada
+            self.desperdicio = hijoIzquierdo.desperdicio + hijoDerecho.desperdicio
+        elif self.ocupado:
+            self.mayor_libre = 0
+            self.ocupada = tamOcupado
+            self.desperdicio = tamano - tamOcupado
+        else:
+            self.mayor_libre = tamano
+            self.ocupada = 0
+            self.desperdicio = 0
+
+    def es_hoja(self) -> bool:
+        return self.hijoIzquierdo is None
+
+    def __repr__(self):
+        return f"<NodoPersistente tamano={self.tamano}, ocupado={self.ocupado}, proceso={self.proceso}, dir={self.direccion}>"
+
+
+def _unir(izq: NodoPersistente, der: NodoPersistente) -> NodoPersistente:
+    """Crea el padre de dos buddies, fusionándolos si ambos son hojas libres"""
+    tamano = izq.tamano * 2
+    if izq.es_hoja() and der.es_hoja() and not izq.ocupado and not der.ocupado:
+        return NodoPersistente(tamano, izq.direccion)
+    return NodoPersistente(tamano, izq.direccion, hijoIzquierdo=izq, hijoDerecho=der)
+
+
+class SistemaBuddyPersistente:
+    def __init__(self, tamano_total: int = 1024, tam_min_bloque: int = 1, max_historial: int = 1000):
+        self.total = SistemaBuddy.obtener_potencia_requerida(max(1, tamano_total))
+        self.min_bloque = SistemaBuddy.obtener_potencia_requerida(max(1, tam_min_bloque))
+        if self.min_bloque > self.total:
+            self.min_bloque = self.total
+        self.max_historial = max(1, max_historial)
+
+        # Cada versión guarda su raíz y los cambios del índice de procesos
+        # (nombre, dirección antes, dirección después) respecto a la anterior
+        self._versiones: List[Tuple[NodoPersistente, List[Tuple[str, Optional[int], Optional[int]]]]] = [
+            (NodoPersistente(self.total, 0), [])
+        ]
+        self._actual = 0
+        self._indice: Dict[str, int] = {}  # nombre -> dirección, de la versión actual
+        self._cache_hojas: Optional[Tuple[NodoPersistente, List[NodoPersistente]]] = None
+
+    @property
+    def raiz(self) -> NodoPersistente:
+        return self._versiones[self._actual][0]
+
+    @staticmethod
+    def obtener_potencia_requerida(tamano: int) -> int:
+        return SistemaBuddy.obtener_potencia_requerida(tamano)
+
+    # =========================
+    #   HISTORIAL
+    # =========================
+    def _nueva_version(self, raiz: NodoPersistente, cambios: List[Tuple[str, Optional[int], Optional[int]]]):
+        # Una operación nueva descarta las versiones "rehacer"
+        del self._versiones[self._actual + 1:]
+        self._versiones.append((raiz, cambios))
+        if len(self._versiones) > self.max_historial + 1:
+            del self._versiones[0]
+        self._actual = len(self._versiones) - 1
+
+    def _aplicar_cambios(self, cambios, hacia_adelante: bool):
+        for nombre, antes, despues in (cambios if hacia_adelante else reversed(cambios)):
+            valor = despues if hacia_adelante else antes
+            if valor is None:
+                self._indice.pop(nombre, None)
+            else:
+                self._indice[nombre] = valor
+
+    def puede_deshacer(self) -> bool:
+        return self._actual > 0
+
+    def puede_rehacer(self) -> bool:
+        return self._actual < len(self._versiones) - 1
+
+    def deshacer(self) -> bool:
+        if not self.puede_deshacer():
+            return False
+        self._aplicar_cambios(self._versiones[self._actual][1], hacia_adelante=False)
+        self._actual -= 1
+        return True
+
+    def rehacer(self) -> bool:
+        if not self.puede_rehacer():
+            return False
+        self._actual += 1
+        self._aplicar_cambios(self._versiones[self._actual][1], hacia_adelante=True)
+        return True
+
+    def ir_a_version(self, version: int):
+        """Salta a cualquier versión retenida del historial"""
+        version = max(0, min(version, len(self._versiones) - 1))
+        while self._actual > version:
+            self.deshacer()
+        while self._actual < version:
+            self.rehacer()
+
+    @property
+    def version(self) -> int:
+        return self._actual
+
+    def num_versiones(self) -> int:
+        return len(self._versiones)
+
+    def cambios(self, version: int) -> List[Tuple[str, Optional[int], Optional[int]]]:
+        """Cambios (nombre, dirección antes, dirección después) que llevan de version - 1 a version"""
+        return self._versiones[version][1]
+
+    # =========================
+    #   ASIGNACIÓN DE MEMORIA
+    # =========================
+    def asignar_memoria(self, espacio: int, proceso: str) -> Optional[NodoPersistente]:
+        """Solicita memoria para un proceso; crea una nueva versión si tiene éxito"""
+        if not proceso or proceso in self._indice:
+            return None
+        espacio2 = self.obtener_potencia_requerida(espacio)
+        if espacio2 > self.total:
+            return None
+        req = max(espacio2, self.min_bloque)
+        if self.raiz.mayor_libre < req:
+            return None
+        nueva_raiz, hoja = self._asignar(self.raiz, req, proceso, espacio)
+        self._indice[proceso] = hoja.direccion
+        self._nueva_version(nueva_raiz, [(proceso, None, hoja.direccion)])
+        return hoja
+
+    def asignar_lote(self, solicitudes: Iterable[Tuple[str, int]]) -> List[Optional[NodoPersistente]]:
+        """Asigna muchos procesos (nombre, espacio) en orden, en una sola versión.
+
+        Deshacer revierte el lote completo. Devuelve la hoja de cada solicitud
+        (None si no entró o el nombre ya estaba vigente).
+        """
+        raiz = self.raiz
+        cambios: List[Tuple[str, Optional[int], Optional[int]]] = []
+        hojas: List[Optional[NodoPersistente]] = []
+        for proceso, espacio in solicitudes:
+            req = max(self.obtener_potencia_requerida(espacio), self.min_bloque)
+            if not proceso or proceso in self._indice or req > self.total or raiz.mayor_libre < req:
+                hojas.append(None)
+                continue
+            raiz, hoja = self._asignar(raiz, req, proceso, espacio)
+            self._indice[proceso] = hoja.direccion
+            cambios.append((proceso, None, hoja.direccion))
+            hojas.append(hoja)
+        if cambios:
+            self._nueva_version(raiz, cambios)
+        return hojas
+
+    def _asignar(self, nodo: NodoPersistente, req: int, proceso: str, espacio: int):
+        """Copia el camino hasta el bloque libre más a la izquierda que alcance"""
+        if nodo.es_hoja():
+            if nodo.tamano == req:
+                hoja = NodoPersistente(nodo.tamano, nodo.direccion, proceso, espacio)
+                return hoja, hoja
+            # Dividir: los dos buddies nacen libres
+            mitad = nodo.tamano // 2
+            izq = NodoPersistente(mitad, nodo.direccion)
+            der = NodoPersistente(mitad, nodo.direccion + mitad)
+        else:
+            izq, der = nodo.hijoIzquierdo, nodo.hijoDerecho
+
+        if izq.mayor_libre >= req:
+            izq, hoja = self._asignar(izq, req, proceso, espacio)
+        else:
+            der, hoja = self._asignar(der, req, proceso, espacio)
+        return NodoPersistente(nodo.tamano, nodo.direccion, hijoIzquierdo=izq, hijoDerecho=der), hoja
+
+    # =========================
+    #   LIBERACIÓN DE MEMORIA
+    # =========================
+    def liberar_memoria(self, proceso: str) -> bool:
+        direccion = self._indice.get(proceso)
+        if direccion is None:
+            return False
+        nueva_raiz = self._liberar(self.raiz, direccion)
+        del self._indice[proceso]
+        self._nueva_version(nueva_raiz, [(proceso, direccion, None)])
+        return True
+
+    def liberar_lote(self, procesos: Iterable[str]) -> int:
+        """Libera varios procesos en una sola versión; devuelve cuántos se liberaron"""
+        raiz = self.raiz
+        cambios: List[Tuple[str, Optional[int], Optional[int]]] = []
+        for proceso in procesos:
+            direccion = self._indice.pop(proceso, None)
+            if direccion is None:
+                continue
+            raiz = self._liberar(raiz, direccion)
+            cambios.append((proceso, direccion, None))
+        if cambios:
+            self._nueva_version(raiz, cambios)
+        return len(cambios)
+
+    def _liberar(self, nodo: NodoPersistente, direccion: int) -> NodoPersistente:
+        if nodo.es_hoja():
+            return NodoPersistente(nodo.tamano, nodo.direccion)
+        izq, der = nodo.hijoIzquierdo, nodo.hijoDerecho
+        if direccion < der.direccion:
+            izq = self._liberar(izq, direccion)
+        else:
+            der = self._liberar(der, direccion)
+        return _unir(izq, der)
+
+    # =========================
+    #   MÉTRICAS Y CONSULTAS
+    # =========================
+    def memoria_desperdiciada(self) -> int:
+        return self.raiz.desperdicio
+
+    def memoria_ocupada(self) -> int:
+        return self.raiz.ocupada
+
+    def memoria_disponible(self) -> int:
+        return self.total - self.raiz.ocupada
+
+    def procesos_vigentes(self) -> List[str]:
+        return sorted(self._indice)
+
+    def num_procesos(self) -> int:
+        return len(self._indice)
+
+    def procesos_en_orden(self) -> List[str]:
+        """Procesos vigentes en el orden en que se asignaron (sin ordenar, O(n))"""
+        return list(self._indice)
+
+    def direccion_de(self, proceso: str) -> Optional[int]:
+        return self._indice.get(proceso)
+
+    def obtener_buddy_address(self, direccion: int, tamano: int) -> int:
+        """Calcula la dirección base del buddy de un bloque (XOR)"""
+        return direccion ^ tamano
+
+    def bloque_en(self, direccion: int) -> Optional[NodoPersistente]:
+        """Hoja que contiene la dirección dada (O(log n))"""
+        if not (0 <= direccion < self.total):
+            return None
+        n = self.raiz
+        while not n.es_hoja():
+            n = n.hijoIzquierdo if direccion < n.hijoDerecho.direccion else n.hijoDerecho
+        return n
+
+    def bloques_en_rango(self, inicio: int, fin: int) -> List[NodoPersistente]:
+        """Hojas que se solapan con [inicio, fin), en O(log n + k)"""
+        bloques: List[NodoPersistente] = []
+        pila = [self.raiz]
+        while pila:
+            n = pila.pop()
+            if n.direccion >= fin or n.direccion + n.tamano <= inicio:
+                continue
+            if n.es_hoja():
+                bloques.append(n)
+            else:
+                pila.append(n.hijoDerecho)
+                pila.append(n.hijoIzquierdo)
+        return bloques
+
+    def hojas_en_orden(self, raiz: Optional[NodoPersistente] = None) -> List[NodoPersistente]:
+        """Bloques hoja de izquierda a derecha (cacheado por versión)"""
+        raiz = raiz or self.raiz
+        if self._cache_hojas is not None and self._cache_hojas[0] is raiz:
+            return self._cache_hojas[1]
+        hojas: List[NodoPersistente] = []
+        pila = [raiz]
+        while pila:
+            n = pila.pop()
+            if n.es_hoja():
+                hojas.append(n)
+            else:
+                pila.append(n.hijoDerecho)
+                pila.append(n.hijoIzquierdo)
+        self._cache_hojas = (raiz, hojas)
+        return hojas